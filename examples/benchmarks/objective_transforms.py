@@ -0,0 +1,77 @@
+"""
+Benchmark of the vectorized transforms of the descriptor based evaluation functions.
+
+Scores arrays of precomputed descriptors of increasing size with the vectorized transform (score) of each evaluation
+function and with a per-molecule loop over the scalar scoring curves, and prints the time per batch.
+
+Usage: python examples/benchmarks/objective_transforms.py
+"""
+import time
+
+import numpy as np
+
+from reactea.optimization.evaluation import LogP, MolecularWeight, NumberOfLargeRings, StereoisomersCounter
+
+BATCH_SIZES = [10, 100, 1000, 10000, 100000]
+
+
+def random_descriptors(f, n, rng):
+    """
+    Generates n descriptor values in the range of the evaluation function (with ~1% invalid values).
+    """
+    if isinstance(f, LogP):
+        values = rng.uniform(-5, 30, n)
+    elif isinstance(f, MolecularWeight):
+        values = rng.uniform(50, 1500, n)
+    elif isinstance(f, NumberOfLargeRings):
+        values = rng.integers(0, 12, n).astype(np.float64)
+    else:
+        values = rng.integers(1, 64, n).astype(np.float64)
+    values[rng.random(n) < 0.01] = np.nan
+    return values
+
+
+def scalar_score(f, value):
+    """
+    Scores a descriptor value one molecule at a time (scalar branches of the scoring curves).
+    """
+    if np.isnan(value):
+        return f.worst_fitness
+    if isinstance(f, LogP):
+        return 1.0 if value < 0 else 0.0 if value > f.max_logp else (f.max_logp - value) / f.max_logp
+    if isinstance(f, MolecularWeight):
+        if value < f.min_weight:
+            return np.cos((value - f.min_weight + 200) / 320)
+        return 1.0 if value < f.max_weight else 1.0 / np.log(value / 250.0)
+    if isinstance(f, NumberOfLargeRings):
+        return 1 / np.log((value - f.max_rings) * 100) if value > f.max_rings else 1.0
+    return 1.0 if value < f.max_chiral_count else 1.0 / np.log(value * 100.0)
+
+
+def timeit(function, repeat=5):
+    """
+    Best time (in seconds) of repeated calls to a function.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    rng = np.random.default_rng(42)
+    functions = [LogP(), MolecularWeight(), NumberOfLargeRings(), StereoisomersCounter()]
+    print(f"{'function':<22}{'batch size':>12}{'vectorized (ms)':>18}{'per molecule (ms)':>20}{'speedup':>10}")
+    for f in functions:
+        for n in BATCH_SIZES:
+            values = random_descriptors(f, n, rng)
+            vectorized = timeit(lambda: f.score(values))
+            scalar = timeit(lambda: [scalar_score(f, value) for value in values], repeat=1 if n > 1000 else 3)
+            print(f"{f.method_str():<22}{n:>12}{vectorized * 1e3:>18.3f}{scalar * 1e3:>20.3f}"
+                  f"{scalar / vectorized:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,10 @@ from typing import Union
 from rdkit import RDLogger
 
 from reactea.case_studies import CaseStudy
+from reactea.chem import ReactionRule, MolCache, FeatureCache
 from reactea.io_streams import Loaders, Writers
 from reactea.optimization.jmetal.ea import ChemicalEA
+from reactea.optimization.model_service import ModelService
 from reactea.wrappers import case_study_wrapper, evaluation_functions_wrapper
 
 ROOT_DIR = os.path.dirname(__file__)
@@ -38,7 +40,11 @@ def run_reactea(configs_path: Union[str, dict],
     objective = case_study.objective
 
     # initialize reaction rules
-    reaction_rules = Loaders.initialize_rules()
+    MolCache.shared().resize(configs.get('mol_cache_size', MolCache.DEFAULT_MAXSIZE))
+    ModelService.configure(configs)
+    FeatureCache.shared().resize(configs.get('feature_cache_size', FeatureCache.DEFAULT_MAXSIZE))
+    reaction_rules = Loaders.initialize_rules(lazy=configs.get('lazy_rules', False),
+                                              n_jobs=configs.get('rule_compile_jobs', -1))
 
     # set up folders
     Writers.set_up_folders(output_folder)
@@ -64,4 +70,6 @@ def run_reactea(configs_path: Union[str, dict],
     Writers.save_intermediate_transformations(final_pop, configs)
 
     # save configs
+    configs['compiled_rules'] = ReactionRule.n_compiled(reaction_rules)
+    configs['mol_cache'] = MolCache.shared().stats()
     Writers.save_configs(configs)
@@ -27,6 +27,8 @@ class SweetReactor(CaseStudy):
         super(SweetReactor, self).__init__(configs['multi_objective'])
         self.multi_objective = configs['multi_objective']
         self.population_smiles = initial_population
+        self.similarity_fingerprint = configs.get('initial_similarity_fingerprint', 'count')
+        self.similarity_memmap_path = configs.get('initial_similarity_memmap_path', None)
         self.feval_names_str = None
 
     def objective(self):
@@ -45,7 +47,8 @@ class SweetReactor(CaseStudy):
         f3 = NumberOfLargeRings(max_rings=6)
         f4 = StereoisomersCounter(max_chiral_count=5)
         f5 = LogP()
-        f6 = SimilarityToInitial(self.population_smiles)
+        f6 = SimilarityToInitial(self.population_smiles, fingerprint=self.similarity_fingerprint,
+                                 memmap_path=self.similarity_memmap_path)
         if self.multi_objective:
             f_ag = AggregatedSum([f2, f3, f4, f5], [0.3, 0.3, 0.1, 0.3])
             problem = ChemicalProblem([f1, f6, f_ag])
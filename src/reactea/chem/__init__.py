@@ -1,4 +1,16 @@
+from .mol_cache import MolCache
+from .product_filters import ProductFilter, ProductFilterChain, WildcardAtomsFilter, MinAtomsFilter, \
+    RequiredElementsFilter, PropertyWindowFilter
 from .compounds import Compound
 from .reaction_rules import ReactionRule
 from .chem_utils import ChemUtils
-from .standardization import MolecularStandardizer, ChEMBLStandardizer
+from .standardization import MolecularStandardizer, ChEMBLStandardizer, CachedStandardizer
+from .rule_index import RuleApplicabilityIndex, ReactantTemplateGroups
+from .rule_statistics import RuleStatistics
+from .rule_validation import RuleValidator
+from .rule_sampling import RuleSampler, UniformRuleSampler, WeightedRuleSampler, BanditRuleSampler
+from .reaction_memo import ReactionOutcomeMemo
+from .similarity import SimilarityEngine
+from .featurization import FeatureCache
+from .descriptors import DescriptorMemo
+from .fingerprint_matrix import PackedFingerprintMatrix
@@ -1,19 +1,29 @@
-import random
 from itertools import chain
-from typing import Union, List
+from typing import Union, List, Iterator
 
-from rdkit import DataStructs, Chem
-from rdkit.Chem import Mol, rdmolfiles, rdmolops, MolFromSmiles, MolToSmiles
+import numpy as np
+from rdkit import DataStructs
+from rdkit.Chem import Mol, rdmolfiles, rdmolops, MolToSmiles, PatternFingerprint
 from rdkit.Chem.Draw import MolToImage
 from rdkit.Chem.Fingerprints.FingerprintMols import FingerprintMol
 from rdkit.Chem.rdChemReactions import ChemicalReaction
 
+from reactea.chem.mol_cache import MolCache
+from reactea.chem.product_filters import ProductFilterChain
+from reactea.chem.similarity import SimilarityEngine
+
 
 class ChemUtils:
     """
     ChemUtils class contains a set of chemical utilities.
+    SMILES strings are parsed through the shared MolCache, so the Mol objects used here must not be modified in place.
     """
 
+    # product filters equivalent to valid_product
+    _DEFAULT_PRODUCT_FILTER = ProductFilterChain.build()
+    # similarity engine with the same fingerprints as calc_fingerprint_similarity
+    _SIMILARITY_ENGINE = SimilarityEngine('rdkit')
+
     @staticmethod
     def canonicalize_atoms(mol: Mol):
         """
@@ -62,6 +72,56 @@ class ChemUtils:
         except Exception:
             return ()
 
+    @staticmethod
+    def iter_products(mol: Union[Mol, List[Mol]],
+                      rule: ChemicalReaction,
+                      max_products: int = 1000,
+                      product_filter: Union[ProductFilterChain, None] = None) -> Iterator[Mol]:
+        """
+        Applies the reaction to a sequence of reactant molecules and lazily yields the distinct products as sanitized
+        Mol objects.
+        Products are validated with the product filter chain directly on the Mol objects and only the products that
+        pass all filters are converted to canonical SMILES (to be deduplicated), so the caller can stop consuming the
+        generator (e.g. with itertools.islice) as soon as it has enough products.
+        Yielded Mol objects are interned in the shared MolCache (their SMILES can be retrieved without recomputing it).
+
+        Parameters
+        ----------
+        mol: Union[Mol, List[Mol]]
+            RDKit Mol or list of Mol objects
+        rule: ChemicalReaction
+            RDKit ChemicalReaction object
+        max_products: int
+            maximum number of product sets generated by RDKit
+        product_filter: Union[ProductFilterChain, None]
+            chain of filters the products must pass (defaults to the checks of valid_product)
+
+        Returns
+        -------
+        Iterator[Mol]:
+            distinct products Mol objects
+        """
+        if product_filter is None:
+            product_filter = ChemUtils._DEFAULT_PRODUCT_FILTER
+        try:
+            reactants = tuple(mol) if isinstance(mol, list) else (mol,)
+            product_sets = rule.RunReactants(reactants, max_products)
+        except Exception:
+            return
+        cache = MolCache.shared()
+        seen = set()
+        for product in chain.from_iterable(product_sets):
+            if not product_filter(product):
+                continue
+            try:
+                smiles = MolToSmiles(product)
+            except Exception:
+                continue
+            if smiles in seen:
+                continue
+            seen.add(smiles)
+            yield cache.intern(product, smiles)[0]
+
     @staticmethod
     def smiles_to_img(smiles: str, size: tuple = (200, 200), highlightMol: bool = False):
         """
@@ -80,7 +140,7 @@ class ChemUtils:
         -------
         Molecule Image.
         """
-        mol = MolFromSmiles(smiles)
+        mol = MolCache.shared().mol(smiles)
         if not highlightMol:
             return ChemUtils.mol_to_image(mol, size=size)
         else:
@@ -136,19 +196,27 @@ class ChemUtils:
         """
         if '*' in smiles:
             return False
-        mol = MolFromSmiles(smiles, sanitize=False)
+        # SMILES strings that can not be sanitized are cached as invalid
+        mol = MolCache.shared().mol(smiles)
         if mol is None:
             return False
-        try:
-            Chem.SanitizeMol(mol)
-        except:
-            return False
-        if mol.GetNumAtoms() < 4:
-            return False
-        carbon = MolFromSmiles('C')
-        if not mol.HasSubstructMatch(carbon):
-            return False
-        return True
+        return ChemUtils.valid_product_mol(mol)
+
+    @staticmethod
+    def valid_product_mol(mol: Mol):
+        """
+        Returns True if the sanitized Mol object is a valid reaction product.
+
+        Parameters
+        ----------
+        mol: Mol
+            sanitized RDKit Mol object
+        Returns
+        -------
+        bool:
+            True if the Mol object is a valid product
+        """
+        return ChemUtils._DEFAULT_PRODUCT_FILTER(mol, sanitized=True)
 
     @staticmethod
     def calc_fingerprint_similarity(smiles1: str, smiles2: str):
@@ -166,8 +234,8 @@ class ChemUtils:
         float
             The similarity between the two molecules.
         """
-        mol1 = MolFromSmiles(smiles1)
-        mol2 = MolFromSmiles(smiles2)
+        mol1 = MolCache.shared().mol(smiles1)
+        mol2 = MolCache.shared().mol(smiles2)
         if mol1 and mol2:
             fp1 = FingerprintMol(mol1)
             fp2 = FingerprintMol(mol2)
@@ -178,6 +246,7 @@ class ChemUtils:
     def most_similar_compound(smiles: str, smiles_list: List[str], tolerance: float = 0.25):
         """
         Finds the most similar compound in a list of compounds.
+        The compound is fingerprinted once and all compounds in the list are scored at once (see SimilarityEngine).
 
         Parameters
         ----------
@@ -193,11 +262,31 @@ class ChemUtils:
         str
             The most similar compound SMILES string.
         """
-        if len(smiles_list) == 1:
-            return smiles_list[0]
-        sims = [ChemUtils.calc_fingerprint_similarity(smiles, s) for s in smiles_list]
-        idx = [i for i, x in enumerate(sims) if x >= max(sims) - tolerance]
-        return smiles_list[random.choice(idx)]
+        return ChemUtils._SIMILARITY_ENGINE.most_similar(smiles, smiles_list, tolerance)
+
+    @staticmethod
+    def packed_pattern_fingerprint(mol: Mol, fp_size: int = 2048):
+        """
+        Computes the pattern fingerprint of a molecule (or query molecule) packed into 64-bit words.
+        If a molecule is a substructure of another, all bits set in its pattern fingerprint are also set in the
+        pattern fingerprint of the other molecule.
+        (see: https://www.rdkit.org/docs/source/rdkit.Chem.rdmolops.html#rdkit.Chem.rdmolops.PatternFingerprint)
+
+        Parameters
+        ----------
+        mol: Mol
+            RDKit Mol object
+        fp_size: int
+            size of the fingerprint (multiple of 64)
+
+        Returns
+        -------
+        np.ndarray:
+            packed fingerprint (uint64 array of size fp_size / 64)
+        """
+        bits = np.zeros((fp_size,), dtype=np.uint8)
+        DataStructs.ConvertToNumpyArray(PatternFingerprint(mol, fp_size), bits)
+        return np.packbits(bits).view('<u8')
 
     @staticmethod
     def canonicalize_smiles(smiles: str, include_stereocenters=True):
@@ -216,7 +305,9 @@ class ChemUtils:
         str:
             canonical SMILES string
         """
-        mol = MolFromSmiles(smiles)
+        mol, canonical_smiles = MolCache.shared().get(smiles)
         if mol is None:
             return smiles
-        return MolToSmiles(mol, isomericSmiles=include_stereocenters)
+        if include_stereocenters:
+            return canonical_smiles
+        return MolToSmiles(mol, isomericSmiles=False)
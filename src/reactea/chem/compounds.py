@@ -1,15 +1,26 @@
 from typing import Union
 
-from rdkit.Chem import MolFromSmiles, MolToSmiles, Mol
+from rdkit.Chem import Mol
+
+from reactea.chem.mol_cache import MolCache
 
 
 class Compound:
     """
     Class to represent Compounds.
     Each Compound is characterized by an id, SMILES string and Mol object.
+    The SMILES string and the Mol object are derived lazily from each other and cached the first time they are
+    requested. SMILES strings are parsed through the shared MolCache, so compounds with the same SMILES share the same
+    (read-only) Mol object.
     """
 
-    def __init__(self, smiles: str, cmp_id: Union[str, int], canonicalize: bool = True):
+    __slots__ = ('_cmp_id', '_input_smiles', '_smiles', '_mol', '_mol_ready', '_key', '_fingerprints')
+
+    def __init__(self,
+                 smiles: str,
+                 cmp_id: Union[str, int],
+                 canonicalize: bool = True,
+                 key: Union[str, None] = None):
         """
         Initializes the Compound.
 
@@ -21,14 +32,17 @@ class Compound:
             compound id
         canonicalize: bool
             whether to canonicalize the SMILES string.
+        key: Union[str, None]
+            precomputed canonical key of the compound (e.g. its canonical SMILES string).
         """
-        if canonicalize:
-            from reactea.chem import ChemUtils
-            self._smiles = ChemUtils.canonicalize_smiles(smiles, canonicalize)
-        else:
-            self._smiles = smiles
         self._cmp_id = cmp_id
-        self._mol = self._to_mol()
+        self._input_smiles = smiles
+        # the canonical SMILES is only derived when requested
+        self._smiles = None if canonicalize else smiles
+        self._mol = None
+        self._mol_ready = False
+        self._key = key
+        self._fingerprints = None
 
     @property
     def smiles(self):
@@ -40,6 +54,17 @@ class Compound:
         str:
             Compound' SMILES string.
         """
+        if self._smiles is None:
+            if not self._mol_ready:
+                self._mol = self._to_mol()
+                self._mol_ready = True
+            if self._mol is not None:
+                self._smiles = self._to_smiles()
+                if self._key is None:
+                    self._key = self._smiles
+            else:
+                # invalid SMILES strings are kept as provided
+                self._smiles = self._input_smiles
         return self._smiles
 
     @smiles.setter
@@ -53,8 +78,12 @@ class Compound:
         new_smiles: str
             Compound new SMILES representation.
         """
+        self._input_smiles = new_smiles
         self._smiles = new_smiles
-        self._mol = self._to_mol()
+        self._mol = None
+        self._mol_ready = False
+        self._key = None
+        self._fingerprints = None
 
     @property
     def cmp_id(self):
@@ -90,6 +119,9 @@ class Compound:
         Mol:
             Compound' RDKit Mol object.
         """
+        if not self._mol_ready:
+            self._mol = self._to_mol()
+            self._mol_ready = True
         return self._mol
 
     @mol.setter
@@ -104,7 +136,60 @@ class Compound:
             New compound' Mol object.
         """
         self._mol = new_mol
-        self._smiles = self._to_smiles()
+        self._mol_ready = True
+        self._input_smiles = None
+        self._smiles = None
+        self._key = None
+        self._fingerprints = None
+
+    @property
+    def key(self):
+        """
+        Compound' canonical key property.
+        If no key was provided, the canonical SMILES string is used.
+
+        Returns
+        -------
+        str:
+            Compound' canonical key.
+        """
+        if self._key is None:
+            mol = self.mol
+            self._key = MolCache.shared().to_smiles(mol) if mol is not None else self.smiles
+        return self._key
+
+    def get_fingerprint(self, fingerprint_type: str):
+        """
+        Gets a cached fingerprint of the compound.
+
+        Parameters
+        ----------
+        fingerprint_type: str
+            type of fingerprint
+
+        Returns
+        -------
+        Union[ExplicitBitVect, None]:
+            cached fingerprint (None if it was not computed yet)
+        """
+        if self._fingerprints is None:
+            return None
+        return self._fingerprints.get(fingerprint_type)
+
+    def set_fingerprint(self, fingerprint_type: str, fingerprint):
+        """
+        Caches a fingerprint of the compound (cached fingerprints are discarded when the compound changes).
+
+        Parameters
+        ----------
+        fingerprint_type: str
+            type of fingerprint
+        fingerprint: ExplicitBitVect
+            fingerprint of the compound
+        """
+        if self._fingerprints is None:
+            self._fingerprints = {}
+        self._fingerprints[fingerprint_type] = fingerprint
 
     def _to_mol(self):
         """
@@ -115,7 +200,10 @@ class Compound:
         Mol:
             Converted Mol object.
         """
-        return MolFromSmiles(self._smiles)
+        smiles = self._smiles if self._smiles is not None else self._input_smiles
+        if smiles is None:
+            return None
+        return MolCache.shared().mol(smiles)
 
     def _to_smiles(self):
         """
@@ -129,4 +217,4 @@ class Compound:
         if self._mol is None:
             return None
         else:
-            return MolToSmiles(self._mol)
+            return MolCache.shared().to_smiles(self._mol)
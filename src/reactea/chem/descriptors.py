@@ -0,0 +1,85 @@
+import threading
+from contextlib import contextmanager
+from typing import Callable, Any
+
+from rdkit.Chem import Mol, GetSymmSSSR, EnumerateStereoisomers, Crippen, MolSurf, QED
+from rdkit.Chem import rdMolDescriptors
+from rdkit.Chem.EnumerateStereoisomers import StereoEnumerationOptions
+
+
+class DescriptorMemo:
+    """
+    Class containing a per-molecule memo of molecular descriptors shared by the evaluation functions.
+    Inside a scope (e.g. the evaluation of a batch of molecules by an EvaluationPlan) each descriptor of a molecule is
+    computed at most once and reused by every evaluation function (e.g. the QED properties of a molecule are shared by
+    all the QED based evaluation functions). Outside a scope descriptors are computed without being memoized.
+    Memos are kept per thread and released when the outermost scope exits.
+    """
+
+    # available descriptors
+    DESCRIPTORS = {'MolWt': rdMolDescriptors._CalcMolWt,
+                   'MolLogP': Crippen.MolLogP,
+                   'NumHBD': rdMolDescriptors.CalcNumHBD,
+                   'TPSA': MolSurf.TPSA,
+                   'RingSizes': lambda mol: [len(ring) for ring in GetSymmSSSR(mol)],
+                   'StereoisomerCount': lambda mol: EnumerateStereoisomers.GetStereoisomerCount(
+                       mol, options=StereoEnumerationOptions(unique=True)),
+                   'QEDProperties': QED.properties}
+
+    _local = threading.local()
+
+    @staticmethod
+    @contextmanager
+    def scope():
+        """
+        Opens a memo scope (nested scopes share the memo of the outermost scope).
+        """
+        local = DescriptorMemo._local
+        outermost = getattr(local, 'memo', None) is None
+        if outermost:
+            local.memo = {}
+        try:
+            yield
+        finally:
+            if outermost:
+                local.memo = None
+
+    @staticmethod
+    def register(name: str, descriptor: Callable[[Mol], Any]):
+        """
+        Registers a new descriptor.
+
+        Parameters
+        ----------
+        name: str
+            name of the descriptor
+        descriptor: Callable[[Mol], Any]
+            function computing the descriptor of a molecule
+        """
+        DescriptorMemo.DESCRIPTORS = {**DescriptorMemo.DESCRIPTORS, name: descriptor}
+
+    @staticmethod
+    def get(mol: Mol, name: str):
+        """
+        Gets a descriptor of a molecule, computing it if it is not memoized (errors are raised and not memoized).
+
+        Parameters
+        ----------
+        mol: Mol
+            molecule
+        name: str
+            name of the descriptor
+
+        Returns
+        -------
+        Any:
+            descriptor value
+        """
+        memo = getattr(DescriptorMemo._local, 'memo', None)
+        if memo is None or mol is None:
+            return DescriptorMemo.DESCRIPTORS[name](mol)
+        # the Mol reference keeps its id from being reused while the scope is open
+        _, descriptors = memo.setdefault(id(mol), (mol, {}))
+        if name not in descriptors:
+            descriptors[name] = DescriptorMemo.DESCRIPTORS[name](mol)
+        return descriptors[name]
@@ -0,0 +1,291 @@
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, List, Union
+
+import numpy as np
+from rdkit import DataStructs
+from rdkit.Chem import Mol, RDKFingerprint, Descriptors
+from rdkit.Chem.MACCSkeys import GenMACCSKeys
+from rdkit.Chem.rdMolDescriptors import GetMorganFingerprintAsBitVect, GetHashedAtomPairFingerprintAsBitVect
+
+from reactea.chem.mol_cache import MolCache
+
+
+def _bits(fingerprint):
+    """
+    Converts a RDKit bit vector into a NumPy array of 0/1 values.
+    """
+    array = np.zeros((fingerprint.GetNumBits(),), dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(fingerprint, array)
+    return array
+
+
+def _descriptors_2d(mol: Mol):
+    """
+    Computes the RDKit 2D descriptors of a molecule.
+    """
+    return np.array([descriptor(mol) for _, descriptor in Descriptors._descList], dtype=np.float64)
+
+
+class _FeatureTable:
+    """
+    Features of one type: a contiguous row per molecule (reused when the least recently used molecule is evicted).
+    """
+
+    def __init__(self, dim: int, dtype: np.dtype, maxsize: int):
+        self.data = np.empty((min(maxsize, 1024), dim), dtype=dtype)
+        self.rows = OrderedDict()
+        self.maxsize = maxsize
+
+    def get(self, key: str):
+        row = self.rows.get(key)
+        if row is not None:
+            self.rows.move_to_end(key)
+        return row
+
+    def put(self, key: str, features: np.ndarray):
+        if len(self.rows) < self.maxsize:
+            row = len(self.rows)
+            if row == len(self.data):
+                grown = np.empty((min(2 * len(self.data), self.maxsize), self.data.shape[1]), dtype=self.data.dtype)
+                grown[:row] = self.data
+                self.data = grown
+        else:
+            # the row of the least recently used molecule is reused
+            _, row = self.rows.popitem(last=False)
+        self.data[row] = features
+        self.rows[key] = row
+        return row
+
+    def resize(self, maxsize: int):
+        self.maxsize = maxsize
+        if len(self.rows) <= maxsize:
+            return
+        while len(self.rows) > maxsize:
+            self.rows.popitem(last=False)
+        # compacts the kept rows at the start of the table
+        kept = list(self.rows.items())
+        data = np.empty((max(maxsize, 1), self.data.shape[1]), dtype=self.data.dtype)
+        for i, (key, row) in enumerate(kept):
+            data[i] = self.data[row]
+            self.rows[key] = i
+        self.data = data
+
+
+class FeatureCache:
+    """
+    Class to represent a featurization cache shared by the machine learning based evaluation functions.
+    Features are keyed by the canonical SMILES of the molecules and the feature type, so each molecule is only
+    featurized once per feature type while it is in the cache. The features of each type are stored as rows of a
+    contiguous NumPy matrix (bounded to maxsize molecules per type, the least recently used are evicted first), and
+    batches are gathered into a contiguous (n_molecules, n_features) matrix ready to be passed to a model.
+
+    Available feature types: 'ecfp4' (Morgan radius 2, 2048 bits), 'rdk' (RDKit fingerprint, 2048 bits),
+    'atompair_fp' (hashed atom pairs, 2048 bits), 'maccs' (MACCS keys) and '2d' (RDKit 2D descriptors). Other feature
+    types can be added with register.
+    """
+
+    # default maximum number of molecules kept per feature type
+    DEFAULT_MAXSIZE = 20000
+
+    # feature type -> (featurizer, dtype, value of the features of invalid molecules)
+    FEATURIZERS = {'ecfp4': (lambda mol: _bits(GetMorganFingerprintAsBitVect(mol, 2, nBits=2048)), np.uint8, 0),
+                   'rdk': (lambda mol: _bits(RDKFingerprint(mol, fpSize=2048)), np.uint8, 0),
+                   'atompair_fp': (lambda mol: _bits(GetHashedAtomPairFingerprintAsBitVect(mol, nBits=2048)),
+                                   np.uint8, 0),
+                   'maccs': (lambda mol: _bits(GenMACCSKeys(mol)), np.uint8, 0),
+                   '2d': (_descriptors_2d, np.float64, np.nan)}
+
+    _shared = None
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        """
+        Initializes the Feature Cache.
+
+        Parameters
+        ----------
+        maxsize: int
+            maximum number of molecules whose features are kept per feature type (0 disables the cache)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._tables = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def shared(cls):
+        """
+        Gets the process-wide Feature Cache shared by the evaluation functions.
+
+        Returns
+        -------
+        FeatureCache:
+            shared Feature Cache
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def register(cls, feature_type: str, featurizer: Callable[[Mol], np.ndarray], dtype: np.dtype = np.float64,
+                 fill: Union[int, float] = np.nan):
+        """
+        Registers a new feature type.
+
+        Parameters
+        ----------
+        feature_type: str
+            name of the feature type
+        featurizer: Callable[[Mol], np.ndarray]
+            function computing the (fixed size) feature vector of a molecule
+        dtype: np.dtype
+            type of the features
+        fill: Union[int, float]
+            value of the features of invalid molecules
+        """
+        cls.FEATURIZERS = {**cls.FEATURIZERS, feature_type: (featurizer, dtype, fill)}
+
+    @staticmethod
+    def cached_featurizer(featurize: Callable[[Any, Mol], np.ndarray], feature_type: str, defaults: dict = None):
+        """
+        Wraps the per-molecule featurization method of a featurizer class (e.g. the deepmol featurizers used by the
+        DeepSweet ensemble members) so the features are taken from the shared Feature Cache.
+        Featurizers whose settings differ from the settings of the feature type keep their own featurization.
+
+        Parameters
+        ----------
+        featurize: Callable[[Any, Mol], np.ndarray]
+            featurization method (called with the featurizer and a molecule)
+        feature_type: str
+            type of the features computed by the featurizer
+        defaults: dict
+            featurizer attributes (and values) the features of the feature type are computed with
+
+        Returns
+        -------
+        Callable[[Any, Mol], np.ndarray]:
+            featurization method using the shared Feature Cache
+        """
+        defaults = defaults if defaults is not None else {}
+
+        @functools.wraps(featurize)
+        def wrapper(featurizer, mol, *args, **kwargs):
+            if args or kwargs or not isinstance(mol, Mol) or \
+                    any(getattr(featurizer, name, value) != value for name, value in defaults.items()):
+                return featurize(featurizer, mol, *args, **kwargs)
+            return FeatureCache.shared().features([mol], feature_type)[0]
+        wrapper.feature_type = feature_type
+        return wrapper
+
+    def _featurize(self, feature_type: str, mol: Mol):
+        """
+        Internal method to featurize a molecule (None if it is invalid or can not be featurized).
+        """
+        featurizer, dtype, _ = self.FEATURIZERS[feature_type]
+        if not isinstance(mol, Mol):
+            return None
+        try:
+            return np.asarray(featurizer(mol), dtype=dtype).reshape(-1)
+        except Exception:
+            return None
+
+    def features(self, mols: List[Union[Mol, None]], feature_type: str):
+        """
+        Gets the features of a batch of molecules, featurizing only the molecules that are not cached.
+
+        Parameters
+        ----------
+        mols: List[Union[Mol, None]]
+            molecules to featurize
+        feature_type: str
+            type of features
+
+        Returns
+        -------
+        np.ndarray:
+            C-contiguous matrix with one row of features per molecule (rows of invalid molecules are filled with the
+            fill value of the feature type, e.g. NaN for the 2D descriptors)
+        """
+        if feature_type not in self.FEATURIZERS:
+            raise ValueError(f"Unknown feature type: {feature_type}. "
+                             f"Available types: {list(self.FEATURIZERS.keys())}")
+        _, dtype, fill = self.FEATURIZERS[feature_type]
+        keys = [MolCache.shared().to_smiles(mol) if isinstance(mol, Mol) else None for mol in mols]
+        batch = None
+        missing = []
+        with self._lock:
+            table = self._tables.get(feature_type)
+            if table is not None:
+                batch = np.empty((len(mols), table.data.shape[1]), dtype=dtype)
+                cached, cached_rows = [], []
+                for i, key in enumerate(keys):
+                    row = table.get(key) if key is not None else None
+                    if row is not None:
+                        cached.append(i)
+                        cached_rows.append(row)
+                    else:
+                        missing.append(i)
+                # molecules found in the cache are gathered with a single vectorized copy
+                batch[cached] = table.data[cached_rows]
+                self.hits += len(cached)
+            else:
+                missing = list(range(len(mols)))
+            self.misses += len(missing)
+        computed = {}
+        for i in missing:
+            if keys[i] not in computed:
+                computed[keys[i]] = self._featurize(feature_type, mols[i])
+        if batch is None:
+            dim = next((len(features) for features in computed.values() if features is not None), 0)
+            batch = np.empty((len(mols), dim), dtype=dtype)
+        with self._lock:
+            if table is None and self.maxsize > 0 and batch.shape[1] > 0:
+                table = self._tables.setdefault(feature_type, _FeatureTable(batch.shape[1], dtype, self.maxsize))
+            for i in missing:
+                features = computed[keys[i]]
+                if features is None:
+                    batch[i] = fill
+                    continue
+                batch[i] = features
+                if keys[i] is not None and table is not None and table.get(keys[i]) is None:
+                    table.put(keys[i], features)
+        return batch
+
+    def resize(self, maxsize: int):
+        """
+        Changes the maximum number of molecules kept per feature type, evicting entries if needed.
+
+        Parameters
+        ----------
+        maxsize: int
+            new maximum number of molecules kept per feature type
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            if maxsize <= 0:
+                self._tables.clear()
+            for table in self._tables.values():
+                table.resize(maxsize)
+
+    def clear(self):
+        """
+        Removes all features and resets the statistics of the cache.
+        """
+        with self._lock:
+            self._tables.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Gets the cache statistics.
+
+        Returns
+        -------
+        dict:
+            number of hits, misses and molecules kept per feature type
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': {feature_type: len(table.rows) for feature_type, table in self._tables.items()}}
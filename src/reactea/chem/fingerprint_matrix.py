@@ -0,0 +1,250 @@
+import hashlib
+import json
+import os
+from typing import List, Union
+
+import numpy as np
+from rdkit import DataStructs
+from rdkit.Chem import Mol
+from rdkit.Chem.rdMolDescriptors import GetMorganFingerprintAsBitVect
+
+from reactea.chem.mol_cache import MolCache
+
+
+class PackedFingerprintMatrix:
+    """
+    Class to represent a set of Morgan fingerprints as a packed, fixed-width bit matrix, optionally memory-mapped from
+    a .npy file (with a <path>.json sidecar describing the molecules and fingerprints it was built from).
+    The matrix is stored bit-sliced: row b holds bit b of the fingerprints of all molecules, packed 8 molecules per
+    byte (n_bits rows of ceil(n_molecules / 8) bytes). The intersection counts between a molecule and all the
+    fingerprints of the matrix are the sum of the (unpacked) rows of the bits set in the molecule fingerprint, so only
+    those rows are read (and unpacked once for a batch of molecules). Tanimoto similarities are computed from the
+    intersection counts and the popcounts of the fingerprints with vectorized operations over groups of molecules and
+    blocks of fingerprints of the matrix (bounding the memory used), and reduced with max or mean in the same pass, so
+    large sets of fingerprints (e.g. 100k seeds) can be compared without Python-level calls per pair.
+    """
+
+    # maximum number of bytes used by a block
+    BLOCK_BYTES = 1 << 25
+
+    # number of molecules compared at once
+    QUERY_CHUNK_SIZE = 1024
+
+    # number of molecules whose intersection counts are summed together
+    GROUP_SIZE = 16
+
+    # number of molecules fingerprinted at once when building a matrix (multiple of 8)
+    BUILD_CHUNK_SIZE = 8192
+
+    def __init__(self, planes: np.ndarray, size: int, radius: int = 2, counts: np.ndarray = None):
+        """
+        Initializes the Packed Fingerprint Matrix.
+
+        Parameters
+        ----------
+        planes: np.ndarray
+            bit-sliced fingerprints (uint8 matrix with n_bits rows of ceil(size / 8) bytes)
+        size: int
+            number of molecules
+        radius: int
+            radius of the Morgan fingerprints
+        counts: np.ndarray
+            number of bits set in the fingerprint of each molecule (computed from the planes if None)
+        """
+        if planes.dtype != np.uint8 or planes.ndim != 2 or planes.shape[1] != (size + 7) // 8:
+            raise ValueError("Packed fingerprints must be a uint8 matrix with n_bits rows of ceil(size / 8) bytes.")
+        self.planes = planes
+        self.size = size
+        self.n_bits = planes.shape[0]
+        self.radius = radius
+        if counts is None:
+            counts = np.zeros(size, dtype=np.int32)
+            for start, stop in self._blocks(self.n_bits):
+                counts[start * 8:stop * 8] = np.unpackbits(planes[:, start:stop], axis=1).sum(
+                    axis=0, dtype=np.int32)[:size - start * 8]
+        self.counts = counts
+
+    def _blocks(self, n_rows: int):
+        """
+        Internal method to split the columns (bytes) of the planes into blocks of at most BLOCK_BYTES unpacked bytes
+        for n_rows rows.
+        """
+        n_columns = self.planes.shape[1]
+        block = max(1, self.BLOCK_BYTES // (8 * max(n_rows, 1)))
+        return [(start, min(start + block, n_columns)) for start in range(0, n_columns, block)]
+
+    @staticmethod
+    def fingerprints(mols: List[Union[Mol, str, None]], n_bits: int = 2048, radius: int = 2):
+        """
+        Computes the (unpacked) Morgan fingerprints of a list of molecules.
+
+        Parameters
+        ----------
+        mols: List[Union[Mol, str, None]]
+            molecules (Mol objects or SMILES strings)
+        n_bits: int
+            number of bits of the fingerprints
+        radius: int
+            radius of the Morgan fingerprints
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]:
+            0/1 matrix with a fingerprint per molecule (rows of invalid molecules are empty) and mask of the valid
+            molecules
+        """
+        bits = np.zeros((len(mols), n_bits), dtype=np.uint8)
+        valid = np.zeros(len(mols), dtype=bool)
+        for i, mol in enumerate(mols):
+            mol = MolCache.shared().mol(mol) if isinstance(mol, str) else mol
+            if not isinstance(mol, Mol):
+                continue
+            try:
+                DataStructs.ConvertToNumpyArray(GetMorganFingerprintAsBitVect(mol, radius, nBits=n_bits), bits[i])
+            except Exception:
+                bits[i] = 0
+                continue
+            valid[i] = True
+        return bits, valid
+
+    @staticmethod
+    def _metadata(mols: List[Union[Mol, str, None]], n_bits: int, radius: int):
+        """
+        Internal method to get the metadata identifying the matrix of a list of molecules (hash of their SMILES and
+        fingerprint parameters).
+        """
+        digest = hashlib.sha1()
+        for mol in mols:
+            smiles = MolCache.shared().to_smiles(mol) if isinstance(mol, Mol) else mol
+            digest.update(f'{smiles if smiles is not None else ""}\n'.encode())
+        return {'molecules': digest.hexdigest(), 'size': len(mols), 'n_bits': n_bits, 'radius': radius}
+
+    @classmethod
+    def from_molecules(cls, mols: List[Union[Mol, str, None]], n_bits: int = 2048, radius: int = 2,
+                       path: str = None):
+        """
+        Builds the Packed Fingerprint Matrix of a list of molecules (invalid molecules get empty fingerprints).
+
+        Parameters
+        ----------
+        mols: List[Union[Mol, str, None]]
+            molecules (Mol objects or SMILES strings)
+        n_bits: int
+            number of bits of the fingerprints
+        radius: int
+            radius of the Morgan fingerprints
+        path: str
+            path of a .npy file to memory-map the matrix from. If the file exists and was built from the same
+            molecules and fingerprint parameters (recorded in the <path>.json sidecar) it is reused, otherwise it is
+            (re)built. The matrix is kept in memory if None.
+
+        Returns
+        -------
+        PackedFingerprintMatrix:
+            packed fingerprints of the molecules
+        """
+        if n_bits <= 0:
+            raise ValueError("The number of bits of the fingerprints must be positive.")
+        shape = (n_bits, (len(mols) + 7) // 8)
+        if path is None:
+            planes = np.zeros(shape, dtype=np.uint8)
+        else:
+            metadata = cls._metadata(mols, n_bits, radius)
+            metadata_path = f'{path}.json'
+            if os.path.exists(path) and os.path.exists(metadata_path):
+                with open(metadata_path) as f:
+                    stored = json.load(f)
+                planes = np.load(path, mmap_mode='r')
+                if stored == metadata and planes.shape == shape and planes.dtype == np.uint8:
+                    return cls(planes, len(mols), radius)
+                del planes
+            if os.path.exists(metadata_path):
+                # the metadata is only (re)written once the matrix is built
+                os.remove(metadata_path)
+            planes = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=shape)
+        counts = np.zeros(len(mols), dtype=np.int32)
+        for start in range(0, len(mols), cls.BUILD_CHUNK_SIZE):
+            bits, _ = cls.fingerprints(mols[start:start + cls.BUILD_CHUNK_SIZE], n_bits, radius)
+            counts[start:start + len(bits)] = bits.sum(axis=1)
+            planes[:, start // 8:(start + len(bits) + 7) // 8] = np.packbits(bits.T, axis=1)
+        if path is None:
+            return cls(planes, len(mols), radius, counts)
+        planes.flush()
+        del planes
+        with open(metadata_path, 'w') as f:
+            json.dump(metadata, f)
+        return cls(np.load(path, mmap_mode='r'), len(mols), radius, counts)
+
+    def __len__(self):
+        return self.size
+
+    def similarities(self, mols: List[Union[Mol, str, None]], method: str = 'max'):
+        """
+        Computes the Tanimoto similarity between each molecule and the fingerprints of the matrix, reduced over the
+        fingerprints of the matrix.
+
+        Parameters
+        ----------
+        mols: List[Union[Mol, str, None]]
+            molecules to compare (Mol objects or SMILES strings)
+        method: str
+            reduction of the similarities of each molecule: 'max' or 'mean'
+
+        Returns
+        -------
+        np.ndarray:
+            similarity of each molecule (NaN for invalid molecules)
+        """
+        if method not in ('max', 'mean'):
+            raise ValueError(f"Invalid method: {method}")
+        queries, valid = self.fingerprints(mols, self.n_bits, self.radius)
+        result = np.full(len(mols), np.nan)
+        if self.size == 0:
+            return result
+        valid = np.flatnonzero(valid)
+        for start in range(0, len(valid), self.QUERY_CHUNK_SIZE):
+            chunk = valid[start:start + self.QUERY_CHUNK_SIZE]
+            result[chunk] = self._similarities(queries[chunk], method)
+        return result
+
+    def _similarities(self, queries: np.ndarray, method: str):
+        """
+        Internal method to compute the reduced Tanimoto similarities of a batch of (unpacked) fingerprints.
+        For each block of molecules of the matrix, the rows of the bits set in any fingerprint of the batch are
+        unpacked once and the intersection counts of groups of fingerprints are summed from them in a single reduction
+        (the fingerprints are sorted by number of bits set, so the groups are padded as little as possible).
+        """
+        query_counts = queries.sum(axis=1, dtype=np.int32)
+        # empty fingerprints are not similar to any fingerprint
+        result = np.zeros(len(queries))
+        order = np.argsort(query_counts, kind='stable')
+        order = order[query_counts[order] > 0]
+        if len(order) == 0:
+            return result
+        on_bits = np.flatnonzero(queries[order].any(axis=0))
+        queries, query_counts = queries[order][:, on_bits].astype(bool), query_counts[order]
+        groups = []
+        for start in range(0, len(order), self.GROUP_SIZE):
+            counts = query_counts[start:start + self.GROUP_SIZE]
+            # rows (of the unpacked block) of the bits set in each fingerprint, padded up to the largest fingerprint
+            rows = np.argsort(~queries[start:start + self.GROUP_SIZE], axis=1, kind='stable')[:, :counts[-1]]
+            padding = np.arange(counts[-1]) >= counts[:, None]
+            groups.append((slice(start, start + len(counts)), counts[:, None], rows, padding))
+        reduced = np.zeros(len(order)) if method == 'mean' else np.full(len(order), -np.inf)
+        # bytes per molecule of a block: unpacked rows, rows of a group and intersections, unions and similarities
+        for start, stop in self._blocks(len(on_bits) + self.GROUP_SIZE * (int(query_counts[-1]) + 24)):
+            n = min(stop * 8, self.size) - start * 8
+            unpacked = np.unpackbits(self.planes[on_bits, start:stop], axis=1)[:, :n]
+            counts = self.counts[start * 8:start * 8 + n]
+            for group, group_counts, rows, padding in groups:
+                bits = unpacked[rows]
+                bits[padding] = 0
+                intersection = bits.sum(axis=1, dtype=np.uint8 if rows.shape[1] < 256 else np.int32)
+                # the union is never empty (the fingerprints are not)
+                sims = intersection / (group_counts + counts - intersection)
+                if method == 'max':
+                    reduced[group] = np.maximum(reduced[group], sims.max(axis=1))
+                else:
+                    reduced[group] += sims.sum(axis=1)
+        result[order] = reduced / self.size if method == 'mean' else reduced
+        return result
@@ -0,0 +1,243 @@
+import threading
+from collections import OrderedDict
+from typing import Union, Tuple
+
+from rdkit.Chem import Mol, MolFromSmiles, MolToSmiles
+
+
+class MolCache:
+    """
+    Class to represent a Mol/SMILES interning cache.
+    Maps SMILES strings to their parsed RDKit Mol object and canonical SMILES (key), so each distinct molecule is
+    parsed only once while it is in the cache. Invalid SMILES strings are also cached (as None).
+    The cache is bounded and the least recently used entries are evicted first.
+
+    Mol objects returned by the cache are shared, so they must not be modified in place.
+    """
+
+    # default maximum number of cached molecules
+    DEFAULT_MAXSIZE = 100000
+
+    _shared = None
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        """
+        Initializes the Mol cache.
+
+        Parameters
+        ----------
+        maxsize: int
+            maximum number of cached SMILES strings (0 disables the cache)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # SMILES -> (Mol, canonical SMILES)
+        self._entries = OrderedDict()
+        # id(Mol) -> (Mol, canonical SMILES), the Mol reference keeps the id from being reused
+        self._by_mol = {}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def shared(cls):
+        """
+        Gets the process-wide Mol cache used by ChemUtils and Compound.
+
+        Returns
+        -------
+        MolCache:
+            shared Mol cache
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def get(self, smiles: str):
+        """
+        Gets the Mol object and canonical SMILES of a SMILES string, parsing it if it is not cached.
+
+        Parameters
+        ----------
+        smiles: str
+            SMILES string
+
+        Returns
+        -------
+        Tuple[Union[Mol, None], Union[str, None]]:
+            Mol object and canonical SMILES (None, None if the SMILES string is invalid)
+        """
+        with self._lock:
+            entry = self._entries.get(smiles)
+            if entry is not None:
+                self._entries.move_to_end(smiles)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        mol = MolFromSmiles(smiles)
+        entry = (mol, MolToSmiles(mol)) if mol is not None else (None, None)
+        if self.maxsize <= 0:
+            return entry
+        with self._lock:
+            if entry[0] is not None:
+                # the canonical form of a molecule shares the entry of the string it was parsed from
+                entry = self._entries.get(entry[1], entry)
+                self._put(entry[1], entry)
+            self._put(smiles, entry)
+        return entry
+
+    def mol(self, smiles: str):
+        """
+        Gets the (shared) Mol object of a SMILES string.
+
+        Parameters
+        ----------
+        smiles: str
+            SMILES string
+
+        Returns
+        -------
+        Union[Mol, None]:
+            Mol object (None if the SMILES string is invalid)
+        """
+        return self.get(smiles)[0]
+
+    def canonical(self, smiles: str):
+        """
+        Gets the canonical SMILES of a SMILES string.
+
+        Parameters
+        ----------
+        smiles: str
+            SMILES string
+
+        Returns
+        -------
+        Union[str, None]:
+            canonical SMILES string (None if the SMILES string is invalid)
+        """
+        return self.get(smiles)[1]
+
+    def to_smiles(self, mol: Mol):
+        """
+        Gets the canonical SMILES of a Mol object, reusing the cached SMILES if the Mol object was obtained from the
+        cache.
+
+        Parameters
+        ----------
+        mol: Mol
+            RDKit Mol object
+
+        Returns
+        -------
+        str:
+            canonical SMILES string
+        """
+        with self._lock:
+            entry = self._by_mol.get(id(mol))
+            if entry is not None and entry[0] is mol:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        return MolToSmiles(mol)
+
+    def intern(self, mol: Mol, smiles: str = None):
+        """
+        Adds a Mol object (e.g. a reaction product) to the cache.
+        If the molecule is already cached the cached Mol object is returned instead, so equal molecules share the same
+        Mol object.
+
+        Parameters
+        ----------
+        mol: Mol
+            sanitized RDKit Mol object
+        smiles: str
+            canonical SMILES of the Mol object (computed if not provided)
+
+        Returns
+        -------
+        Tuple[Mol, str]:
+            interned Mol object and its canonical SMILES
+        """
+        if smiles is None:
+            smiles = MolToSmiles(mol)
+        with self._lock:
+            entry = self._entries.get(smiles)
+            if entry is not None and entry[0] is not None:
+                self._entries.move_to_end(smiles)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            entry = (mol, smiles)
+            if self.maxsize > 0:
+                self._put(smiles, entry)
+        return entry
+
+    def _put(self, smiles: str, entry: Tuple[Union[Mol, None], Union[str, None]]):
+        """
+        Internal method to add an entry to the cache, evicting the least recently used entries if needed.
+
+        Parameters
+        ----------
+        smiles: str
+            SMILES string
+        entry: Tuple[Union[Mol, None], Union[str, None]]
+            Mol object and canonical SMILES of the SMILES string
+        """
+        self._entries[smiles] = entry
+        self._entries.move_to_end(smiles)
+        if entry[0] is not None:
+            self._by_mol[id(entry[0])] = entry
+        self._evict()
+
+    def _evict(self):
+        """
+        Internal method to evict the least recently used entries until the cache fits its maximum size.
+        """
+        while len(self._entries) > max(self.maxsize, 0):
+            smiles, (mol, key) = self._entries.popitem(last=False)
+            # the Mol object stays reachable by identity while its canonical entry is cached
+            if mol is not None and smiles == key:
+                self._by_mol.pop(id(mol), None)
+
+    def resize(self, maxsize: int):
+        """
+        Changes the maximum size of the cache, evicting entries if needed.
+
+        Parameters
+        ----------
+        maxsize: int
+            new maximum number of cached SMILES strings
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        """
+        Removes all entries and resets the statistics of the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._by_mol.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Gets the cache statistics.
+
+        Returns
+        -------
+        dict:
+            number of hits, misses, hit rate, current size and maximum size of the cache
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hits / total if total > 0 else 0.0,
+                    'size': len(self._entries),
+                    'maxsize': self.maxsize}
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,220 @@
+from abc import ABC, abstractmethod
+from typing import List, Union, Dict, Tuple
+
+from rdkit.Chem import Mol, SanitizeMol, Descriptors, GetPeriodicTable
+
+
+class ProductFilter(ABC):
+    """
+    Base class for all Product Filters.
+    Product Filters check if a reaction product (RDKit Mol object) is valid.
+    """
+
+    # whether the filter needs a sanitized Mol object
+    requires_sanitization = True
+
+    @abstractmethod
+    def __call__(self, mol: Mol):
+        """
+        Checks if a product is valid.
+        Child classes should implement this method.
+
+        Parameters
+        ----------
+        mol: Mol
+            RDKit Mol object of the product
+
+        Returns
+        -------
+        bool:
+            True if the product passes the filter, False otherwise.
+        """
+        raise NotImplementedError
+
+
+class WildcardAtomsFilter(ProductFilter):
+    """
+    Rejects products with wildcard (dummy) atoms.
+    """
+
+    requires_sanitization = False
+
+    def __call__(self, mol: Mol):
+        return not any(atom.GetAtomicNum() == 0 for atom in mol.GetAtoms())
+
+
+class MinAtomsFilter(ProductFilter):
+    """
+    Rejects products with less than a minimum number of heavy atoms.
+    """
+
+    requires_sanitization = False
+
+    def __init__(self, min_atoms: int = 4):
+        """
+        Initializes the filter.
+
+        Parameters
+        ----------
+        min_atoms: int
+            minimum number of atoms of the product
+        """
+        self.min_atoms = min_atoms
+
+    def __call__(self, mol: Mol):
+        return mol.GetNumHeavyAtoms() >= self.min_atoms
+
+
+class RequiredElementsFilter(ProductFilter):
+    """
+    Rejects products that do not contain all the required elements.
+    """
+
+    requires_sanitization = False
+
+    def __init__(self, elements: List[str] = ('C',)):
+        """
+        Initializes the filter.
+
+        Parameters
+        ----------
+        elements: List[str]
+            symbols of the elements that must be present in the product
+        """
+        periodic_table = GetPeriodicTable()
+        self.atomic_numbers = frozenset(periodic_table.GetAtomicNumber(element) for element in elements)
+
+    def __call__(self, mol: Mol):
+        return self.atomic_numbers.issubset(atom.GetAtomicNum() for atom in mol.GetAtoms())
+
+
+class PropertyWindowFilter(ProductFilter):
+    """
+    Rejects products with a molecular property (RDKit descriptor) outside a window.
+    """
+
+    def __init__(self, descriptor: str, min_value: float = None, max_value: float = None):
+        """
+        Initializes the filter.
+
+        Parameters
+        ----------
+        descriptor: str
+            name of the RDKit descriptor (see rdkit.Chem.Descriptors, e.g. 'MolWt', 'MolLogP', 'TPSA')
+        min_value: float
+            minimum value of the property (no lower bound if None)
+        max_value: float
+            maximum value of the property (no upper bound if None)
+        """
+        if not hasattr(Descriptors, descriptor):
+            raise ValueError(f"Unknown RDKit descriptor: {descriptor}")
+        self.descriptor = descriptor
+        self.function = getattr(Descriptors, descriptor)
+        self.min_value = float('-inf') if min_value is None else min_value
+        self.max_value = float('inf') if max_value is None else max_value
+
+    def __call__(self, mol: Mol):
+        try:
+            return self.min_value <= self.function(mol) <= self.max_value
+        except Exception:
+            return False
+
+
+class ProductFilterChain:
+    """
+    Class to represent a chain of Product Filters.
+    Filters that do not need a sanitized molecule run first, then the product is sanitized (in place) and the
+    remaining filters are applied. The chain stops at the first filter that rejects the product.
+    """
+
+    def __init__(self, filters: List[ProductFilter]):
+        """
+        Initializes the Product Filter chain.
+
+        Parameters
+        ----------
+        filters: List[ProductFilter]
+            filters to apply (in order, filters that do not require sanitization are applied first)
+        """
+        self.filters = list(filters)
+        self._pre_sanitization = tuple(f for f in self.filters if not f.requires_sanitization)
+        self._post_sanitization = tuple(f for f in self.filters if f.requires_sanitization)
+
+    @staticmethod
+    def from_configs(configs: dict):
+        """
+        Builds the Product Filter chain from the configurations of the experiment.
+
+        Parameters
+        ----------
+        configs: dict
+            configurations of the experiment (keys 'product_min_atoms', 'product_required_elements' and
+            'product_property_windows', e.g. {'MolWt': [None, 1000]})
+
+        Returns
+        -------
+        ProductFilterChain:
+            Product Filter chain
+        """
+        return ProductFilterChain.build(min_atoms=configs.get('product_min_atoms', 4),
+                                        required_elements=configs.get('product_required_elements', ['C']),
+                                        property_windows=configs.get('product_property_windows', None))
+
+    @staticmethod
+    def build(min_atoms: int = 4,
+              required_elements: List[str] = ('C',),
+              property_windows: Union[Dict[str, Tuple[float, float]], None] = None):
+        """
+        Builds a Product Filter chain with the wildcard atoms, minimum atoms, required elements and property
+        windows filters.
+        The default chain accepts the same products as ChemUtils.valid_product.
+
+        Parameters
+        ----------
+        min_atoms: int
+            minimum number of atoms of the products
+        required_elements: List[str]
+            symbols of the elements that must be present in the products
+        property_windows: Union[Dict[str, Tuple[float, float]], None]
+            minimum and maximum values of RDKit descriptors
+
+        Returns
+        -------
+        ProductFilterChain:
+            Product Filter chain
+        """
+        filters = [WildcardAtomsFilter(), MinAtomsFilter(min_atoms)]
+        if required_elements:
+            filters.append(RequiredElementsFilter(required_elements))
+        if property_windows:
+            filters.extend(PropertyWindowFilter(descriptor, *window) for descriptor, window in property_windows.items())
+        return ProductFilterChain(filters)
+
+    def __call__(self, mol: Mol, sanitized: bool = False):
+        """
+        Checks if a product passes all filters.
+
+        Parameters
+        ----------
+        mol: Mol
+            RDKit Mol object of the product (sanitized in place if not yet sanitized)
+        sanitized: bool
+            whether the Mol object is already sanitized
+
+        Returns
+        -------
+        bool:
+            True if the product is valid, False otherwise.
+        """
+        for product_filter in self._pre_sanitization:
+            if not product_filter(mol):
+                return False
+        if not sanitized:
+            try:
+                SanitizeMol(mol)
+            except Exception:
+                return False
+        for product_filter in self._post_sanitization:
+            if not product_filter(mol):
+                return False
+        return True
@@ -0,0 +1,197 @@
+import threading
+from collections import OrderedDict
+from typing import List, Union
+
+
+class ReactionOutcomeMemo:
+    """
+    Class to represent a memo of reaction outcomes.
+    Stores the (deduplicated, valid) products SMILES of applying a reaction rule to a compound, keyed by the canonical
+    SMILES of the compound and the rule id. Pairings that do not produce products are also stored (negative caching).
+    Compounds for which all applicable rules are known to fail can be flagged as dead ends.
+    The memo is bounded (maxsize outcomes, maxsize failed rule ids over all compounds and maxsize dead ends) and the
+    least recently used entries are evicted first.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        """
+        Initializes the reaction outcome memo.
+
+        Parameters
+        ----------
+        maxsize: int
+            maximum number of stored outcomes (and of failed rule ids tracked over all compounds and of dead ends)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.dead_end_hits = 0
+        # (compound key, rule id) -> products SMILES
+        self._outcomes = OrderedDict()
+        # compound key -> ids of the rules known to fail
+        self._failures = OrderedDict()
+        self._n_failed_rules = 0
+        # compound keys of the dead ends (in least recently used order)
+        self._dead_ends = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, rule_id: Union[str, int]):
+        """
+        Gets the stored outcome of applying a reaction rule to a compound.
+
+        Parameters
+        ----------
+        key: str
+            canonical SMILES of the compound
+        rule_id: Union[str, int]
+            reaction rule id
+
+        Returns
+        -------
+        Union[Tuple[str], None]:
+            products SMILES (empty if the rule does not produce products) or None if the outcome is unknown
+        """
+        with self._lock:
+            outcome = self._outcomes.get((key, rule_id))
+            if outcome is None:
+                self.misses += 1
+                return None
+            self._outcomes.move_to_end((key, rule_id))
+            self.hits += 1
+            if len(outcome) == 0:
+                self.negative_hits += 1
+            return outcome
+
+    def put(self, key: str, rule_id: Union[str, int], products: List[str]):
+        """
+        Stores the outcome of applying a reaction rule to a compound.
+
+        Parameters
+        ----------
+        key: str
+            canonical SMILES of the compound
+        rule_id: Union[str, int]
+            reaction rule id
+        products: List[str]
+            products SMILES (empty if the rule does not produce products)
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._outcomes[(key, rule_id)] = tuple(products)
+            self._outcomes.move_to_end((key, rule_id))
+            while len(self._outcomes) > self.maxsize:
+                self._outcomes.popitem(last=False)
+            if len(products) == 0:
+                failures = self._failures.get(key)
+                if failures is None:
+                    failures = self._failures[key] = set()
+                if rule_id not in failures:
+                    failures.add(rule_id)
+                    self._n_failed_rules += 1
+                self._failures.move_to_end(key)
+                # the failures of the least recently used compounds are evicted first
+                while self._n_failed_rules > self.maxsize:
+                    _, evicted = self._failures.popitem(last=False)
+                    self._n_failed_rules -= len(evicted)
+
+    def n_failures(self, key: str):
+        """
+        Gets the number of distinct reaction rules known to fail for a compound.
+
+        Parameters
+        ----------
+        key: str
+            canonical SMILES of the compound
+
+        Returns
+        -------
+        int:
+            number of failed rules
+        """
+        with self._lock:
+            return len(self._failures.get(key, ()))
+
+    def mark_dead_end(self, key: str):
+        """
+        Flags a compound as a dead end (no applicable rule produces products).
+
+        Parameters
+        ----------
+        key: str
+            canonical SMILES of the compound
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._dead_ends[key] = True
+            self._dead_ends.move_to_end(key)
+            while len(self._dead_ends) > self.maxsize:
+                self._dead_ends.popitem(last=False)
+            self._n_failed_rules -= len(self._failures.pop(key, ()))
+
+    def is_dead_end(self, key: str):
+        """
+        Checks if a compound was flagged as a dead end.
+
+        Parameters
+        ----------
+        key: str
+            canonical SMILES of the compound
+
+        Returns
+        -------
+        bool:
+            True if the compound is a dead end, False otherwise
+        """
+        with self._lock:
+            if key in self._dead_ends:
+                self._dead_ends.move_to_end(key)
+                self.dead_end_hits += 1
+                return True
+            return False
+
+    def stats(self):
+        """
+        Gets the memo statistics.
+
+        Returns
+        -------
+        dict:
+            number of hits (and negative hits), misses, hit rate, stored outcomes, dead ends and dead end hits
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits,
+                    'negative_hits': self.negative_hits,
+                    'misses': self.misses,
+                    'hit_rate': self.hits / total if total > 0 else 0.0,
+                    'size': len(self._outcomes),
+                    'maxsize': self.maxsize,
+                    'dead_ends': len(self._dead_ends),
+                    'dead_end_hits': self.dead_end_hits}
+
+    def clear(self):
+        """
+        Removes all outcomes and dead ends and resets the statistics of the memo.
+        """
+        with self._lock:
+            self._outcomes.clear()
+            self._failures.clear()
+            self._n_failed_rules = 0
+            self._dead_ends.clear()
+            self.hits = self.negative_hits = self.misses = self.dead_end_hits = 0
+
+    def __len__(self):
+        return len(self._outcomes)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # locks can not be pickled
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
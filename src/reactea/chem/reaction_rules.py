@@ -1,18 +1,31 @@
-import uuid
 from typing import Union, List
 
+import numpy as np
+from rdkit.Chem import MolFromSmiles
 from rdkit.Chem.rdChemReactions import ReactionFromSmarts, ChemicalReaction, ReactionToSmarts
 
-from reactea.chem import Compound
+from reactea.chem.chem_utils import ChemUtils
 
 
 class ReactionRule:
     """
     Class to represent Reaction Rules.
     Each Reaction Rule is characterized by an id, smarts string, ChemicalReaction object and possible coreactants ids.
+    Coreactants are parsed only once per rule and reused as templates every time the rule is applied.
+    Lazy Reaction Rules keep the SMARTS string (or serialized reaction) and only compile the ChemicalReaction the first
+    time it is accessed.
     """
 
-    def __init__(self, smarts: str, rule_id: Union[str, int], reactants: Union[str, None] = 'Any'):
+    # size of the reactant templates pattern fingerprints
+    TEMPLATE_FP_SIZE = 2048
+
+    def __init__(self,
+                 smarts: str,
+                 rule_id: Union[str, int],
+                 reactants: Union[str, None] = 'Any',
+                 reaction: Union[ChemicalReaction, bytes, None] = None,
+                 template_fingerprint: Union[np.ndarray, None] = None,
+                 lazy: bool = False):
         """
         Initializes the Reaction Rule.
 
@@ -24,6 +37,13 @@ class ReactionRule:
             Reaction Rule id.
         reactants: Union[str, None]
             Reaction Rule reactants.
+        reaction: Union[ChemicalReaction, bytes, None]
+            Already compiled ChemicalReaction of the SMARTS string or its binary serialization (e.g. loaded from a
+            rule store). If not provided the SMARTS string is parsed.
+        template_fingerprint: Union[np.ndarray, None]
+            Already computed reactant templates fingerprint (see template_fingerprint).
+        lazy: bool
+            whether to compile the ChemicalReaction only when it is first accessed (True) or right away (False).
         """
         self._smarts = smarts
         self._rule_id = rule_id
@@ -31,7 +51,18 @@ class ReactionRule:
             self._reactants = 'Any'
         else:
             self._reactants = reactants
-        self._reaction = self._to_reaction()
+        self._coreactants = None
+        self._template_fingerprint = template_fingerprint
+        if isinstance(reaction, ChemicalReaction):
+            self._serialized_reaction = None
+            self._reaction = reaction
+            self._compiled = True
+        else:
+            self._serialized_reaction = reaction
+            self._reaction = None
+            self._compiled = False
+            if not lazy:
+                self._compile()
 
     @property
     def smarts(self):
@@ -58,7 +89,10 @@ class ReactionRule:
 
         """
         self._smarts = new_smarts
-        self._reaction = self._to_reaction()
+        self._serialized_reaction = None
+        self._compiled = False
+        self._compile()
+        self._template_fingerprint = None
 
     @property
     def rule_id(self):
@@ -94,6 +128,8 @@ class ReactionRule:
         ChemicalReaction:
             Reaction Rule' RDKit ChemicalReaction object.
         """
+        if not self._compiled:
+            self._compile()
         return self._reaction
 
     @reaction.setter
@@ -108,7 +144,10 @@ class ReactionRule:
             New Reaction Rule' ChemicalReaction object.
         """
         self._reaction = new_reaction
+        self._serialized_reaction = None
+        self._compiled = True
         self._smarts = self._to_smarts()
+        self._template_fingerprint = None
 
     @property
     def reactants(self):
@@ -140,20 +179,146 @@ class ReactionRule:
         """
         raise ValueError("Coreactants information should not be modified!")
 
+    @property
+    def serialized_reaction(self):
+        """
+        Reaction Rule' ChemicalReaction in binary form (taken from the serialized reaction if it was not compiled yet).
+
+        Returns
+        -------
+        bytes:
+            serialized ChemicalReaction (empty if the reaction is invalid).
+        """
+        if not self._compiled and self._serialized_reaction is not None:
+            return bytes(self._serialized_reaction)
+        return self.reaction.ToBinary() if self.reaction is not None else b''
+
+    @property
+    def compiled(self):
+        """
+        Whether the Reaction Rule' ChemicalReaction was already compiled.
+
+        Returns
+        -------
+        bool:
+            True if the reaction was compiled, False otherwise.
+        """
+        return self._compiled
+
+    @staticmethod
+    def n_compiled(reaction_rules: List['ReactionRule']):
+        """
+        Number of Reaction Rules of a list whose ChemicalReactions were compiled (in this process).
+
+        Parameters
+        ----------
+        reaction_rules: List[ReactionRule]
+            reaction rules (e.g. the rules loaded for a run).
+
+        Returns
+        -------
+        int:
+            number of compiled reactions.
+        """
+        return sum(rule.compiled for rule in reaction_rules)
+
+    def _compile(self):
+        """
+        Internal method to compile the Reaction Rule' ChemicalReaction and memoize it.
+        """
+        self._reaction = self._to_reaction()
+        self._serialized_reaction = None
+        self._compiled = True
+
     def _to_reaction(self):
         """
-        Internal method to convert SMARTS strings to ChemicalReaction objects.
+        Internal method to convert SMARTS strings (or serialized reactions) to ChemicalReaction objects.
 
         Returns
         -------
         ChemicalReaction:
             Converted ChemicalReaction object.
         """
+        if self._serialized_reaction is not None:
+            try:
+                return ChemicalReaction(bytes(self._serialized_reaction))
+            except RuntimeError:
+                return None
         try:
             return ReactionFromSmarts(self._smarts)
         except ValueError:
             return None
 
+    @property
+    def coreactants(self):
+        """
+        Reaction Rule' coreactants as RDKit Mol templates.
+        Coreactants are parsed and sanitized on first access and then reused.
+
+        Returns
+        -------
+        List[Union[Mol, None]]:
+            coreactants Mol objects (None in the positions of the Any field).
+        """
+        if self._coreactants is None:
+            self._coreactants = self._to_coreactants()
+        return self._coreactants
+
+    @property
+    def template_fingerprint(self):
+        """
+        Pattern fingerprint of the reactant templates filled by the compound being mutated (Any positions) packed
+        into 64-bit words.
+        A compound can only match the rule if all the bits of this fingerprint are set in its own pattern fingerprint.
+
+        Returns
+        -------
+        Union[np.ndarray, None]:
+            packed fingerprint (all bits unset if the templates can not be fingerprinted) or None if the rule' reaction
+            is invalid.
+        """
+        if self._template_fingerprint is None:
+            self._template_fingerprint = self._to_template_fingerprint()
+        return self._template_fingerprint if self._template_fingerprint.size > 0 else None
+
+    def _to_template_fingerprint(self):
+        """
+        Internal method to compute the pattern fingerprint of the reactant templates in the Any positions.
+
+        Returns
+        -------
+        np.ndarray:
+            packed fingerprint (empty if the reaction is invalid).
+        """
+        if self.reaction is None:
+            return np.zeros(0, dtype='<u8')
+        fingerprint = np.zeros(self.TEMPLATE_FP_SIZE // 64, dtype='<u8')
+        try:
+            self.reaction.Initialize()
+            slots = self.reactants.split(';')
+            if len(slots) != self.reaction.GetNumReactantTemplates():
+                return fingerprint
+            for i, slot in enumerate(slots):
+                if slot == 'Any':
+                    template = self.reaction.GetReactantTemplate(i)
+                    template.UpdatePropertyCache(strict=False)
+                    fingerprint |= ChemUtils.packed_pattern_fingerprint(template, self.TEMPLATE_FP_SIZE)
+            return fingerprint
+        except Exception:
+            return np.zeros(self.TEMPLATE_FP_SIZE // 64, dtype='<u8')
+
+    def _to_coreactants(self):
+        """
+        Internal method to convert the coreactants SMILES strings into RDKit Mol objects.
+
+        Returns
+        -------
+        List[Union[Mol, None]]:
+            Converted Mol objects (None in the positions of the Any field).
+        """
+        return [None if r == 'Any' else MolFromSmiles(ChemUtils.canonicalize_smiles(r))
+                for r in self.reactants.split(';')]
+
     def _to_smarts(self):
         """
         Internal method to convert ChemicalReaction objects into SMARTS strings.
@@ -165,6 +330,13 @@ class ReactionRule:
         """
         return ReactionToSmarts(self._reaction)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # serialized reactions may be views of a memory-mapped rule store
+        if state['_serialized_reaction'] is not None:
+            state['_serialized_reaction'] = bytes(state['_serialized_reaction'])
+        return state
+
     def reactants_to_mol_list(self, compound):
         """
         Converts the Reaction Rule' reactants into a list of RDKit molecules. The Any field is replaced by the provided
@@ -180,13 +352,8 @@ class ReactionRule:
         reactants: List[Mol]
             List of reactants as RDKit molecules.
         """
-        reactants = []
-        for r in self.reactants.split(';'):
-            if r == 'Any':
-                reactants.append(compound.mol)
-            else:
-                random_id = uuid.uuid4().hex
-                reactants.append(Compound(r, random_id).mol)
+        reactants = [compound.mol if r == 'Any' else coreactant
+                     for r, coreactant in zip(self.reactants.split(';'), self.coreactants)]
         if len(reactants) == 1:
             return reactants[0]
         return reactants
@@ -0,0 +1,246 @@
+import threading
+from collections import OrderedDict
+from typing import List, Union
+
+import numpy as np
+from rdkit.Chem import Mol, MolToSmarts
+
+from reactea.chem.chem_utils import ChemUtils
+from reactea.chem.compounds import Compound
+from reactea.chem.reaction_rules import ReactionRule
+
+
+class RuleApplicabilityIndex:
+    """
+    Class to represent a Reaction Rule applicability index.
+    Each Reaction Rule is represented by the pattern fingerprint of the reactant template(s) that the compound being
+    mutated has to match (the 'Any' positions). A compound can only react with a rule if all the bits required by the
+    rule are set in the compound' pattern fingerprint, which allows to screen a compound against all rules at once.
+    """
+
+    def __init__(self, reaction_rules: List[ReactionRule]):
+        """
+        Initializes the Reaction Rule applicability index.
+
+        Parameters
+        ----------
+        reaction_rules: List[ReactionRule]
+            pool of reaction rules to index (the index follows the order of the list)
+        """
+        self.fp_size = ReactionRule.TEMPLATE_FP_SIZE
+        self.n_rules = len(reaction_rules)
+        self._required_bits = np.zeros((self.n_rules, self.fp_size // 64), dtype='<u8')
+        # rules that can never fire (invalid reactions)
+        self._invalid = np.zeros(self.n_rules, dtype=bool)
+        for i, rule in enumerate(reaction_rules):
+            fingerprint = rule.template_fingerprint
+            if fingerprint is None:
+                self._invalid[i] = True
+            else:
+                self._required_bits[i] = fingerprint
+
+    def screen(self, compound: Union[Compound, Mol]):
+        """
+        Screens a compound against all indexed Reaction Rules in one vectorized pass.
+        Rules that are screened out cannot produce products for the compound, rules that pass the screen may.
+
+        Parameters
+        ----------
+        compound: Union[Compound, Mol]
+            compound to screen
+
+        Returns
+        -------
+        np.ndarray:
+            boolean mask with the rules that may be applied to the compound
+        """
+        mol = compound.mol if isinstance(compound, Compound) else compound
+        if mol is None:
+            return np.zeros(self.n_rules, dtype=bool)
+        cmp_bits = ChemUtils.packed_pattern_fingerprint(mol, self.fp_size)
+        missing_bits = self._required_bits & ~cmp_bits
+        mask = ~missing_bits.any(axis=1)
+        return mask & ~self._invalid
+
+    def applicable_rules(self, compound: Union[Compound, Mol]):
+        """
+        Gets the positions of the Reaction Rules that pass the screen for a compound.
+
+        Parameters
+        ----------
+        compound: Union[Compound, Mol]
+            compound to screen
+
+        Returns
+        -------
+        np.ndarray:
+            positions of the rules that may be applied to the compound
+        """
+        return np.flatnonzero(self.screen(compound))
+
+    def __len__(self):
+        return self.n_rules
+
+
+class ReactantTemplateGroups:
+    """
+    Class to represent groups of Reaction Rules that share the same reactant templates.
+    Many rules have the same left-hand side (the templates filled by the compound being mutated, compared without atom
+    maps) and only differ in their products. The templates of a group are matched once per compound: if the compound
+    does not match them, none of the rules of the group can produce products and they are not applied.
+    Rules are assigned to their group the first time they are checked (so lazy rules are not compiled up front) and
+    match results are kept for the most recently seen compounds.
+    """
+
+    def __init__(self, reaction_rules: List[ReactionRule], maxsize: int = 1000):
+        """
+        Initializes the reactant template groups.
+
+        Parameters
+        ----------
+        reaction_rules: List[ReactionRule]
+            pool of reaction rules to group (positions follow the order of the list)
+        maxsize: int
+            maximum number of compounds whose match results are kept
+        """
+        self.reaction_rules = reaction_rules
+        self.n_rules = len(reaction_rules)
+        self.maxsize = maxsize
+        # group of each rule (-1 for rules whose templates can not be matched on their own, -2 if not yet grouped)
+        self.group_of = np.full(self.n_rules, -2, dtype=np.int64)
+        self._templates = []
+        self._keys = {}
+        self.skipped = 0
+        self.matched = 0
+        # compound key -> {group: match result}
+        self._matches = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _any_templates(rule: ReactionRule):
+        """
+        Internal method to get the reactant templates of a rule filled by the compound (Any positions), without atom
+        maps.
+
+        Parameters
+        ----------
+        rule: ReactionRule
+            reaction rule
+
+        Returns
+        -------
+        Union[List[Mol], None]:
+            reactant templates (None if the reaction is invalid or the reactants do not match the templates)
+        """
+        if rule.reaction is None:
+            return None
+        try:
+            rule.reaction.Initialize()
+            slots = rule.reactants.split(';')
+            if len(slots) != rule.reaction.GetNumReactantTemplates():
+                return None
+            templates = []
+            for i, slot in enumerate(slots):
+                if slot == 'Any':
+                    template = Mol(rule.reaction.GetReactantTemplate(i))
+                    for atom in template.GetAtoms():
+                        atom.SetAtomMapNum(0)
+                    template.UpdatePropertyCache(strict=False)
+                    templates.append(template)
+            return templates if len(templates) > 0 else None
+        except Exception:
+            return None
+
+    def _group(self, idx: int):
+        """
+        Internal method to find (or create) the group of a rule.
+
+        Parameters
+        ----------
+        idx: int
+            position of the reaction rule
+
+        Returns
+        -------
+        int:
+            group of the rule (-1 if the rule is not grouped)
+        """
+        templates = self._any_templates(self.reaction_rules[idx])
+        if templates is None:
+            return -1
+        key = tuple(MolToSmarts(template) for template in templates)
+        if key not in self._keys:
+            self._keys[key] = len(self._templates)
+            self._templates.append(templates)
+        return self._keys[key]
+
+    def matches(self, compound: Compound, idx: int):
+        """
+        Checks if a compound matches the reactant templates of a rule (matching the group templates only once).
+        Rules that do not match can not produce products, rules that match may.
+
+        Parameters
+        ----------
+        compound: Compound
+            compound being mutated
+        idx: int
+            position of the reaction rule
+
+        Returns
+        -------
+        bool:
+            False if the rule can not produce products for the compound, True otherwise
+        """
+        with self._lock:
+            group = self.group_of[idx]
+            if group == -2:
+                group = self.group_of[idx] = self._group(idx)
+            if group < 0:
+                return True
+            compound_matches = self._matches.get(compound.key)
+            if compound_matches is None:
+                compound_matches = self._matches[compound.key] = {}
+                while len(self._matches) > self.maxsize:
+                    self._matches.popitem(last=False)
+            else:
+                self._matches.move_to_end(compound.key)
+            match = compound_matches.get(group)
+            if match is None:
+                mol = compound.mol
+                match = mol is not None and all(mol.HasSubstructMatch(template) for template in self._templates[group])
+                compound_matches[group] = match
+                self.matched += 1
+            if not match:
+                self.skipped += 1
+            return match
+
+    def stats(self):
+        """
+        Gets the groups statistics.
+
+        Returns
+        -------
+        dict:
+            number of rules, groups (of the rules grouped so far), average group size, template matches performed and
+            rule applications skipped
+        """
+        n_grouped = int((self.group_of >= 0).sum())
+        n_groups = len(self._templates)
+        return {'rules': self.n_rules,
+                'groups': n_groups,
+                'average_group_size': n_grouped / n_groups if n_groups > 0 else 0.0,
+                'matched': self.matched,
+                'skipped': self.skipped}
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # locks can not be pickled
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -0,0 +1,290 @@
+import random
+from abc import ABC, abstractmethod
+from types import ModuleType
+from typing import List, Union, Dict
+
+import numpy as np
+import pandas as pd
+
+from reactea.chem.reaction_rules import ReactionRule
+from reactea.chem.rule_statistics import RuleStatistics
+
+
+class RuleSampler(ABC):
+    """
+    Base class for all Rule Samplers.
+    Rule Samplers draw positions of reaction rules (without replacement) lazily: a position is only drawn when the
+    mutation needs to try another rule.
+    """
+
+    def __init__(self, n_rules: int):
+        """
+        Initializes the Rule Sampler.
+
+        Parameters
+        ----------
+        n_rules: int
+            number of reaction rules
+        """
+        self.n_rules = n_rules
+
+    @abstractmethod
+    def sample(self, k: int, rng: Union[random.Random, ModuleType] = random):
+        """
+        Draws up to k distinct reaction rules positions.
+        Child classes should implement this method.
+
+        Parameters
+        ----------
+        k: int
+            maximum number of positions to draw
+        rng: Union[random.Random, ModuleType]
+            random number generator to use
+
+        Returns
+        -------
+        Iterator[int]:
+            positions of the reaction rules (in the order they should be tried)
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def from_configs(reaction_rules: List[ReactionRule],
+                     configs: dict,
+                     statistics: Union[RuleStatistics, None] = None):
+        """
+        Builds the Rule Sampler from the configurations of the experiment.
+
+        Parameters
+        ----------
+        reaction_rules: List[ReactionRule]
+            pool of reaction rules
+        configs: dict
+            configurations of the experiment (keys 'rule_selection' ('uniform', 'ucb' or 'thompson'),
+            'rule_exploration' and 'rule_priorities' (a dictionary of rule ids to priorities or the path to a TSV file
+            with the 'rule_id' and 'priority' columns, used by the uniform selection))
+        statistics: Union[RuleStatistics, None]
+            reaction rules statistics (required by the 'ucb' and 'thompson' selections)
+
+        Returns
+        -------
+        RuleSampler:
+            bandit Rule Sampler for the 'ucb' and 'thompson' selections, weighted Rule Sampler if rule priorities are
+            provided and uniform Rule Sampler otherwise
+        """
+        selection = configs.get('rule_selection', 'uniform')
+        if selection != 'uniform':
+            if statistics is None:
+                raise ValueError(f"The '{selection}' rule selection requires the reaction rules statistics.")
+            return BanditRuleSampler(statistics, selection, configs.get('rule_exploration', 1.0))
+        priorities = configs.get('rule_priorities', None)
+        if priorities is None:
+            return UniformRuleSampler(len(reaction_rules))
+        if isinstance(priorities, str):
+            priorities_df = pd.read_csv(priorities, header=0, sep='\t', dtype={'rule_id': str})
+            priorities = dict(zip(priorities_df['rule_id'], priorities_df['priority']))
+        return WeightedRuleSampler.from_priorities(reaction_rules, priorities)
+
+
+class UniformRuleSampler(RuleSampler):
+    """
+    Draws reaction rules uniformly with an incremental Fisher-Yates shuffle.
+    Only the swapped positions are stored (in a dictionary), so drawing k rules takes O(k) time and memory.
+    """
+
+    def sample(self, k: int, rng: Union[random.Random, ModuleType] = random):
+        # swapped[i] is the rule at position i of the (virtual) shuffled array, if it is not i itself
+        swapped = {}
+        for i in range(min(k, self.n_rules)):
+            j = rng.randrange(i, self.n_rules)
+            picked = swapped.get(j, j)
+            swapped[j] = swapped.pop(i, i)
+            yield picked
+
+
+class WeightedRuleSampler(RuleSampler):
+    """
+    Draws reaction rules with probability proportional to their priorities.
+    Priorities are stored (as integers, so sums are exact) in a Fenwick tree: each draw takes O(log n) time. Drawn rules
+    are removed from the tree until the draw is over (the iterator is exhausted or closed), so only one draw can be
+    active at a time.
+    """
+
+    # resolution of the priorities (the highest priority is mapped to this integer weight)
+    RESOLUTION = 2 ** 32
+
+    def __init__(self, weights: List[float]):
+        """
+        Initializes the Weighted Rule Sampler.
+
+        Parameters
+        ----------
+        weights: List[float]
+            non-negative priority of each reaction rule (rules with priority 0 are never drawn)
+        """
+        super(WeightedRuleSampler, self).__init__(len(weights))
+        if any(w < 0 for w in weights):
+            raise ValueError("Reaction rules priorities must be non-negative.")
+        max_weight = max(weights, default=0)
+        if max_weight <= 0:
+            raise ValueError("At least one reaction rule must have a positive priority.")
+        # positive priorities are never rounded down to 0
+        self._weights = [max(1, round(w / max_weight * self.RESOLUTION)) if w > 0 else 0 for w in weights]
+        self.n_positive = sum(1 for w in self._weights if w > 0)
+        self._total = sum(self._weights)
+        self._tree = [0] * (self.n_rules + 1)
+        for i, w in enumerate(self._weights, start=1):
+            self._tree[i] += w
+            parent = i + (i & -i)
+            if parent <= self.n_rules:
+                self._tree[parent] += self._tree[i]
+        self._top_bit = 1 << (self.n_rules.bit_length() - 1) if self.n_rules > 0 else 0
+
+    @staticmethod
+    def from_priorities(reaction_rules: List[ReactionRule], priorities: Dict[Union[str, int], float],
+                        default: float = 1.0):
+        """
+        Builds a Weighted Rule Sampler from the priorities of the reaction rules.
+
+        Parameters
+        ----------
+        reaction_rules: List[ReactionRule]
+            pool of reaction rules
+        priorities: Dict[Union[str, int], float]
+            priority of each reaction rule id
+        default: float
+            priority of the reaction rules without a priority
+
+        Returns
+        -------
+        WeightedRuleSampler:
+            Weighted Rule Sampler
+        """
+        priorities = {str(rule_id): priority for rule_id, priority in priorities.items()}
+        return WeightedRuleSampler([priorities.get(str(rule.rule_id), default) for rule in reaction_rules])
+
+    def _update(self, idx: int, delta: int):
+        """
+        Internal method to add delta to the weight of a reaction rule in the Fenwick tree.
+        """
+        i = idx + 1
+        while i <= self.n_rules:
+            self._tree[i] += delta
+            i += i & -i
+
+    def _find(self, value: int):
+        """
+        Internal method to find the reaction rule whose cumulative weight range contains value.
+        """
+        position = 0
+        bit = self._top_bit
+        while bit:
+            next_position = position + bit
+            if next_position <= self.n_rules and self._tree[next_position] <= value:
+                position = next_position
+                value -= self._tree[next_position]
+            bit >>= 1
+        return position
+
+    def sample(self, k: int, rng: Union[random.Random, ModuleType] = random):
+        removed = []
+        try:
+            for _ in range(min(k, self.n_positive)):
+                idx = self._find(rng.randrange(self._total))
+                weight = self._weights[idx]
+                self._update(idx, -weight)
+                self._weights[idx] = 0
+                self._total -= weight
+                removed.append((idx, weight))
+                yield idx
+        finally:
+            # the drawn rules are put back for the next draw
+            for idx, weight in removed:
+                self._update(idx, weight)
+                self._weights[idx] = weight
+                self._total += weight
+
+
+class BanditRuleSampler(RuleSampler):
+    """
+    Draws reaction rules with a multi-armed bandit policy over the reaction rules statistics.
+    The reward of a rule combines producing valid products and improving the fitness of the parent (see
+    RuleStatistics.expected_reward). Rules are scored once per draw and drawn by decreasing score (ranked lazily, only
+    as far as the draw goes):
+        - 'ucb': expected reward plus an exploration bonus (rules never tried are drawn first, in random order);
+        - 'thompson': reward sampled from the Beta posteriors of the success and improvement rates.
+    """
+
+    POLICIES = ('ucb', 'thompson')
+
+    # number of rules ranked by the first round of a draw (the size of the rounds doubles)
+    FIRST_ROUND_SIZE = 8
+
+    def __init__(self, statistics: RuleStatistics, policy: str = 'ucb', exploration: float = 1.0):
+        """
+        Initializes the Bandit Rule Sampler.
+
+        Parameters
+        ----------
+        statistics: RuleStatistics
+            reaction rules statistics (updated along the optimization)
+        policy: str
+            bandit policy ('ucb' or 'thompson')
+        exploration: float
+            weight of the exploration bonus of the 'ucb' policy
+        """
+        super(BanditRuleSampler, self).__init__(statistics.n_rules)
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown bandit policy: {policy}. Available policies: {list(self.POLICIES)}")
+        self.statistics = statistics
+        self.policy = policy
+        self.exploration = exploration
+
+    def scores(self, rng: Union[random.Random, ModuleType] = random):
+        """
+        Scores the reaction rules with the bandit policy.
+
+        Parameters
+        ----------
+        rng: Union[random.Random, ModuleType]
+            random number generator to use
+
+        Returns
+        -------
+        np.ndarray:
+            score of each reaction rule
+        """
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        stats = self.statistics
+        if self.policy == 'thompson':
+            success = np_rng.beta(stats.successes + 1, stats.trials - stats.successes + 1)
+            improvement = np_rng.beta(stats.improvements + 1, stats.evaluations - stats.improvements + 1)
+            return success * (1 + improvement) / 2
+        total_trials = max(int(stats.trials.sum()), 1)
+        with np.errstate(divide='ignore'):
+            bonus = self.exploration * np.sqrt(np.log(total_trials + 1) / stats.trials)
+        scores = stats.expected_reward() + bonus
+        untried = stats.trials == 0
+        # rules never tried are scored above all the others, in random order (ties of tried rules are broken at random)
+        top = scores[~untried].max() if not untried.all() else 0.0
+        scores[untried] = top + 1 + np_rng.random(int(untried.sum()))
+        return scores + np_rng.random(self.n_rules) * 1e-9
+
+    def sample(self, k: int, rng: Union[random.Random, ModuleType] = random):
+        remaining = min(k, self.n_rules)
+        if remaining <= 0:
+            return
+        scores = -self.scores(rng)
+        # the best remaining rules are ranked in rounds of doubling size, so a draw that stops after a few rules only
+        # partitions the scores a few times (instead of sorting up to k rules)
+        size = self.FIRST_ROUND_SIZE
+        while remaining > 0:
+            size = min(size, remaining)
+            best = np.argpartition(scores, size - 1)[:size] if size < self.n_rules else np.arange(self.n_rules)
+            best = best[np.argsort(scores[best], kind='stable')]
+            # the ranked rules are not drawn again
+            scores[best] = np.inf
+            for idx in best:
+                yield int(idx)
+            remaining -= size
+            size *= 2
@@ -0,0 +1,156 @@
+import os
+from typing import List, Union
+
+import numpy as np
+import pandas as pd
+
+from reactea.chem.reaction_rules import ReactionRule
+
+
+class RuleStatistics:
+    """
+    Class to represent the statistics of the reaction rules along an optimization.
+    For each rule it tracks how many times it was applied, how many times it produced valid products, how many of
+    its mutants were evaluated, how many of those improved the fitness of the parent and the total fitness gain.
+    Statistics are keyed by rule id when saved, so they can be reused across runs.
+    """
+
+    COLUMNS = ['trials', 'successes', 'evaluations', 'improvements', 'fitness_gain']
+
+    def __init__(self, rule_ids: List[Union[str, int]]):
+        """
+        Initializes the reaction rules statistics.
+
+        Parameters
+        ----------
+        rule_ids: List[Union[str, int]]
+            ids of the reaction rules (the statistics follow the order of the list)
+        """
+        self.rule_ids = [str(rule_id) for rule_id in rule_ids]
+        self.n_rules = len(self.rule_ids)
+        self.trials = np.zeros(self.n_rules, dtype=np.int64)
+        self.successes = np.zeros(self.n_rules, dtype=np.int64)
+        self.evaluations = np.zeros(self.n_rules, dtype=np.int64)
+        self.improvements = np.zeros(self.n_rules, dtype=np.int64)
+        self.fitness_gain = np.zeros(self.n_rules, dtype=np.float64)
+
+    @staticmethod
+    def from_configs(reaction_rules: List[ReactionRule], configs: dict):
+        """
+        Builds the reaction rules statistics from the configurations of the experiment.
+
+        Parameters
+        ----------
+        reaction_rules: List[ReactionRule]
+            pool of reaction rules
+        configs: dict
+            configurations of the experiment (statistics are tracked if 'rule_selection' is 'ucb' or 'thompson' or
+            if 'rule_statistics_path' is provided, in which case previously saved statistics are loaded)
+
+        Returns
+        -------
+        Union[RuleStatistics, None]:
+            reaction rules statistics (None if they are not tracked)
+        """
+        path = configs.get('rule_statistics_path', None)
+        if configs.get('rule_selection', 'uniform') == 'uniform' and path is None:
+            return None
+        statistics = RuleStatistics([rule.rule_id for rule in reaction_rules])
+        if path is not None and os.path.exists(path):
+            statistics.load(path)
+        return statistics
+
+    def record_trial(self, idx: int, success: bool):
+        """
+        Records the outcome of applying a reaction rule.
+
+        Parameters
+        ----------
+        idx: int
+            position of the reaction rule
+        success: bool
+            whether the rule produced valid products
+        """
+        self.trials[idx] += 1
+        if success:
+            self.successes[idx] += 1
+
+    def record_fitness(self, idx: int, gain: float):
+        """
+        Records the fitness gain of a mutant (mutant fitness - parent fitness).
+
+        Parameters
+        ----------
+        idx: int
+            position of the reaction rule that produced the mutant
+        gain: float
+            fitness gain of the mutant (positive if the mutant is better than the parent)
+        """
+        self.evaluations[idx] += 1
+        self.fitness_gain[idx] += gain
+        if gain > 0:
+            self.improvements[idx] += 1
+
+    def success_rate(self):
+        """
+        Estimates the probability of each rule producing valid products (Laplace smoothed).
+
+        Returns
+        -------
+        np.ndarray:
+            success rate of each rule
+        """
+        return (self.successes + 1) / (self.trials + 2)
+
+    def improvement_rate(self):
+        """
+        Estimates the probability of the mutants of each rule improving the fitness of the parent (Laplace smoothed).
+
+        Returns
+        -------
+        np.ndarray:
+            improvement rate of each rule
+        """
+        return (self.improvements + 1) / (self.evaluations + 2)
+
+    def expected_reward(self):
+        """
+        Estimates the reward of applying each rule (in [0, 1]): half of the reward comes from producing valid products
+        and the other half from improving the fitness.
+
+        Returns
+        -------
+        np.ndarray:
+            expected reward of each rule
+        """
+        return self.success_rate() * (1 + self.improvement_rate()) / 2
+
+    def save(self, path: str):
+        """
+        Saves the statistics to a TSV file.
+
+        Parameters
+        ----------
+        path: str
+            path of the TSV file
+        """
+        statistics = pd.DataFrame({'rule_id': self.rule_ids,
+                                   **{column: getattr(self, column) for column in self.COLUMNS}})
+        statistics.to_csv(path, sep='\t', index=False)
+
+    def load(self, path: str):
+        """
+        Loads (adds) statistics saved in a TSV file. Rules that are not in the pool are ignored.
+
+        Parameters
+        ----------
+        path: str
+            path of the TSV file
+        """
+        statistics = pd.read_csv(path, header=0, sep='\t', dtype={'rule_id': str})
+        positions = {rule_id: i for i, rule_id in enumerate(self.rule_ids)}
+        idx = statistics['rule_id'].map(positions)
+        statistics = statistics[idx.notna()]
+        idx = idx[idx.notna()].astype(int).values
+        for column in self.COLUMNS:
+            np.add.at(getattr(self, column), idx, statistics[column].values.astype(getattr(self, column).dtype))
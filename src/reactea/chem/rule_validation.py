@@ -0,0 +1,172 @@
+from typing import List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from rdkit import RDLogger
+
+from reactea.chem.reaction_rules import ReactionRule
+
+
+def _validate_records(records: List[Tuple[str, Union[str, int], Union[str, None]]]):
+    """
+    Compiles and checks a chunk of reaction rules (runs in the worker processes).
+
+    Parameters
+    ----------
+    records: List[Tuple[str, Union[str, int], Union[str, None]]]
+        SMARTS, id and reactants of each rule
+
+    Returns
+    -------
+    List[Tuple[Union[str, None], bytes, Union[np.ndarray, None]]]:
+        reason to quarantine the rule (None if it is valid), serialized reaction and reactant templates fingerprint
+    """
+    RDLogger.DisableLog("rdApp.*")
+    results = []
+    for smarts, rule_id, reactants in records:
+        rule = ReactionRule(smarts, rule_id, reactants)
+        reason = RuleValidator.check(rule)
+        if reason is None:
+            results.append((None, rule.reaction.ToBinary(), rule.template_fingerprint))
+        else:
+            results.append((reason, b'', None))
+    return results
+
+
+class RuleValidator:
+    """
+    Class containing a set of utilities to check if reaction rules can fire.
+    Rules that can not fire (unparsable SMARTS, invalid reactions, reactant templates that can never match or a
+    number of reactant templates different from the number of reactants) are quarantined instead of being kept in
+    the pool of rules used by the mutations.
+    """
+
+    # reasons to quarantine a rule
+    PARSE_ERROR = 'parse_error'
+    INVALID_REACTION = 'invalid_reaction'
+    REACTANT_COUNT = 'reactant_count'
+    NO_COMPOUND_REACTANT = 'no_compound_reactant'
+    EMPTY_TEMPLATE = 'empty_template'
+    INVALID_COREACTANT = 'invalid_coreactant'
+    UNMATCHED_COREACTANT = 'unmatched_coreactant'
+    NO_PRODUCTS = 'no_products'
+
+    @staticmethod
+    def check(rule: ReactionRule):
+        """
+        Checks if a reaction rule can fire.
+
+        Parameters
+        ----------
+        rule: ReactionRule
+            reaction rule to check
+
+        Returns
+        -------
+        Union[str, None]:
+            reason to quarantine the rule (None if the rule is valid)
+        """
+        reaction = rule.reaction
+        if reaction is None:
+            return RuleValidator.PARSE_ERROR
+        try:
+            reaction.Initialize()
+            _, n_errors = reaction.Validate(silent=True)
+        except Exception:
+            return RuleValidator.INVALID_REACTION
+        if n_errors > 0:
+            return RuleValidator.INVALID_REACTION
+        slots = rule.reactants.split(';')
+        if len(slots) != reaction.GetNumReactantTemplates():
+            return RuleValidator.REACTANT_COUNT
+        if 'Any' not in slots:
+            return RuleValidator.NO_COMPOUND_REACTANT
+        if reaction.GetNumProductTemplates() == 0:
+            return RuleValidator.NO_PRODUCTS
+        try:
+            coreactants = rule.coreactants
+        except Exception:
+            return RuleValidator.INVALID_COREACTANT
+        for i, coreactant in enumerate(coreactants):
+            template = reaction.GetReactantTemplate(i)
+            if template.GetNumAtoms() == 0:
+                return RuleValidator.EMPTY_TEMPLATE
+            if slots[i] == 'Any':
+                continue
+            if coreactant is None:
+                return RuleValidator.INVALID_COREACTANT
+            # coreactants are fixed, so a coreactant that does not match its template never does
+            if not coreactant.HasSubstructMatch(template):
+                return RuleValidator.UNMATCHED_COREACTANT
+        return None
+
+    @staticmethod
+    def validate_records(records: List[Tuple[str, Union[str, int], Union[str, None]]],
+                         lazy: bool = False,
+                         n_jobs: int = 1,
+                         chunk_size: int = 500):
+        """
+        Compiles and checks reaction rules (in parallel) and splits them into valid and quarantined rules.
+
+        Parameters
+        ----------
+        records: List[Tuple[str, Union[str, int], Union[str, None]]]
+            SMARTS, id and reactants of each rule
+        lazy: bool
+            whether the valid rules should only deserialize their reaction when first used
+        n_jobs: int
+            number of parallel jobs (-1 to use all processors)
+        chunk_size: int
+            number of rules checked by a job at once
+
+        Returns
+        -------
+        Tuple[List[ReactionRule], pd.DataFrame]:
+            valid reaction rules and report of the quarantined rules (columns InternalID, SMARTS, Reactants and
+            Reason)
+        """
+        records = [(smarts, rule_id, reactants if isinstance(reactants, str) else None)
+                   for smarts, rule_id, reactants in records]
+        chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+        if effective_n_jobs(n_jobs) == 1 or len(chunks) <= 1:
+            results = [_validate_records(chunk) for chunk in chunks]
+        else:
+            results = Parallel(n_jobs=n_jobs)(delayed(_validate_records)(chunk) for chunk in chunks)
+        results = [result for chunk_results in results for result in chunk_results]
+        rules = []
+        quarantine = []
+        for (smarts, rule_id, reactants), (reason, reaction, fingerprint) in zip(records, results):
+            if reason is None:
+                rules.append(ReactionRule(smarts, rule_id, reactants, reaction, fingerprint, lazy))
+            else:
+                quarantine.append((rule_id, smarts, reactants if reactants is not None else 'Any', reason))
+        report = pd.DataFrame(quarantine, columns=['InternalID', 'SMARTS', 'Reactants', 'Reason'])
+        return rules, report
+
+    @staticmethod
+    def validate(rules: List[ReactionRule]):
+        """
+        Checks already built reaction rules and splits them into valid and quarantined rules.
+
+        Parameters
+        ----------
+        rules: List[ReactionRule]
+            reaction rules to check
+
+        Returns
+        -------
+        Tuple[List[ReactionRule], pd.DataFrame]:
+            valid reaction rules and report of the quarantined rules (columns InternalID, SMARTS, Reactants and
+            Reason)
+        """
+        valid = []
+        quarantine = []
+        for rule in rules:
+            reason = RuleValidator.check(rule)
+            if reason is None:
+                valid.append(rule)
+            else:
+                quarantine.append((rule.rule_id, rule.smarts, rule.reactants, reason))
+        report = pd.DataFrame(quarantine, columns=['InternalID', 'SMARTS', 'Reactants', 'Reason'])
+        return valid, report
@@ -0,0 +1,171 @@
+import random
+from types import ModuleType
+from typing import List, Union
+
+import numpy as np
+from rdkit import DataStructs
+from rdkit.Chem import Mol, RDKFingerprint
+from rdkit.Chem.rdMolDescriptors import GetMorganFingerprintAsBitVect
+from rdkit.Chem.MACCSkeys import GenMACCSKeys
+
+from reactea.chem.compounds import Compound
+from reactea.chem.mol_cache import MolCache
+
+
+def _rdkit_fingerprint(mol: Mol):
+    # same parameters as rdkit.Chem.Fingerprints.FingerprintMols.FingerprintMol (folded to a 0.3 bit density)
+    return RDKFingerprint(mol, 1, 7, 2048, 2, False, 0.3, 64)
+
+
+def _morgan_fingerprint(mol: Mol):
+    return GetMorganFingerprintAsBitVect(mol, 2, nBits=2048)
+
+
+class SimilarityEngine:
+    """
+    Class to compute fingerprint (Tanimoto) similarities between a compound and a set of candidates.
+    The fingerprint of the reference compound is computed once (and cached in the Compound) and all candidates are
+    scored with bulk Tanimoto calls.
+    """
+
+    # available fingerprint types
+    FINGERPRINTS = {'rdkit': _rdkit_fingerprint,
+                    'morgan': _morgan_fingerprint,
+                    'maccs': GenMACCSKeys}
+
+    def __init__(self, fingerprint_type: str = 'rdkit'):
+        """
+        Initializes the Similarity Engine.
+
+        Parameters
+        ----------
+        fingerprint_type: str
+            type of fingerprint to use ('rdkit' (same as ChemUtils.calc_fingerprint_similarity), 'morgan' or 'maccs')
+        """
+        if fingerprint_type not in self.FINGERPRINTS:
+            raise ValueError(f"Unknown fingerprint type: {fingerprint_type}. "
+                             f"Available types: {list(self.FINGERPRINTS.keys())}")
+        self.fingerprint_type = fingerprint_type
+        self._fingerprint = self.FINGERPRINTS[fingerprint_type]
+
+    def fingerprint(self, candidate: Union[Compound, Mol, str]):
+        """
+        Computes the fingerprint of a compound.
+        Fingerprints of Compound objects are cached in the Compound.
+
+        Parameters
+        ----------
+        candidate: Union[Compound, Mol, str]
+            Compound, Mol object or SMILES string
+
+        Returns
+        -------
+        Union[ExplicitBitVect, None]:
+            fingerprint (None if the molecule is invalid)
+        """
+        if isinstance(candidate, Compound):
+            fingerprint = candidate.get_fingerprint(self.fingerprint_type)
+            if fingerprint is None and candidate.mol is not None:
+                fingerprint = self._fingerprint(candidate.mol)
+                candidate.set_fingerprint(self.fingerprint_type, fingerprint)
+            return fingerprint
+        mol = MolCache.shared().mol(candidate) if isinstance(candidate, str) else candidate
+        if mol is None:
+            return None
+        return self._fingerprint(mol)
+
+    def similarities(self, reference: Union[Compound, Mol, str], candidates: List[Union[Compound, Mol, str]]):
+        """
+        Computes the Tanimoto similarity between a reference compound and a list of candidates.
+
+        Parameters
+        ----------
+        reference: Union[Compound, Mol, str]
+            reference compound
+        candidates: List[Union[Compound, Mol, str]]
+            candidates to score
+
+        Returns
+        -------
+        np.ndarray:
+            similarities (0 for invalid molecules)
+        """
+        sims = np.zeros(len(candidates))
+        reference_fp = self.fingerprint(reference)
+        if reference_fp is None:
+            return sims
+        # fingerprints folded to different sizes are compared at the size of the smallest one
+        groups = {}
+        for i, candidate in enumerate(candidates):
+            fp = self.fingerprint(candidate)
+            if fp is not None:
+                groups.setdefault(fp.GetNumBits(), ([], []))
+                groups[fp.GetNumBits()][0].append(i)
+                groups[fp.GetNumBits()][1].append(fp)
+        reference_size = reference_fp.GetNumBits()
+        for size, (idx, fps) in groups.items():
+            if size == reference_size:
+                sims[idx] = DataStructs.BulkTanimotoSimilarity(reference_fp, fps)
+            elif size < reference_size:
+                folded_reference = DataStructs.FoldFingerprint(reference_fp, reference_size // size)
+                sims[idx] = DataStructs.BulkTanimotoSimilarity(folded_reference, fps)
+            else:
+                fps = [DataStructs.FoldFingerprint(fp, size // reference_size) for fp in fps]
+                sims[idx] = DataStructs.BulkTanimotoSimilarity(reference_fp, fps)
+        return sims
+
+    def most_similar_index(self,
+                           reference: Union[Compound, Mol, str],
+                           candidates: List[Union[Compound, Mol, str]],
+                           tolerance: float = 0.25,
+                           rng: Union[random.Random, ModuleType] = random):
+        """
+        Picks one of the candidates most similar to the reference compound.
+
+        Parameters
+        ----------
+        reference: Union[Compound, Mol, str]
+            reference compound
+        candidates: List[Union[Compound, Mol, str]]
+            candidates to pick from
+        tolerance: float
+            candidates with similarity between max_similarity and max_similarity - tolerance can be picked.
+        rng: Union[random.Random, ModuleType]
+            random number generator used to pick between the most similar candidates
+
+        Returns
+        -------
+        int:
+            position of the picked candidate
+        """
+        if len(candidates) == 1:
+            return 0
+        sims = self.similarities(reference, candidates)
+        idx = np.flatnonzero(sims >= sims.max() - tolerance)
+        return int(rng.choice(idx))
+
+    def most_similar(self,
+                     reference: Union[Compound, Mol, str],
+                     candidates: List[Union[Compound, Mol, str]],
+                     tolerance: float = 0.25,
+                     rng: Union[random.Random, ModuleType] = random):
+        """
+        Picks one of the candidates most similar to the reference compound.
+
+        Parameters
+        ----------
+        reference: Union[Compound, Mol, str]
+            reference compound
+        candidates: List[Union[Compound, Mol, str]]
+            candidates to pick from
+        tolerance: float
+            candidates with similarity between max_similarity and max_similarity - tolerance can be picked.
+        rng: Union[random.Random, ModuleType]
+            random number generator used to pick between the most similar candidates
+
+        Returns
+        -------
+        Union[Compound, Mol, str]:
+            picked candidate
+        """
+        return candidates[self.most_similar_index(reference, candidates, tolerance, rng)]
@@ -1,10 +1,14 @@
+import sqlite3
+import threading
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Union
 
 from rdkit.Chem import Mol, rdmolops
 from chembl_structure_pipeline import standardizer
 
 from reactea.chem import ChemUtils
+from reactea.chem.mol_cache import MolCache
 
 if TYPE_CHECKING:
     from reactea.chem import Compound
@@ -88,3 +92,207 @@ class ChEMBLStandardizer(MolecularStandardizer):
             return largest_mol
         except:
             return mol
+
+
+class CachedStandardizer(MolecularStandardizer):
+    """
+    Wrapper that memoizes the results of any Molecular Standardizer.
+    Results are keyed by the canonical SMILES of the compounds and kept in an in-memory LRU cache and, optionally, in
+    a SQLite database shared between runs. Standardized compounds are also recorded as their own standardized form,
+    so previously standardized compounds are returned immediately.
+    """
+
+    def __init__(self,
+                 base_standardizer: Union[MolecularStandardizer, type],
+                 maxsize: int = 100000,
+                 db_path: Union[str, None] = None):
+        """
+        Initializes the Cached Standardizer.
+
+        Parameters
+        ----------
+        base_standardizer: Union[MolecularStandardizer, type]
+            standardizer (or standardizer class) whose results are cached
+        maxsize: int
+            maximum number of results kept in memory
+        db_path: Union[str, None]
+            path to the SQLite database where the results are persisted (no persistence if None)
+        """
+        if isinstance(base_standardizer, type):
+            base_standardizer = base_standardizer()
+        self.base_standardizer = base_standardizer
+        self.name = type(base_standardizer).__name__
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    @staticmethod
+    def from_configs(base_standardizer: Union[MolecularStandardizer, type, None], configs: dict):
+        """
+        Wraps a standardizer in a Cached Standardizer following the configurations of the experiment.
+
+        Parameters
+        ----------
+        base_standardizer: Union[MolecularStandardizer, type, None]
+            standardizer (or standardizer class) to wrap
+        configs: dict
+            configurations of the experiment (keys 'standardization_cache_size' and 'standardization_cache_path')
+
+        Returns
+        -------
+        Union[MolecularStandardizer, None]:
+            cached standardizer (the standardizer itself if it is None, already cached or the cache size is 0)
+        """
+        maxsize = configs.get('standardization_cache_size', 100000)
+        if base_standardizer is None or isinstance(base_standardizer, CachedStandardizer) or maxsize <= 0:
+            return base_standardizer
+        return CachedStandardizer(base_standardizer, maxsize, configs.get('standardization_cache_path', None))
+
+    def _connect(self):
+        """
+        Internal method to open (and create if needed) the SQLite database.
+
+        Returns
+        -------
+        sqlite3.Connection:
+            database connection
+        """
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS standardized '
+                             '(standardizer TEXT, smiles TEXT, standardized_smiles TEXT, '
+                             'PRIMARY KEY (standardizer, smiles))')
+        return self._db
+
+    def _get(self, key: str):
+        """
+        Internal method to get a cached result.
+
+        Parameters
+        ----------
+        key: str
+            canonical SMILES of the compound
+
+        Returns
+        -------
+        Union[str, None]:
+            canonical SMILES of the standardized compound (None if it is not cached)
+        """
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                return result
+            if self.db_path is not None:
+                row = self._connect().execute('SELECT standardized_smiles FROM standardized '
+                                              'WHERE standardizer = ? AND smiles = ?', (self.name, key)).fetchone()
+                if row is not None:
+                    self._put(key, row[0])
+                    return row[0]
+        return None
+
+    def _put(self, key: str, result: str, persist: bool = False):
+        """
+        Internal method to cache a result.
+
+        Parameters
+        ----------
+        key: str
+            canonical SMILES of the compound
+        result: str
+            canonical SMILES of the standardized compound
+        persist: bool
+            whether to also save the result in the database
+        """
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        if persist and self.db_path is not None:
+            self._connect().execute('INSERT OR REPLACE INTO standardized VALUES (?, ?, ?)', (self.name, key, result))
+
+    def standardize(self, mol: "Compound"):
+        """
+        Standardizes a chemical compound represented as a Compound object, reusing cached results.
+
+        Parameters
+        ----------
+        mol: Compound
+            Compound object representing the chemical compound to be standardized.
+
+        Returns
+        -------
+        Compound:
+            Standardized Compound object.
+        """
+        if mol.mol is None:
+            return mol
+        key = mol.key
+        result = self._get(key)
+        if result is not None:
+            self.hits += 1
+            if result != key:
+                mol.mol = MolCache.shared().mol(result)
+            return mol
+        self.misses += 1
+        mol = self.base_standardizer.standardize(mol)
+        # the standardized Mol object is interned so its SMILES string is only computed once
+        mol.mol, result = MolCache.shared().intern(mol.mol)
+        with self._lock:
+            self._put(key, result, persist=True)
+            # standardized compounds are already in their standardized form
+            if result != key:
+                self._put(result, result, persist=True)
+        return mol
+
+    def _standardize(self, mol: Mol):
+        """
+        Standardizes a RDKit Mol object with the base standardizer (not cached).
+
+        Parameters
+        ----------
+        mol: Mol
+            RDKit Mol object to be standardized.
+
+        Returns
+        -------
+        Mol:
+            Standardized RDKit Mol object.
+        """
+        return self.base_standardizer._standardize(mol)
+
+    def stats(self):
+        """
+        Gets the cache statistics.
+
+        Returns
+        -------
+        dict:
+            number of hits, misses and results kept in memory
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # connections and locks can not be shared between processes
+        state['_db'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
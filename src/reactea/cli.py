@@ -5,10 +5,11 @@ from datetime import datetime
 import click as click
 from rdkit import RDLogger
 
-from reactea.chem import Compound
+from reactea.chem import Compound, ReactionRule, MolCache, FeatureCache
 from reactea.constants import ChemConstants
 from reactea.io_streams import Loaders, Writers
 from reactea.optimization.jmetal.ea import ChemicalEA
+from reactea.optimization.model_service import ModelService
 
 DATA_FILES = os.path.dirname(__file__)
 
@@ -77,7 +78,11 @@ def reactea_cli(config_file):
     Writers.set_up_folders(configs['output_dir'])
 
     # initialize reaction rules
-    reaction_rules = Loaders.initialize_rules()
+    MolCache.shared().resize(configs.get('mol_cache_size', MolCache.DEFAULT_MAXSIZE))
+    ModelService.configure(configs)
+    FeatureCache.shared().resize(configs.get('feature_cache_size', FeatureCache.DEFAULT_MAXSIZE))
+    reaction_rules = Loaders.initialize_rules(lazy=configs.get('lazy_rules', False),
+                                              n_jobs=configs.get('rule_compile_jobs', -1))
 
     # initialize objectives
     problem = objective()
@@ -97,8 +102,11 @@ def reactea_cli(config_file):
 
     # save configs
     configs['run_time'] = time.time() - configs['start_time']
+    configs['compiled_rules'] = ReactionRule.n_compiled(reaction_rules)
+    configs['mol_cache'] = MolCache.shared().stats()
     Writers.save_configs(configs)
     print(f"Run time: {configs['run_time']} seconds!")
+    print(f"Compiled reaction rules: {configs['compiled_rules']}/{len(reaction_rules)}")
 
     # PlotResults(configs, solution_index=0).plot_results(save_fig=True)
 
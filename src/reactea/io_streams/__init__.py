@@ -1,2 +1,3 @@
 from .readers import Loaders
 from .writers import Writers
+from .rule_store import ReactionRuleStore
@@ -6,9 +6,10 @@ import yaml
 
 import pandas as pd
 
-from reactea.chem import Compound, ReactionRule
+from reactea.chem import Compound, FeatureCache
 
 from reactea.constants import ChemConstants
+from reactea.io_streams.rule_store import ReactionRuleStore
 
 
 class Loaders:
@@ -88,20 +89,32 @@ class Loaders:
             return [Compound(row['smiles'], row["compound_id"]) for _, row in cmp_df.iterrows()], cmp_df.smiles.values
 
     @staticmethod
-    def initialize_rules():
+    def initialize_rules(use_store: bool = True, lazy: bool = False, n_jobs: int = -1, rules_path: str = None):
         """
-        Loads the reaction rules.
+        Loads the reaction rules that can fire (invalid rules are quarantined).
+        By default, rules are loaded from a compiled rule store that is (re)built when the rules file changes.
+
+        Parameters
+        ----------
+        use_store: bool
+            whether to load the rules from the compiled rule store (True) or parse the rules file (False)
+        lazy: bool
+            whether to compile each rule' reaction only when it is first used (True) or while loading (False)
+        n_jobs: int
+            number of parallel jobs used to compile and check the rules (-1 to use all processors)
+        rules_path: str
+            path of the reaction rules file (the reaction rules of the package if None)
 
         Returns
         -------
         List[ReactionRule]:
             list of reaction rules to use
         """
-        rules_df = pd.read_csv(Loaders.from_root('/data/reactionrules/reaction_rules_reactea.tsv.bz2'),
-                               header=0,
-                               sep='\t',
-                               compression='bz2')
-        return [ReactionRule(row['SMARTS'], row["InternalID"], row['Reactants']) for _, row in rules_df.iterrows()]
+        if rules_path is None:
+            rules_path = Loaders.from_root('/data/reactionrules/reaction_rules_reactea.tsv.bz2')
+        if use_store:
+            return ReactionRuleStore.load_or_compile(rules_path, lazy=lazy, n_jobs=n_jobs)
+        return ReactionRuleStore.read_valid_rules_tsv(rules_path, lazy, n_jobs)[0]
 
     @staticmethod
     def load_deepsweet_ensemble():
@@ -130,8 +143,31 @@ class Loaders:
                           DeepSweetBiLSTM(models_folder_path)]
 
         ensemble = Ensemble(list_of_models, models_folder_path)
+        Loaders._use_feature_cache()
         return ensemble
 
+    @staticmethod
+    def _use_feature_cache():
+        """
+        Makes the deepmol featurizers of the DeepSweet ensemble members take the features of the molecules from the
+        shared Feature Cache (2D descriptors, RDK, ECFP4 and atom pair fingerprints), so each molecule is featurized
+        once per feature type. The graph and sequence featurizers (GCN and BiLSTM members) are not cached.
+        """
+        try:
+            from deepmol import compound_featurization
+        except ImportError:
+            return
+        featurizers = {'MorganFingerprint': ('ecfp4', {'radius': 2, 'size': 2048, 'chiral': False, 'bonds': True,
+                                                       'features': False}),
+                       'RDKFingerprint': ('rdk', {'fpSize': 2048, 'minPath': 1, 'maxPath': 7}),
+                       'AtomPairFingerprint': ('atompair_fp', {'nBits': 2048, 'minLength': 1, 'maxLength': 30}),
+                       'TwoDimensionDescriptors': ('2d', {})}
+        for name, (feature_type, defaults) in featurizers.items():
+            featurizer = getattr(compound_featurization, name, None)
+            featurize = getattr(featurizer, '_featurize', None)
+            if featurize is not None and getattr(featurize, 'feature_type', None) is None:
+                featurizer._featurize = FeatureCache.cached_featurizer(featurize, feature_type, defaults)
+
     @staticmethod
     def load_results_case(index: int, configs: dict):
         """
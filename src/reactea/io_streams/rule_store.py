@@ -0,0 +1,313 @@
+import json
+import mmap
+import os
+import struct
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from reactea.chem import ReactionRule
+from reactea.chem.rule_validation import RuleValidator
+
+
+class ReactionRuleStore:
+    """
+    Class containing a set of utilities to compile and load binary reaction rule stores.
+
+    A rule store holds the serialized ChemicalReactions of a reaction rules TSV file together with the rules ids,
+    SMARTS, coreactants information and reactant templates fingerprints (used by the RuleApplicabilityIndex). It is
+    built once, memory-mapped on load and rebuilt only when the source TSV file changes.
+    Only rules that can fire are stored: invalid rules (see RuleValidator) are quarantined in a report written next
+    to the store.
+
+    Layout of the file:
+        - magic string and format version;
+        - JSON header with the source file signature and the number of rules;
+        - offsets table (n_rules x 6, uint64) delimiting the id, SMARTS, reactants, reaction and template
+          fingerprint fields of each rule;
+        - data section with the fields of all rules.
+    """
+
+    MAGIC = b'REACTEA_RULE_STORE'
+    VERSION = 2
+    N_FIELDS = 5
+    EXTENSION = '.store'
+    REPORT_EXTENSION = '.quarantine.tsv'
+
+    @staticmethod
+    def store_path(source_path: str):
+        """
+        Gets the default path of the rule store of a reaction rules file.
+
+        Parameters
+        ----------
+        source_path: str
+            path to the reaction rules TSV file
+
+        Returns
+        -------
+        str:
+            path to the rule store
+        """
+        return f"{source_path}{ReactionRuleStore.EXTENSION}"
+
+    @staticmethod
+    def report_path(store_path: str):
+        """
+        Gets the path of the quarantine report of a rule store.
+
+        Parameters
+        ----------
+        store_path: str
+            path to the rule store
+
+        Returns
+        -------
+        str:
+            path to the quarantine report
+        """
+        return f"{store_path}{ReactionRuleStore.REPORT_EXTENSION}"
+
+    @staticmethod
+    def _source_signature(source_path: str):
+        """
+        Internal method to compute the signature of a reaction rules file (used to detect changes).
+
+        Parameters
+        ----------
+        source_path: str
+            path to the reaction rules TSV file
+
+        Returns
+        -------
+        dict:
+            size and modification time of the file
+        """
+        stat = os.stat(source_path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    @staticmethod
+    def _read_header(mm):
+        """
+        Internal method to read the header of a rule store.
+
+        Parameters
+        ----------
+        mm: Union[mmap.mmap, bytes]
+            rule store buffer
+
+        Returns
+        -------
+        Tuple[dict, int]:
+            header and position where the offsets table starts
+        """
+        pos = len(ReactionRuleStore.MAGIC)
+        if bytes(mm[:pos]) != ReactionRuleStore.MAGIC:
+            raise ValueError("Invalid reaction rule store!")
+        version, header_size = struct.unpack_from('<II', mm, pos)
+        pos += 8
+        if version != ReactionRuleStore.VERSION:
+            raise ValueError(f"Unsupported reaction rule store version: {version}")
+        header = json.loads(bytes(mm[pos:pos + header_size]).decode('utf-8'))
+        return header, pos + header_size
+
+    @staticmethod
+    def is_up_to_date(store_path: str, source_path: str):
+        """
+        Checks if a rule store exists and was compiled from the current version of the source file.
+
+        Parameters
+        ----------
+        store_path: str
+            path to the rule store
+        source_path: str
+            path to the reaction rules TSV file
+
+        Returns
+        -------
+        bool:
+            True if the rule store can be used, False if it needs to be (re)built.
+        """
+        if not os.path.exists(store_path):
+            return False
+        try:
+            with open(store_path, 'rb') as f:
+                header, _ = ReactionRuleStore._read_header(f.read(4096))
+        except (ValueError, struct.error, UnicodeDecodeError):
+            return False
+        return header['source'] == ReactionRuleStore._source_signature(source_path)
+
+    @staticmethod
+    def read_valid_rules_tsv(source_path: str, lazy: bool = False, n_jobs: int = -1):
+        """
+        Reads, compiles and checks (in parallel) the reaction rules of a TSV file (with columns InternalID, SMARTS and
+        Reactants). Rules that can not fire are quarantined.
+
+        Parameters
+        ----------
+        source_path: str
+            path to the reaction rules TSV file (can be compressed)
+        lazy: bool
+            whether the valid rules should only deserialize their reaction when first used
+        n_jobs: int
+            number of parallel jobs (-1 to use all processors)
+
+        Returns
+        -------
+        Tuple[List[ReactionRule], pd.DataFrame]:
+            valid reaction rules and report of the quarantined rules
+        """
+        rules_df = pd.read_csv(source_path, header=0, sep='\t', compression='infer')
+        records = zip(rules_df['SMARTS'], rules_df['InternalID'], rules_df['Reactants'])
+        return RuleValidator.validate_records(list(records), lazy=lazy, n_jobs=n_jobs)
+
+    @staticmethod
+    def compile(source_path: str, store_path: str = None, lazy: bool = False, n_jobs: int = -1):
+        """
+        Compiles the reaction rules of a TSV file into a rule store.
+        Rules that can not fire are left out of the store and written to its quarantine report.
+
+        Parameters
+        ----------
+        source_path: str
+            path to the reaction rules TSV file
+        store_path: str
+            path where to save the rule store (defaults to the source path with the '.store' extension)
+        lazy: bool
+            whether the returned rules should only deserialize their reaction when first used
+        n_jobs: int
+            number of parallel jobs used to compile and check the rules (-1 to use all processors)
+
+        Returns
+        -------
+        List[ReactionRule]:
+            list of valid reaction rules
+        """
+        if store_path is None:
+            store_path = ReactionRuleStore.store_path(source_path)
+        rules, report = ReactionRuleStore.read_valid_rules_tsv(source_path, lazy=True, n_jobs=n_jobs)
+        report_path = ReactionRuleStore.report_path(store_path)
+        report.to_csv(report_path, sep='\t', index=False)
+        if len(report) > 0:
+            print(f"{len(report)} invalid reaction rules were quarantined (see {report_path}).")
+        ReactionRuleStore.write(rules, store_path, ReactionRuleStore._source_signature(source_path))
+        if not lazy:
+            for rule in rules:
+                _ = rule.reaction
+        return rules
+
+    @staticmethod
+    def write(rules: List[ReactionRule], store_path: str, source_signature: dict = None):
+        """
+        Writes a list of reaction rules into a rule store.
+        The file is written to a temporary path and atomically moved so concurrent readers never see partial stores.
+
+        Parameters
+        ----------
+        rules: List[ReactionRule]
+            reaction rules to store
+        store_path: str
+            path where to save the rule store
+        source_signature: dict
+            signature of the source file the rules were read from
+        """
+        fields = []
+        for rule in rules:
+            reaction = rule.serialized_reaction
+            fingerprint = rule.template_fingerprint
+            fingerprint = fingerprint.astype('<u8').tobytes() if fingerprint is not None else b''
+            rule_id = rule.rule_id.item() if isinstance(rule.rule_id, np.generic) else rule.rule_id
+            fields.append([json.dumps(rule_id).encode('utf-8'),
+                           str(rule.smarts).encode('utf-8'),
+                           str(rule.reactants).encode('utf-8'),
+                           reaction,
+                           fingerprint])
+        header = json.dumps({'source': source_signature, 'n_rules': len(rules)}).encode('utf-8')
+        preamble = ReactionRuleStore.MAGIC + struct.pack('<II', ReactionRuleStore.VERSION, len(header)) + header
+        # offsets are absolute positions in the file
+        data_start = len(preamble) + len(rules) * (ReactionRuleStore.N_FIELDS + 1) * 8
+        offsets = np.zeros((len(rules), ReactionRuleStore.N_FIELDS + 1), dtype='<u8')
+        pos = data_start
+        for i, rule_fields in enumerate(fields):
+            offsets[i, 0] = pos
+            for j, field in enumerate(rule_fields):
+                pos += len(field)
+                offsets[i, j + 1] = pos
+
+        tmp_path = f"{store_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(preamble)
+            f.write(offsets.tobytes())
+            for rule_fields in fields:
+                f.write(b''.join(rule_fields))
+        os.replace(tmp_path, store_path)
+
+    @staticmethod
+    def load(store_path: str, lazy: bool = False):
+        """
+        Loads the reaction rules of a rule store.
+        The file is memory-mapped, so the pages are shared between processes loading the same store.
+        In lazy mode the serialized reactions are only deserialized when the rules are first applied.
+
+        Parameters
+        ----------
+        store_path: str
+            path to the rule store
+        lazy: bool
+            whether to compile the reactions lazily (True) or while loading (False)
+
+        Returns
+        -------
+        List[ReactionRule]:
+            list of reaction rules
+        """
+        with open(store_path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header, pos = ReactionRuleStore._read_header(mm)
+        n_rules = header['n_rules']
+        offsets = np.frombuffer(mm, dtype='<u8', count=n_rules * (ReactionRuleStore.N_FIELDS + 1), offset=pos)
+        offsets = offsets.reshape((n_rules, ReactionRuleStore.N_FIELDS + 1))
+        buffer = memoryview(mm)
+        rules = []
+        for start, id_end, smarts_end, reactants_end, reaction_end, end in offsets.tolist():
+            rule_id = json.loads(mm[start:id_end].decode('utf-8'))
+            smarts = mm[id_end:smarts_end].decode('utf-8')
+            reactants = mm[smarts_end:reactants_end].decode('utf-8')
+            # serialized reactions and fingerprints are read directly from the memory-mapped file
+            reaction = buffer[reactants_end:reaction_end]
+            fingerprint = np.frombuffer(mm, dtype='<u8', count=(end - reaction_end) // 8, offset=reaction_end)
+            rules.append(ReactionRule(smarts, rule_id, reactants, reaction, fingerprint, lazy))
+        return rules
+
+    @staticmethod
+    def load_or_compile(source_path: str, store_path: str = None, lazy: bool = False, n_jobs: int = -1):
+        """
+        Loads the reaction rules from the rule store of a reaction rules file, (re)building the store if it does not
+        exist or if the source file changed.
+        If the store cannot be written (e.g. read-only installation) the (valid) rules are read from the source file.
+
+        Parameters
+        ----------
+        source_path: str
+            path to the reaction rules TSV file
+        store_path: str
+            path to the rule store (defaults to the source path with the '.store' extension)
+        lazy: bool
+            whether to compile the reactions lazily (True) or while loading (False)
+        n_jobs: int
+            number of parallel jobs used to compile and check the rules (-1 to use all processors)
+
+        Returns
+        -------
+        List[ReactionRule]:
+            list of reaction rules
+        """
+        if store_path is None:
+            store_path = ReactionRuleStore.store_path(source_path)
+        if ReactionRuleStore.is_up_to_date(store_path, source_path):
+            return ReactionRuleStore.load(store_path, lazy)
+        try:
+            return ReactionRuleStore.compile(source_path, store_path, lazy, n_jobs)
+        except OSError:
+            return ReactionRuleStore.read_valid_rules_tsv(source_path, lazy, n_jobs)[0]
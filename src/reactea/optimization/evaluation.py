@@ -1,3 +1,4 @@
+import hashlib
 import os
 import sys
 from abc import ABC, abstractmethod
@@ -7,13 +8,13 @@ from typing import List, Union
 import numpy as np
 from joblib import Parallel, delayed
 from rdkit import DataStructs, RDConfig
-from rdkit.Chem import MolFromSmarts, Mol, GetSymmSSSR, EnumerateStereoisomers, AllChem, MolFromSmiles, MolToSmiles
-from rdkit.Chem.Crippen import MolLogP
-from rdkit.Chem.Descriptors import MolWt
-from rdkit.Chem.EnumerateStereoisomers import StereoEnumerationOptions
+from rdkit.Chem import MolFromSmarts, Mol, AllChem, MolFromSmiles
 from rdkit.Chem.QED import qed
 
-from reactea.io_streams import Loaders
+from reactea.chem import MolCache
+from reactea.chem.descriptors import DescriptorMemo
+from reactea.chem.fingerprint_matrix import PackedFingerprintMatrix
+from reactea.optimization.model_service import ModelService
 
 
 class ChemicalEvaluationFunction(ABC):
@@ -22,6 +23,9 @@ class ChemicalEvaluationFunction(ABC):
     Child classes must implement the get_fitness and method_str methods.
     """
 
+    # whether the function can be evaluated one molecule at a time by the workers of an EvaluationExecutor
+    parallel = True
+
     def __init__(self, maximize: bool = True, worst_fitness: float = 0.0):
         """
         Initializes the Chemical Evaluation Function class.
@@ -35,10 +39,20 @@ class ChemicalEvaluationFunction(ABC):
         """
         self.maximize = maximize
         self.worst_fitness = worst_fitness
+        self.executor = None
+
+    def prepare(self):
+        """
+        Loads the resources (models, SMARTS patterns, ...) used by the evaluation function.
+        Called once by each worker of an EvaluationExecutor, so resources are not loaded on every evaluation.
+        Child classes with resources to load should override this method.
+        """
+        pass
 
     def get_fitness(self, candidates: Union[Mol, List[Mol]]):
         """
         Evaluates the fitness of the candidate(s).
+        Uses the long-lived workers of the EvaluationExecutor of the run if one is attached.
 
         Parameters
         ----------
@@ -52,6 +66,8 @@ class ChemicalEvaluationFunction(ABC):
         """
         if isinstance(candidates, Mol):
             candidates = [candidates]
+        if self.executor is not None:
+            return self.executor.map(self, candidates)
         return Parallel(n_jobs=-1, backend="multiprocessing")(delayed(self.get_fitness_single)(candidate)
                                                               for candidate in candidates)
 
@@ -83,6 +99,35 @@ class ChemicalEvaluationFunction(ABC):
         """
         raise NotImplementedError
 
+    def _signature_params(self):
+        """
+        Internal method to get the parameters that define the fitness computed by the evaluation function.
+        By default, all public attributes with scalar values are used. Child classes configured with non-scalar
+        values (e.g. compounds or other evaluation functions) should extend this method.
+
+        Returns
+        -------
+        dict:
+            parameters of the evaluation function
+        """
+        return {name: value.item() if isinstance(value, np.generic) else value
+                for name, value in vars(self).items()
+                if not name.startswith('_') and isinstance(value, (bool, int, float, str, np.generic))}
+
+    def signature(self):
+        """
+        Get the signature of the evaluation function (its class and configuration).
+        Evaluation functions with the same signature compute the same fitness, so it is used to key cached fitness
+        values (see FitnessCache).
+
+        Returns
+        -------
+        str:
+            signature of the evaluation function
+        """
+        params = ', '.join(f'{name}={value!r}' for name, value in sorted(self._signature_params().items()))
+        return f'{type(self).__name__}({params})'
+
     def __str__(self):
         return self.method_str()
 
@@ -90,6 +135,128 @@ class ChemicalEvaluationFunction(ABC):
         return self.get_fitness(candidate)
 
 
+class DescriptorEvaluationFunction(ChemicalEvaluationFunction, ABC):
+    """
+    Base class for evaluation functions that score a molecular descriptor.
+    The evaluation is split into a descriptor step (computed per molecule) and a NumPy-vectorized transform that
+    scores a whole array of descriptor values in one call, so batches of precomputed descriptors are scored at once.
+    Child classes must implement the descriptor, transform and method_str methods.
+    """
+
+    @abstractmethod
+    def descriptor(self, mol: Mol):
+        """
+        Computes the descriptor of a molecule.
+
+        Parameters
+        ----------
+        mol: Mol
+            Mol object to compute the descriptor
+
+        Returns
+        -------
+        float:
+            descriptor value of the molecule
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def transform(self, values: np.ndarray):
+        """
+        Scores an array of (valid) descriptor values.
+
+        Parameters
+        ----------
+        values: np.ndarray
+            descriptor values
+
+        Returns
+        -------
+        np.ndarray:
+            scores of the descriptor values
+        """
+        raise NotImplementedError
+
+    def descriptors(self, mols: List[Mol]):
+        """
+        Computes the descriptors of a batch of molecules.
+
+        Parameters
+        ----------
+        mols: List[Mol]
+            Mol objects to compute the descriptors
+
+        Returns
+        -------
+        np.ndarray:
+            descriptor values of the molecules (NaN if the descriptor of a molecule can not be computed)
+        """
+        values = np.empty(len(mols), dtype=np.float64)
+        for i, mol in enumerate(mols):
+            try:
+                values[i] = self.descriptor(mol)
+            except Exception:
+                values[i] = np.nan
+        return values
+
+    def score(self, values: np.ndarray):
+        """
+        Scores an array of descriptor values (NaN values get the worst fitness).
+
+        Parameters
+        ----------
+        values: np.ndarray
+            descriptor values
+
+        Returns
+        -------
+        np.ndarray:
+            scores of the descriptor values
+        """
+        values = np.asarray(values, dtype=np.float64)
+        invalid = np.isnan(values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.asarray(self.transform(np.where(invalid, 0.0, values)), dtype=np.float64)
+        return np.where(invalid, self.worst_fitness, scores)
+
+    def get_fitness(self, candidates: Union[Mol, List[Mol]]):
+        """
+        Evaluates the fitness of the candidate(s).
+        Without an attached EvaluationExecutor the descriptors are computed by this process and scored in one call.
+
+        Parameters
+        ----------
+        candidates: Union[Mol, List[Mol]]
+            The candidate(s) to evaluate.
+
+        Returns
+        -------
+        List[float]
+            The fitness(es) of the candidate(s).
+        """
+        if isinstance(candidates, Mol):
+            candidates = [candidates]
+        if self.executor is not None:
+            return self.executor.map(self, candidates)
+        return self.score(self.descriptors(candidates)).tolist()
+
+    def get_fitness_single(self, candidate: Mol):
+        """
+        Returns the fitness of a single Mol object (the score of its descriptor).
+
+        Parameters
+        ----------
+        candidate: Mol
+            Mol object to evaluate.
+
+        Returns
+        -------
+        float:
+            fitness of the Mol object.
+        """
+        return float(self.score(self.descriptors([candidate]))[0])
+
+
 class AggregatedSum(ChemicalEvaluationFunction):
     """
     AggregatedSum evaluation function.
@@ -144,13 +311,34 @@ class AggregatedSum(ChemicalEvaluationFunction):
         List[float]
             The fitness(es) of the candidate(s).
         """
-        if "Sweetness" in self.method_str():
+        if not self.parallel:
             return self.get_fitness_single(candidates)
         if isinstance(candidates, Mol):
             candidates = [candidates]
+        if self.executor is not None:
+            return self.executor.map(self, candidates)
         return Parallel(n_jobs=-1, backend="multiprocessing")(delayed(self.get_fitness_single)(candidate)
                                                               for candidate in candidates)
 
+    @property
+    def parallel(self):
+        """
+        Checks if all the aggregated evaluation functions can be evaluated one molecule at a time.
+
+        Returns
+        -------
+        bool:
+            True if all evaluation functions can be evaluated one molecule at a time. False otherwise.
+        """
+        return all(f.parallel for f in self.fevaluation)
+
+    def prepare(self):
+        """
+        Loads the resources used by the aggregated evaluation functions.
+        """
+        for f in self.fevaluation:
+            f.prepare()
+
     def get_fitness_single(self, candidate: Mol):
         """
         Returns the fitness of a single Mol object.
@@ -167,11 +355,28 @@ class AggregatedSum(ChemicalEvaluationFunction):
             fitness of the Mol object.
         """
         evals = []
-        for f in self.fevaluation:
-            evals.append(f.get_fitness_single(candidate))
+        # the aggregated evaluation functions share the descriptors of the candidate
+        with DescriptorMemo.scope():
+            for f in self.fevaluation:
+                evals.append(f.get_fitness_single(candidate))
         res = np.transpose(evals)
         return np.dot(res, self.tradeoffs)
 
+    def _signature_params(self):
+        """
+        Internal method to get the parameters that define the fitness computed by the evaluation function.
+        Includes the signatures of the aggregated evaluation functions and their tradeoffs.
+
+        Returns
+        -------
+        dict:
+            parameters of the evaluation function
+        """
+        params = super(AggregatedSum, self)._signature_params()
+        params['fevaluation'] = [f.signature() for f in self.fevaluation]
+        params['tradeoffs'] = [float(t) for t in self.tradeoffs]
+        return params
+
     def method_str(self):
         """
         Get the names of the evaluation functions.
@@ -190,6 +395,9 @@ class SweetnessPredictionDeepSweet(ChemicalEvaluationFunction):
     For more info see: https://github.com/BioSystemsUM/DeepSweet
     """
 
+    # predictions are made in batches by the main process
+    parallel = False
+
     def __init__(self, maximize: bool = True, worst_fitness: float = 0.0):
         """
         Initializes the Sweetness Prediction DeepSweet evaluation function.
@@ -202,11 +410,24 @@ class SweetnessPredictionDeepSweet(ChemicalEvaluationFunction):
             The worst fitness possible for the evaluation function.
         """
         super(SweetnessPredictionDeepSweet, self).__init__(maximize, worst_fitness)
-        self.ensemble = Loaders.load_deepsweet_ensemble()
+
+    @property
+    def ensemble(self):
+        """
+        Gets the DeepSweet ensemble (loaded once per process by the DeepSweet Model Service).
+
+        Returns
+        -------
+        ensemble:
+            deepsweet ensemble to classify compound sweetness
+        """
+        return ModelService.deepsweet().model
 
     def _predict_sweet_prob(self, candidates: List[Mol]):
         """
         Computes the predicted sweetness probability of a list of Mol objects.
+        Predictions are micro-batched and cached by the DeepSweet Model Service, and the features computed by the
+        ensemble members are cached by the shared Feature Cache.
 
         Parameters
         ----------
@@ -217,7 +438,7 @@ class SweetnessPredictionDeepSweet(ChemicalEvaluationFunction):
         List[float]:
             predicted sweetness probability of the candidates.
         """
-        return self.ensemble.predict(candidates)[0]
+        return ModelService.deepsweet().predict(candidates)
 
     def get_fitness(self, candidates: Union[Mol, List[Mol]]):
         """
@@ -265,6 +486,9 @@ class PenalizedSweetness(ChemicalEvaluationFunction):
     For more info see: https://github.com/BioSystemsUM/DeepSweet
     """
 
+    # predictions are made in batches by the main process
+    parallel = False
+
     def __init__(self, maximize: bool = True, worst_fitness: float = 0.0):
         """
         Initializes the Penalized Sweetness evaluation function.
@@ -277,7 +501,9 @@ class PenalizedSweetness(ChemicalEvaluationFunction):
             The worst fitness possible for the evaluation function.
         """
         super(PenalizedSweetness, self).__init__(maximize, worst_fitness)
-        self.ensemble = Loaders.load_deepsweet_ensemble()
+        # the DeepSweet ensemble is loaded once per process by the DeepSweet Model Service
+        self.sweetness = SweetnessPredictionDeepSweet()
+        self.caloric = Caloric()
 
     def get_fitness(self, candidates: Union[Mol, List[Mol]]):
         """
@@ -294,7 +520,10 @@ class PenalizedSweetness(ChemicalEvaluationFunction):
         List[float]:
             predicted penalized sweetness probability of the candidates.
         """
-        return np.multiply(SweetnessPredictionDeepSweet().get_fitness(candidates), Caloric().get_fitness(candidates))
+        if isinstance(candidates, Mol):
+            candidates = [candidates]
+        return np.multiply(self.sweetness.get_fitness(candidates),
+                           [self.caloric.get_fitness_single(candidate) for candidate in candidates])
 
     def get_fitness_single(self, candidate: Mol):
         """
@@ -321,6 +550,8 @@ class Caloric(ChemicalEvaluationFunction):
     Penalizes molecules with specific groups that are related with being caloric or not.
     """
 
+    CALORIC_SMARTS = MolFromSmarts("[Or5,Or6,Or7,Or8,Or9,Or10,Or11,Or12]")
+
     def __init__(self, maximize: bool = True, worst_fitness: float = 0.0):
         """
         Initializes the Caloric evaluation function.
@@ -350,8 +581,7 @@ class Caloric(ChemicalEvaluationFunction):
             caloric score
         """
         try:
-            caloric_smarts = MolFromSmarts("[Or5,Or6,Or7,Or8,Or9,Or10,Or11,Or12]")
-            n_matches = len(mol.GetSubstructMatches(caloric_smarts))
+            n_matches = len(mol.GetSubstructMatches(self.CALORIC_SMARTS))
             return 1 / (n_matches + 1)
         except:
             return self.worst_fitness
@@ -385,7 +615,7 @@ class Caloric(ChemicalEvaluationFunction):
         return "Caloric"
 
 
-class LogP(ChemicalEvaluationFunction):
+class LogP(DescriptorEvaluationFunction):
     """
     LogP evaluation function.
     Computes the partition coefficient.
@@ -407,7 +637,7 @@ class LogP(ChemicalEvaluationFunction):
         super(LogP, self).__init__(maximize=maximize, worst_fitness=worst_fitness)
         self.max_logp = max_logp
 
-    def _get_logp(self, mol: Mol):
+    def descriptor(self, mol: Mol):
         """
         Computes the partition coefficient of a molecule.
 
@@ -421,33 +651,24 @@ class LogP(ChemicalEvaluationFunction):
         float
             partition coefficient of the molecule
         """
-        try:
-            logP = MolLogP(mol)
-            if logP < 0:
-                return 1.0
-            elif logP > self.max_logp:
-                return 0.0
-            else:
-                return (self.max_logp - MolLogP(mol))/self.max_logp
-        except:
-            return self.worst_fitness
+        return DescriptorMemo.get(mol, 'MolLogP')
 
-    def get_fitness_single(self, candidate: Mol):
+    def transform(self, values: np.ndarray):
         """
-        Returns the fitness of a single Mol object.
-        In this case it's the partition coefficient of the molecule.
+        Scores partition coefficients (1 for negative values, decreasing linearly to 0 at max_logp).
 
         Parameters
         ----------
-        candidate: Mol
-            Mol object to evaluate.
+        values: np.ndarray
+            partition coefficients
 
         Returns
         -------
-        float:
-            partition coefficients of the candidate Mol object.
+        np.ndarray:
+            partition coefficient scores
         """
-        return self._get_logp(candidate)
+        return np.where(values < 0, 1.0,
+                        np.where(values > self.max_logp, 0.0, (self.max_logp - values) / self.max_logp))
 
     def method_str(self):
         """
@@ -496,7 +717,7 @@ class QED(ChemicalEvaluationFunction):
             drug-likeliness score of the molecule
         """
         try:
-            return qed(mol)
+            return qed(mol, qedProperties=DescriptorMemo.get(mol, 'QEDProperties'))
         except:
             return self.worst_fitness
 
@@ -529,7 +750,7 @@ class QED(ChemicalEvaluationFunction):
         return "QED"
 
 
-class MolecularWeight(ChemicalEvaluationFunction):
+class MolecularWeight(DescriptorEvaluationFunction):
     """
     Molecular Weight evaluation function.
     Computes the molecular weight of molecules.
@@ -558,7 +779,7 @@ class MolecularWeight(ChemicalEvaluationFunction):
         self.min_weight = min_weight
         self.max_weight = max_weight
 
-    def _mol_weight(self, mol: Mol):
+    def descriptor(self, mol: Mol):
         """
         Computes the average molecular weight of a molecule.
 
@@ -572,33 +793,24 @@ class MolecularWeight(ChemicalEvaluationFunction):
         float:
             molecular weight of the molecule
         """
-        try:
-            mw = MolWt(mol)
-            if mw < self.min_weight:
-                return np.cos((mw - self.min_weight+200) / 320)
-            elif mw < self.max_weight:
-                return 1.0
-            else:
-                return 1.0 / np.log(mw / 250.0)
-        except Exception:
-            return self.worst_fitness
+        return DescriptorMemo.get(mol, 'MolWt')
 
-    def get_fitness_single(self, candidate: Mol):
+    def transform(self, values: np.ndarray):
         """
-        Returns the fitness of a single Mol object.
-        In this case it's the molecular weight score of the molecule.
+        Scores molecular weights (1 between min_weight and max_weight, decreasing outside).
 
         Parameters
         ----------
-        candidate: Mol
-            Mol object to evaluate.
+        values: np.ndarray
+            molecular weights
 
         Returns
         -------
-        float:
-            molecular weight score of the candidate Mol object.
+        np.ndarray:
+            molecular weight scores
         """
-        return self._mol_weight(candidate)
+        return np.where(values < self.min_weight, np.cos((values - self.min_weight + 200) / 320),
+                        np.where(values < self.max_weight, 1.0, 1.0 / np.log(values / 250.0)))
 
     def method_str(self):
         """
@@ -612,7 +824,7 @@ class MolecularWeight(ChemicalEvaluationFunction):
         return "MolecularWeight"
 
 
-class NumberOfLargeRings(ChemicalEvaluationFunction):
+class NumberOfLargeRings(DescriptorEvaluationFunction):
     """
     Number Of Large Rings evaluation function.
     Computes the large rings penalty weight of molecules.
@@ -634,50 +846,37 @@ class NumberOfLargeRings(ChemicalEvaluationFunction):
         self.max_rings = max_rings
         super(NumberOfLargeRings, self).__init__(maximize, worst_fitness)
 
-    def _ring_size(self, mol: Mol):
+    def descriptor(self, mol: Mol):
         """
-        Computes the rings sizes of a molecule and penalizes based on the largest ring.
+        Computes the size of the largest ring of a molecule.
 
         Parameters
         ----------
         mol: Mol
-            Mol object to calculate the largest ring score
+            Mol object to calculate the largest ring size
 
         Returns
         -------
-        float:
-            penalized ring size score
+        int:
+            size of the largest ring (0 if the molecule has no rings)
         """
-        try:
-            ringsSize = [len(ring) for ring in GetSymmSSSR(mol)]
-
-            if len(ringsSize) > 0:
-                largestRing = max(ringsSize)
-                if largestRing > self.max_rings:
-                    return 1 / np.log((largestRing-self.max_rings)*100)
-                else:
-                    return 1.0
-            else:
-                return 1.0
-        except:
-            return self.worst_fitness
+        return max(DescriptorMemo.get(mol, 'RingSizes'), default=0)
 
-    def get_fitness_single(self, candidate: Mol):
+    def transform(self, values: np.ndarray):
         """
-        Returns the fitness of a set of Mol object.
-        In this case it's the largest ring penalty of the molecule.
+        Scores largest ring sizes (rings larger than max_rings are penalized).
 
         Parameters
         ----------
-        candidate: Mol
-            Mol object to evaluate.
+        values: np.ndarray
+            largest ring sizes
 
         Returns
         -------
-        float:
-            ring penalty scores of the candidate Mol object.
+        np.ndarray:
+            penalized ring size scores
         """
-        return self._ring_size(candidate)
+        return np.where(values > self.max_rings, 1 / np.log((values - self.max_rings) * 100), 1.0)
 
     def method_str(self):
         """
@@ -691,7 +890,7 @@ class NumberOfLargeRings(ChemicalEvaluationFunction):
         return "NumberOfLargeRings"
 
 
-class StereoisomersCounter(ChemicalEvaluationFunction):
+class StereoisomersCounter(DescriptorEvaluationFunction):
     """
     Number Of Stereoisomers evaluation function.
     Computes the number of stereoisomers of molecules.
@@ -711,9 +910,9 @@ class StereoisomersCounter(ChemicalEvaluationFunction):
         self.max_chiral_count = max_chiral_count
         super(StereoisomersCounter, self).__init__(maximize, worst_fitness)
 
-    def _chiral_count(self, mol: Mol):
+    def descriptor(self, mol: Mol):
         """
-        Computes the chiral count of a molecule and penalizes molecules with many stereoisomers.
+        Computes the number of (unique) stereoisomers of a molecule.
 
         Parameters
         ----------
@@ -723,35 +922,25 @@ class StereoisomersCounter(ChemicalEvaluationFunction):
         Returns
         -------
         int
-            penalized chiral count score
+            number of stereoisomers of the molecule
         """
-        try:
-            chiralCount = EnumerateStereoisomers.GetStereoisomerCount(mol,
-                                                                      options=StereoEnumerationOptions(unique=True))
-            if chiralCount < self.max_chiral_count:
-                return 1.0
-            else:
-                return 1.0 / np.log(chiralCount * 100.0)
+        return DescriptorMemo.get(mol, 'StereoisomerCount')
 
-        except Exception:
-            return self.worst_fitness
-
-    def get_fitness_single(self, candidate: Mol):
+    def transform(self, values: np.ndarray):
         """
-        Returns the fitness of a single Mol object.
-        In this case it's the stereoisomers count penalty of the molecule.
+        Scores chiral counts (molecules with max_chiral_count or more stereoisomers are penalized).
 
         Parameters
         ----------
-        candidate: Mol
-            Mol object to evaluate.
+        values: np.ndarray
+            chiral counts
 
         Returns
         -------
-        int:
-            stereoisomers count penalty score of the candidate Mol object.
+        np.ndarray:
+            penalized chiral count scores
         """
-        return self._chiral_count(candidate)
+        return np.where(values < self.max_chiral_count, 1.0, 1.0 / np.log(values * 100.0))
 
     def method_str(self):
         """
@@ -769,13 +958,20 @@ class SimilarityToInitial(ChemicalEvaluationFunction):
     """
     Similarity to Initial evaluation function.
     Compares current solutions with the initial population in terms of Tanimoto Similarity.
+    With fingerprint='packed' the initial population is stored as a packed bit matrix of Morgan fingerprints
+    (see PackedFingerprintMatrix) and batches of molecules are compared with all the initial compounds at once, which
+    makes large initial populations practical (similarities of bit fingerprints differ from the ones of the default
+    Morgan count fingerprints).
     """
 
     def __init__(self,
                  initial_population: List[str],
                  method: str = 'max',
                  maximize: bool = True,
-                 worst_fitness: float = 0.0):
+                 worst_fitness: float = 0.0,
+                 fingerprint: str = 'count',
+                 n_bits: int = 2048,
+                 memmap_path: str = None):
         """
         Initializes the SimilarityToInitial evaluation function.
 
@@ -790,10 +986,97 @@ class SimilarityToInitial(ChemicalEvaluationFunction):
             if the goal is to maximize (True) or minimize (False) the fitness of the evaluation function.
         worst_fitness: float
             The worst fitness possible for the evaluation function.
+        fingerprint: str
+            fingerprints used to compare the molecules: 'count' (Morgan count fingerprints) or 'packed' (Morgan bit
+            fingerprints of n_bits stored in a packed bit matrix).
+        n_bits: int
+            number of bits of the packed fingerprints.
+        memmap_path: str
+            path of a .npy file to memory-map the packed fingerprints of the initial population from (kept in memory
+            if None). The file is rebuilt if it was built from other compounds or fingerprint parameters.
         """
         super(SimilarityToInitial, self).__init__(maximize, worst_fitness)
-        self.fingerprints = [AllChem.GetMorganFingerprint(MolFromSmiles(cmp), 2) for cmp in initial_population]
+        if fingerprint not in ('count', 'packed'):
+            raise ValueError(f"Invalid fingerprint: {fingerprint}. Available fingerprints: 'count' and 'packed'.")
+        self.fingerprint = fingerprint
         self.method = method
+        if fingerprint == 'packed':
+            self.n_bits = n_bits
+            self.fingerprints = None
+            self._packed = PackedFingerprintMatrix.from_molecules(initial_population, n_bits=n_bits, path=memmap_path)
+        else:
+            self.fingerprints = [AllChem.GetMorganFingerprint(MolFromSmiles(cmp), 2) for cmp in initial_population]
+            self._packed = None
+        self._population_hash = hashlib.sha1('\n'.join(initial_population).encode()).hexdigest()
+
+    def _signature_params(self):
+        """
+        Internal method to get the parameters that define the fitness computed by the evaluation function.
+        Includes a hash of the initial population.
+
+        Returns
+        -------
+        dict:
+            parameters of the evaluation function
+        """
+        params = super(SimilarityToInitial, self)._signature_params()
+        params['initial_population'] = self._population_hash
+        return params
+
+    @property
+    def parallel(self):
+        """
+        Checks if the evaluation function is evaluated one molecule at a time (packed fingerprints are compared in
+        batch).
+
+        Returns
+        -------
+        bool:
+            True if the fingerprints are not packed. False otherwise.
+        """
+        return self._packed is None
+
+    def _packed_similarities(self, mols: List[Mol]):
+        """
+        Computes the (max or mean) Tanimoto similarity between a batch of molecules and the packed fingerprints of
+        the initial population.
+
+        Parameters
+        ----------
+        mols: List[Mol]
+            Mol objects to compare
+
+        Returns
+        -------
+        np.ndarray:
+            similarity of each molecule (NaN for invalid molecules or methods)
+        """
+        try:
+            return self._packed.similarities(mols, self.method)
+        except ValueError:
+            return np.full(len(mols), np.nan)
+
+    def get_fitness(self, candidates: Union[Mol, List[Mol]]):
+        """
+        Evaluates the fitness of the candidate(s).
+        Packed fingerprints are compared with the whole batch of candidates at once.
+
+        Parameters
+        ----------
+        candidates: Union[Mol, List[Mol]]
+            The candidate(s) to evaluate.
+
+        Returns
+        -------
+        List[float]
+            The fitness(es) of the candidate(s).
+        """
+        if self._packed is None:
+            return super(SimilarityToInitial, self).get_fitness(candidates)
+        if isinstance(candidates, Mol):
+            candidates = [candidates]
+        distances = 1 - self._packed_similarities(candidates)
+        return np.where(np.isnan(distances), self.worst_fitness, distances).tolist()
 
     def _compute_distance(self, mol: Mol):
         """
@@ -809,6 +1092,8 @@ class SimilarityToInitial(ChemicalEvaluationFunction):
         int:
             distance score
         """
+        if self._packed is not None:
+            return self.get_fitness([mol])[0]
         try:
             fp = AllChem.GetMorganFingerprint(mol, 2)
             similarities = DataStructs.BulkTanimotoSimilarity(fp, self.fingerprints)
@@ -852,6 +1137,8 @@ class SimilarityToInitial(ChemicalEvaluationFunction):
         int:
             similarity score
         """
+        if self._packed is not None:
+            return self._packed_similarities([mol])[0]
         try:
             fp = AllChem.GetMorganFingerprint(mol, 2)
             similarities = DataStructs.BulkTanimotoSimilarity(fp, self.fingerprints)
@@ -900,6 +1187,7 @@ class TargetSimilarity(ChemicalEvaluationFunction):
         if target_mol is None:
             raise ValueError("Invalid target smiles")
         self.target_fingerprint = AllChem.GetMorganFingerprint(target_mol, 2)
+        self.target = target
 
     def _compute_similarity(self, mol: Mol):
         """
@@ -963,6 +1251,9 @@ class SAS(ChemicalEvaluationFunction):
         http://www.jcheminf.com/content/1/1/8
     """
 
+    # 'sascorer' module (imported once per process)
+    _sascorer = None
+
     def __init__(self,
                  maximize: bool = True,
                  worst_fitness: float = 0.0):
@@ -978,6 +1269,33 @@ class SAS(ChemicalEvaluationFunction):
         """
         super(SAS, self).__init__(maximize, worst_fitness)
 
+    @staticmethod
+    def _load_sascorer():
+        """
+        Internal method to import the 'sascorer' module from the RDKit Contrib directory (only once per process).
+
+        Returns
+        -------
+        module:
+            'sascorer' module
+        """
+        if SAS._sascorer is None:
+            sys.path.append(os.path.join(RDConfig.RDContribDir, 'SA_Score'))
+            try:
+                import sascorer
+            except ImportError:
+                raise ImportError("'sascorer' not available.")
+            # fragment scores are read on the first call
+            sascorer.readFragmentScores()
+            SAS._sascorer = sascorer
+        return SAS._sascorer
+
+    def prepare(self):
+        """
+        Loads the 'sascorer' module and its fragment scores.
+        """
+        self._load_sascorer()
+
     def _sas_score(self, mol: Mol):
         """
         Computes the synthetic accessibility score of the molecule.
@@ -993,12 +1311,7 @@ class SAS(ChemicalEvaluationFunction):
             synthetic accessibility score of the molecule
         """
         try:
-            sys.path.append(os.path.join(RDConfig.RDContribDir, 'SA_Score'))
-            try:
-                import sascorer
-            except ImportError:
-                raise ImportError("'sascorer' not available.")
-            score = sascorer.calculateScore(mol)
+            score = self._load_sascorer().calculateScore(mol)
             # value - minimum / maximum - minimum
             normalized_score = (score - 1) / (10 - 1)
             # 1 - normalized_score (so higher scores represent higher fitness when maximizing)
@@ -1070,6 +1383,7 @@ class Docking(ChemicalEvaluationFunction):
         except ImportError:
             raise ImportError("'dockstring' not available (https://github.com/dockstring/dockstring).")
         self.target = load_target(target)
+        self.target_name = target
 
     def _docking_score(self, mol: Union[Mol, str]):
         """
@@ -1087,7 +1401,7 @@ class Docking(ChemicalEvaluationFunction):
         """
         try:
             if isinstance(mol, Mol):
-                smiles = MolToSmiles(mol)
+                smiles = MolCache.shared().to_smiles(mol)
             else:
                 smiles = mol
             score, _ = self.target.dock(smiles)
@@ -0,0 +1,295 @@
+import copy
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+from joblib import effective_n_jobs
+from rdkit import RDLogger
+from rdkit.Chem import Mol
+
+from reactea.chem.descriptors import DescriptorMemo
+from reactea.optimization.evaluation import ChemicalEvaluationFunction, AggregatedSum, DescriptorEvaluationFunction
+
+# state of the worker processes (evaluation functions are loaded once per worker)
+_worker_state = {}
+
+
+def _init_worker(functions):
+    """
+    Initializes a worker process with the evaluation functions (and preloads their models and SMARTS patterns).
+    """
+    RDLogger.DisableLog("rdApp.*")
+    for f in functions:
+        f.prepare()
+    _worker_state['functions'] = functions
+
+
+def _evaluate_chunk(function_idx: int, candidates: List[Mol]):
+    """
+    Evaluates a chunk of molecules in a worker process.
+
+    Parameters
+    ----------
+    function_idx: int
+        position of the evaluation function
+    candidates: List[Mol]
+        molecules to evaluate
+
+    Returns
+    -------
+    List[float]:
+        fitness of the molecules
+    """
+    f = _worker_state['functions'][function_idx]
+    return [f.get_fitness_single(candidate) for candidate in candidates]
+
+
+def _evaluate_chunk_many(functions_idx: List[int], candidates: List[Mol], descriptors: bool = False):
+    """
+    Evaluates a chunk of molecules with multiple evaluation functions in a worker process.
+
+    Parameters
+    ----------
+    functions_idx: List[int]
+        positions of the evaluation functions
+    candidates: List[Mol]
+        molecules to evaluate
+    descriptors: bool
+        if True, descriptor based evaluation functions return the (unscored) descriptors of the molecules
+
+    Returns
+    -------
+    List[List[float]]:
+        fitness of each molecule for each evaluation function
+    """
+    return _evaluate_many([_worker_state['functions'][i] for i in functions_idx], candidates, descriptors)
+
+
+def _evaluate_many(functions: List[ChemicalEvaluationFunction], candidates: List[Mol], descriptors: bool = False):
+    """
+    Evaluates molecules with multiple evaluation functions (sharing the descriptors of each molecule).
+
+    Parameters
+    ----------
+    functions: List[ChemicalEvaluationFunction]
+        evaluation functions
+    candidates: List[Mol]
+        molecules to evaluate
+    descriptors: bool
+        if True, descriptor based evaluation functions return the (unscored) descriptors of the molecules
+
+    Returns
+    -------
+    List[List[float]]:
+        fitness of each molecule for each evaluation function
+    """
+    raw = [descriptors and isinstance(f, DescriptorEvaluationFunction) for f in functions]
+    with DescriptorMemo.scope():
+        return [[f.descriptors([candidate])[0] if r else f.get_fitness_single(candidate)
+                 for f, r in zip(functions, raw)] for candidate in candidates]
+
+
+class EvaluationExecutor:
+    """
+    Class to represent a long-lived pool of workers shared by the evaluation functions of a run.
+    The workers are started once (when first needed) and each worker process keeps a copy of the evaluation
+    functions, so only the molecules are sent with each chunk.
+    Only evaluation functions that can be evaluated one molecule at a time (see ChemicalEvaluationFunction.parallel)
+    are registered (including the functions aggregated by AggregatedSum functions, so they can be evaluated
+    separately by an EvaluationPlan); the others (e.g. batched model predictions) keep being evaluated by the main
+    process.
+    """
+
+    BACKENDS = ('process', 'thread', 'sequential')
+
+    def __init__(self, functions: List[ChemicalEvaluationFunction], n_jobs: int = -1, chunk_size: int = 0,
+                 backend: str = 'process'):
+        """
+        Initializes the Evaluation Executor (the workers are only started when first needed).
+
+        Parameters
+        ----------
+        functions: List[ChemicalEvaluationFunction]
+            evaluation functions of the run
+        n_jobs: int
+            number of workers (-1 to use all processors)
+        chunk_size: int
+            number of molecules sent to a worker at once (0 to split each batch in 4 chunks per worker)
+        backend: str
+            'process' (worker processes), 'thread' (worker threads) or 'sequential' (main process only)
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown evaluation backend: {backend}. Available backends: {list(self.BACKENDS)}")
+        self.functions = []
+        for f in self._walk(functions):
+            if f.parallel and all(f is not registered for registered in self.functions):
+                self.functions.append(f)
+        self.n_workers = effective_n_jobs(n_jobs)
+        self.chunk_size = chunk_size
+        self.backend = backend if self.n_workers > 1 else 'sequential'
+        self._positions = {id(f): i for i, f in enumerate(self.functions)}
+        self._executor = None
+        self._pending = set()
+
+    @staticmethod
+    def _walk(functions: List[ChemicalEvaluationFunction]):
+        """
+        Internal method to iterate over evaluation functions and the functions they aggregate (at any depth).
+        """
+        for f in functions:
+            yield f
+            if isinstance(f, AggregatedSum):
+                yield from EvaluationExecutor._walk(f.fevaluation)
+
+    @staticmethod
+    def from_configs(configs: dict, functions: List[ChemicalEvaluationFunction]):
+        """
+        Builds the Evaluation Executor from the configurations of the experiment and attaches it to the evaluation
+        functions it can evaluate.
+
+        Parameters
+        ----------
+        configs: dict
+            configurations of the experiment (keys 'evaluation_jobs', 'evaluation_chunk_size' and
+            'evaluation_backend')
+        functions: List[ChemicalEvaluationFunction]
+            evaluation functions of the run
+
+        Returns
+        -------
+        EvaluationExecutor:
+            evaluation executor
+        """
+        executor = EvaluationExecutor(functions,
+                                      configs.get('evaluation_jobs', -1),
+                                      configs.get('evaluation_chunk_size', 0),
+                                      configs.get('evaluation_backend', 'process'))
+        for f in functions:
+            if f.parallel:
+                f.executor = executor
+        return executor
+
+    def _get_executor(self):
+        """
+        Internal method to start the workers.
+
+        Returns
+        -------
+        Union[ProcessPoolExecutor, ThreadPoolExecutor]:
+            executor with the workers
+        """
+        if self._executor is None:
+            if self.backend == 'process':
+                # the workers do not dispatch evaluations of their own
+                worker_functions = [copy.copy(f) for f in self.functions]
+                for f in worker_functions:
+                    f.executor = None
+                self._executor = ProcessPoolExecutor(max_workers=self.n_workers,
+                                                     mp_context=multiprocessing.get_context(),
+                                                     initializer=_init_worker,
+                                                     initargs=(worker_functions,))
+            else:
+                for f in self.functions:
+                    f.prepare()
+                self._executor = ThreadPoolExecutor(max_workers=self.n_workers)
+        return self._executor
+
+    def _submit(self, fn, *args):
+        """
+        Internal method to submit a task to the workers (pending tasks are tracked so they can be cancelled when the
+        workers are shut down).
+        """
+        future = self._get_executor().submit(fn, *args)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def map(self, function: ChemicalEvaluationFunction, candidates: List[Mol]):
+        """
+        Evaluates a batch of molecules with an evaluation function.
+
+        Parameters
+        ----------
+        function: ChemicalEvaluationFunction
+            evaluation function (evaluated by the main process if it is not registered in the executor)
+        candidates: List[Mol]
+            molecules to evaluate
+
+        Returns
+        -------
+        List[float]:
+            fitness of the molecules (in the same order as the molecules)
+        """
+        function_idx = self._positions.get(id(function))
+        if self.backend == 'sequential' or function_idx is None or len(candidates) <= 1:
+            return [function.get_fitness_single(candidate) for candidate in candidates]
+        if self.backend == 'process':
+            futures = [self._submit(_evaluate_chunk, function_idx, chunk) for chunk in self._chunks(candidates)]
+        else:
+            futures = [self._submit(lambda c: [function.get_fitness_single(m) for m in c], chunk)
+                       for chunk in self._chunks(candidates)]
+        return [score for future in futures for score in future.result()]
+
+    def _chunks(self, candidates: List[Mol]):
+        """
+        Internal method to split a batch of molecules into the chunks sent to the workers.
+        """
+        chunk_size = self.chunk_size
+        if chunk_size <= 0:
+            chunk_size = max(1, math.ceil(len(candidates) / (4 * self.n_workers)))
+        return [candidates[i:i + chunk_size] for i in range(0, len(candidates), chunk_size)]
+
+    def map_many(self, functions: List[ChemicalEvaluationFunction], candidates: List[Mol], descriptors: bool = False):
+        """
+        Evaluates a batch of molecules with multiple evaluation functions in a single pass (each molecule is sent to
+        a worker once).
+
+        Parameters
+        ----------
+        functions: List[ChemicalEvaluationFunction]
+            evaluation functions (evaluated by the main process if any of them is not registered in the executor)
+        candidates: List[Mol]
+            molecules to evaluate
+        descriptors: bool
+            if True, descriptor based evaluation functions (see DescriptorEvaluationFunction) return the unscored
+            descriptors of the molecules, to be scored in batch with their score method
+
+        Returns
+        -------
+        np.ndarray:
+            fitness of the molecules (one row per molecule and one column per evaluation function)
+        """
+        functions_idx = [self._positions.get(id(f)) for f in functions]
+        if self.backend == 'sequential' or None in functions_idx or len(candidates) <= 1:
+            results = [_evaluate_many(functions, candidates, descriptors)]
+        else:
+            if self.backend == 'process':
+                futures = [self._submit(_evaluate_chunk_many, functions_idx, chunk, descriptors)
+                           for chunk in self._chunks(candidates)]
+            else:
+                futures = [self._submit(_evaluate_many, functions, chunk, descriptors)
+                           for chunk in self._chunks(candidates)]
+            results = [future.result() for future in futures]
+        scores = [row for chunk_scores in results for row in chunk_scores]
+        return np.array(scores, dtype=np.float64).reshape(len(candidates), len(functions))
+
+    def close(self):
+        """
+        Shuts down the workers.
+        """
+        if self._executor is not None:
+            # pending tasks are cancelled and running tasks are waited for
+            for future in list(self._pending):
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pending = set()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # workers are not shared
+        state['_executor'] = None
+        state['_pending'] = set()
+        return state
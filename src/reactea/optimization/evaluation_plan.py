@@ -0,0 +1,102 @@
+from typing import List, Union
+
+import numpy as np
+from rdkit.Chem import Mol
+
+from reactea.chem.descriptors import DescriptorMemo
+from reactea.optimization.evaluation import ChemicalEvaluationFunction, AggregatedSum, DescriptorEvaluationFunction
+from reactea.optimization.evaluation_executor import EvaluationExecutor, _evaluate_many
+
+
+class EvaluationPlan:
+    """
+    Class to represent a fused evaluation of multiple objectives.
+    Objectives are flattened into their leaf evaluation functions (the children of AggregatedSum functions, at any
+    depth) and a weights matrix, so the objectives are computed as leaf_scores @ weights.
+    Leaf functions that can be evaluated one molecule at a time are all computed in a single pass (each molecule is
+    sent to a worker once); the others (e.g. batched model predictions) are evaluated in batch by the main process.
+    The leaf functions share the descriptors of each molecule (see DescriptorMemo) during an evaluation, and the
+    descriptors of descriptor based leaf functions (see DescriptorEvaluationFunction) are scored in batch.
+    """
+
+    def __init__(self, functions: List[ChemicalEvaluationFunction]):
+        """
+        Initializes the Evaluation Plan.
+
+        Parameters
+        ----------
+        functions: List[ChemicalEvaluationFunction]
+            evaluation functions of the objectives
+        """
+        self.functions = functions
+        self.leaves = []
+        positions = {}
+        weights = []
+        for j, f in enumerate(functions):
+            for leaf, weight in self._flatten(f, 1.0):
+                if id(leaf) not in positions:
+                    positions[id(leaf)] = len(self.leaves)
+                    self.leaves.append(leaf)
+                    weights.append([0.0] * len(functions))
+                weights[positions[id(leaf)]][j] += weight
+        self.weights = np.array(weights, dtype=np.float64).reshape(len(self.leaves), len(functions))
+        self.parallel_leaves = [i for i, leaf in enumerate(self.leaves) if leaf.parallel]
+        self.batch_leaves = [i for i, leaf in enumerate(self.leaves) if not leaf.parallel]
+        self.descriptor_leaves = [i for i in self.parallel_leaves
+                                  if isinstance(self.leaves[i], DescriptorEvaluationFunction)]
+
+    @staticmethod
+    def _flatten(f: ChemicalEvaluationFunction, weight: float):
+        """
+        Internal method to flatten an evaluation function into its leaf functions.
+
+        Parameters
+        ----------
+        f: ChemicalEvaluationFunction
+            evaluation function
+        weight: float
+            weight of the evaluation function
+
+        Returns
+        -------
+        List[Tuple[ChemicalEvaluationFunction, float]]:
+            leaf functions and their weights
+        """
+        if not isinstance(f, AggregatedSum):
+            return [(f, weight)]
+        leaves = []
+        for child, tradeoff in zip(f.fevaluation, f.tradeoffs):
+            leaves.extend(EvaluationPlan._flatten(child, weight * tradeoff))
+        return leaves
+
+    def evaluate(self, candidates: List[Mol], executor: Union[EvaluationExecutor, None] = None):
+        """
+        Evaluates the objectives of a batch of molecules.
+
+        Parameters
+        ----------
+        candidates: List[Mol]
+            molecules to evaluate
+        executor: Union[EvaluationExecutor, None]
+            executor whose workers evaluate the leaf functions (evaluated by the main process if None)
+
+        Returns
+        -------
+        np.ndarray:
+            fitness of the molecules (one row per molecule and one column per objective)
+        """
+        scores = np.zeros((len(candidates), len(self.leaves)), dtype=np.float64)
+        if len(candidates) == 0:
+            return scores @ self.weights
+        with DescriptorMemo.scope():
+            if len(self.parallel_leaves) > 0:
+                parallel_leaves = [self.leaves[i] for i in self.parallel_leaves]
+                if executor is not None:
+                    scores[:, self.parallel_leaves] = executor.map_many(parallel_leaves, candidates, descriptors=True)
+                else:
+                    scores[:, self.parallel_leaves] = _evaluate_many(parallel_leaves, candidates, descriptors=True)
+            for i in self.descriptor_leaves:
+                scores[:, i] = self.leaves[i].score(scores[:, i])
+            for i in self.batch_leaves:
+                scores[:, i] = np.asarray(self.leaves[i].get_fitness(candidates), dtype=np.float64).reshape(-1)
+        return scores @ self.weights
@@ -0,0 +1,195 @@
+import math
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Union
+
+
+class FitnessCache:
+    """
+    Class to represent a cache of the fitness of the compounds.
+    Fitness values are keyed by the canonical SMILES of the compounds and by the signature of the evaluation function
+    (its class and configuration, see ChemicalEvaluationFunction.signature), so different evaluation functions (or the
+    same function with different parameters) never share results.
+    Results are kept in an in-memory LRU cache and, optionally, in a SQLite database shared between runs, so repeated
+    runs on the same seeds reuse earlier scores.
+    """
+
+    # maximum number of SQLite query parameters used in a single lookup
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, maxsize: int = 100000, db_path: Union[str, None] = None):
+        """
+        Initializes the Fitness Cache.
+
+        Parameters
+        ----------
+        maxsize: int
+            maximum number of fitness values kept in memory
+        db_path: Union[str, None]
+            path to the SQLite database where the fitness values are persisted (no persistence if None)
+        """
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    @staticmethod
+    def from_configs(configs: dict):
+        """
+        Builds the Fitness Cache from the configurations of the experiment.
+
+        Parameters
+        ----------
+        configs: dict
+            configurations of the experiment (keys 'fitness_cache_size' and 'fitness_cache_path')
+
+        Returns
+        -------
+        Union[FitnessCache, None]:
+            fitness cache (None if the cache size is 0)
+        """
+        maxsize = configs.get('fitness_cache_size', 100000)
+        if maxsize <= 0:
+            return None
+        return FitnessCache(maxsize, configs.get('fitness_cache_path', None))
+
+    def _connect(self):
+        """
+        Internal method to open (and create if needed) the SQLite database.
+
+        Returns
+        -------
+        sqlite3.Connection:
+            database connection
+        """
+        if self._db is None:
+            self._db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS fitness '
+                             '(signature TEXT, smiles TEXT, fitness REAL, PRIMARY KEY (signature, smiles))')
+        return self._db
+
+    def _put(self, signature: str, key: str, fitness: float):
+        """
+        Internal method to keep a fitness value in memory.
+
+        Parameters
+        ----------
+        signature: str
+            signature of the evaluation function
+        key: str
+            canonical SMILES of the compound
+        fitness: float
+            fitness of the compound
+        """
+        self._cache[(signature, key)] = fitness
+        self._cache.move_to_end((signature, key))
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def get_many(self, signature: str, keys: List[str]):
+        """
+        Gets the cached fitness values of a list of compounds.
+
+        Parameters
+        ----------
+        signature: str
+            signature of the evaluation function
+        keys: List[str]
+            canonical SMILES of the compounds
+
+        Returns
+        -------
+        Dict[str, float]:
+            fitness of the compounds that are cached
+        """
+        found = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                fitness = self._cache.get((signature, key))
+                if fitness is not None:
+                    self._cache.move_to_end((signature, key))
+                    found[key] = fitness
+                else:
+                    missing.append(key)
+            if self.db_path is not None and len(missing) > 0:
+                missing = list(dict.fromkeys(missing))
+                db = self._connect()
+                for i in range(0, len(missing), self.LOOKUP_CHUNK_SIZE):
+                    chunk = missing[i:i + self.LOOKUP_CHUNK_SIZE]
+                    rows = db.execute(f"SELECT smiles, fitness FROM fitness WHERE signature = ? AND smiles IN "
+                                      f"({', '.join('?' * len(chunk))})", (signature, *chunk)).fetchall()
+                    for key, fitness in rows:
+                        # SQLite stores NaN as NULL
+                        fitness = math.nan if fitness is None else fitness
+                        self._put(signature, key, fitness)
+                        found[key] = fitness
+        n_found = sum(1 for key in keys if key in found)
+        self.hits += n_found
+        self.misses += len(keys) - n_found
+        return found
+
+    def put_many(self, signature: str, fitness: Dict[str, float]):
+        """
+        Caches the fitness values of a set of compounds.
+
+        Parameters
+        ----------
+        signature: str
+            signature of the evaluation function
+        fitness: Dict[str, float]
+            fitness of each compound (keyed by canonical SMILES)
+        """
+        if len(fitness) == 0:
+            return
+        with self._lock:
+            for key, value in fitness.items():
+                self._put(signature, key, value)
+            if self.db_path is not None:
+                db = self._connect()
+                db.execute('BEGIN')
+                try:
+                    db.executemany('INSERT OR REPLACE INTO fitness VALUES (?, ?, ?)',
+                                   [(signature, key, value) for key, value in fitness.items()])
+                    db.execute('COMMIT')
+                except Exception:
+                    db.execute('ROLLBACK')
+                    raise
+
+    def stats(self):
+        """
+        Gets the cache statistics.
+
+        Returns
+        -------
+        dict:
+            number of hits, misses and fitness values kept in memory
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache)}
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # connections and locks can not be shared between processes
+        state['_db'] = None
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
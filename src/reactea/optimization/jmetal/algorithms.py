@@ -1,7 +1,8 @@
-from copy import deepcopy
+from copy import copy, deepcopy
 from typing import List
 
 import cytoolz
+from jmetal.algorithm.multiobjective import NSGAII
 from jmetal.algorithm.multiobjective.nsgaiii import NSGAIII
 from jmetal.algorithm.singleobjective import GeneticAlgorithm, EvolutionStrategy
 from jmetal.util.constraint_handling import overall_constraint_violation_degree
@@ -9,6 +10,55 @@ from jmetal.util.constraint_handling import overall_constraint_violation_degree
 from reactea.optimization.solution import ChemicalSolution
 
 
+def batch_reproduction(algorithm: GeneticAlgorithm, mating_population: List[ChemicalSolution]):
+    """
+    Creates the offspring population of a genetic algorithm applying the crossover and mutation operators to the
+    whole mating population at once (see ReactorMutation.execute_batch).
+    Falls back to the jMetal reproduction (one offspring at a time) if the mutation operator is not in batch mode.
+
+    Parameters
+    ----------
+    algorithm: GeneticAlgorithm
+        genetic algorithm (or NSGAII/NSGAIII)
+    mating_population: List[ChemicalSolution]
+        mating population
+
+    Returns
+    -------
+    List[ChemicalSolution]:
+        offspring population
+    """
+    number_of_parents_to_combine = algorithm.crossover_operator.get_number_of_parents()
+    if len(mating_population) % number_of_parents_to_combine != 0:
+        raise Exception('Wrong number of parents')
+    parents = [mating_population[i:i + number_of_parents_to_combine]
+               for i in range(0, algorithm.offspring_population_size, number_of_parents_to_combine)]
+    if hasattr(algorithm.crossover_operator, 'execute_batch'):
+        offspring = algorithm.crossover_operator.execute_batch(parents)
+    else:
+        offspring = [algorithm.crossover_operator.execute(parent) for parent in parents]
+    offspring_population = [solution for children in offspring for solution in children]
+    offspring_population = offspring_population[:algorithm.offspring_population_size]
+    return algorithm.mutation_operator.execute_batch(offspring_population)
+
+
+def is_batch(mutation):
+    """
+    Checks if a mutation operator mutates batches of solutions.
+
+    Parameters
+    ----------
+    mutation: Mutation
+        mutation operator
+
+    Returns
+    -------
+    bool:
+        True if the operator is in batch mode, False otherwise
+    """
+    return getattr(mutation, 'batch', False) and hasattr(mutation, 'execute_batch')
+
+
 class ReactorGeneticAlgorithm(GeneticAlgorithm):
     """
     Class representing a Reactor Genetic Algorithm.
@@ -24,6 +74,24 @@ class ReactorGeneticAlgorithm(GeneticAlgorithm):
         """
         super(ReactorGeneticAlgorithm, self).__init__(**kwarg)
 
+    def reproduction(self, mating_population: List[ChemicalSolution]):
+        """
+        Creates the offspring population (the whole population is mutated at once in batch mode).
+
+        Parameters
+        ----------
+        mating_population: List[ChemicalSolution]
+            mating population
+
+        Returns
+        -------
+        List[ChemicalSolution]:
+            offspring population
+        """
+        if is_batch(self.mutation_operator):
+            return batch_reproduction(self, mating_population)
+        return super(ReactorGeneticAlgorithm, self).reproduction(mating_population)
+
     def replacement(self, population: List[ChemicalSolution], offspring_population: List[ChemicalSolution]):
         """
         Performs replacement of the less fit solutions by better solutions without repetitions (if possible)
@@ -80,6 +148,26 @@ class ReactorEvolutionStrategy(EvolutionStrategy):
     def evaluate(self, solution_list: List[ChemicalSolution]):
         return self.population_evaluator.evaluate(deepcopy(solution_list), self.problem)
 
+    def reproduction(self, population: List[ChemicalSolution]):
+        """
+        Creates the offspring population (the whole population is mutated at once in batch mode).
+
+        Parameters
+        ----------
+        population: List[ChemicalSolution]
+            current population
+
+        Returns
+        -------
+        List[ChemicalSolution]:
+            offspring population
+        """
+        if is_batch(self.mutation_operator):
+            offspring_population = [copy(solution) for solution in population
+                                    for _ in range(int(self.lambda_ / self.mu))]
+            return self.mutation_operator.execute_batch(offspring_population)
+        return super(ReactorEvolutionStrategy, self).reproduction(population)
+
     def replacement(self,
                     population: List[ChemicalSolution],
                     offspring_population: List[ChemicalSolution]) -> List[ChemicalSolution]:
@@ -127,6 +215,66 @@ class ReactorNSGAIII(NSGAIII):
         """
         super(ReactorNSGAIII, self).__init__(**kwarg)
 
+    def reproduction(self, mating_population: List[ChemicalSolution]):
+        """
+        Creates the offspring population (the whole population is mutated at once in batch mode).
+
+        Parameters
+        ----------
+        mating_population: List[ChemicalSolution]
+            mating population
+
+        Returns
+        -------
+        List[ChemicalSolution]:
+            offspring population
+        """
+        if is_batch(self.mutation_operator):
+            return batch_reproduction(self, mating_population)
+        return super(ReactorNSGAIII, self).reproduction(mating_population)
+
+    def get_result(self):
+        """
+        Get the EA results.
+
+        Returns
+        -------
+        List[Solutions]:
+            list of the EA solutions.
+        """
+        return self.solutions
+
+
+class ReactorNSGAII(NSGAII):
+
+    def __init__(self, **kwarg):
+        """
+        Initializes a ReactorNSGAII object.
+        Parameters
+        ----------
+        kwarg
+            kwargs to use (see NSGAII arguments)
+        """
+        super(ReactorNSGAII, self).__init__(**kwarg)
+
+    def reproduction(self, mating_population: List[ChemicalSolution]):
+        """
+        Creates the offspring population (the whole population is mutated at once in batch mode).
+
+        Parameters
+        ----------
+        mating_population: List[ChemicalSolution]
+            mating population
+
+        Returns
+        -------
+        List[ChemicalSolution]:
+            offspring population
+        """
+        if is_batch(self.mutation_operator):
+            return batch_reproduction(self, mating_population)
+        return super(ReactorNSGAII, self).reproduction(mating_population)
+
     def get_result(self):
         """
         Get the EA results.
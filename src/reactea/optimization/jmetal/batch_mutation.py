@@ -0,0 +1,142 @@
+import copy
+import multiprocessing
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List
+
+from rdkit import RDLogger
+
+from reactea.optimization.solution import ChemicalSolution
+
+# state of the worker processes (the mutation operator is loaded once per worker)
+_worker_state = {}
+
+
+def _init_worker(mutation):
+    """
+    Initializes a worker process with a copy of the mutation operator.
+    """
+    RDLogger.DisableLog("rdApp.*")
+    _worker_state['mutation'] = mutation
+
+
+def _mutate_task(solution: ChemicalSolution, seed: int):
+    """
+    Mutates a solution in a worker process.
+
+    Parameters
+    ----------
+    solution: ChemicalSolution
+        solution to mutate
+    seed: int
+        seed of the random number generator of the mutation
+
+    Returns
+    -------
+    Tuple[ChemicalSolution, Union[Tuple[str, Union[str, int]], None], List[Tuple[int, bool]]]
+        mutated solution, transformation (mutant SMILES and rule id, None if the solution was not mutated) and
+        outcomes of the rules tried
+    """
+    return _worker_state['mutation']._mutate(solution, random.Random(seed), None)
+
+
+def _mutate_chunk(solutions: List[ChemicalSolution], seeds: List[int]):
+    """
+    Mutates a chunk of solutions in a worker process (see _mutate_task).
+    """
+    return [_mutate_task(solution, seed) for solution, seed in zip(solutions, seeds)]
+
+
+class BatchMutationPool:
+    """
+    Class to represent a pool of worker processes that mutate batches of solutions in parallel.
+    Each worker keeps a copy of the mutation operator (reaction rules, rule index, memo and standardizer), so they are
+    only sent once and their caches are reused between generations.
+    The outcomes of the rules tried are returned to the main process, which keeps the reaction rules statistics (the
+    bandit rule selections of the workers learn from their own trials only).
+    """
+
+    def __init__(self, mutation, n_workers: int = 2, chunk_size: int = 1):
+        """
+        Initializes the Batch Mutation Pool (the worker processes are only started when first needed).
+
+        Parameters
+        ----------
+        mutation: ReactorMutation
+            mutation operator (copied to each worker)
+        n_workers: int
+            number of worker processes
+        chunk_size: int
+            number of solutions sent to a worker at once
+        """
+        self.mutation = mutation
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._pending = set()
+
+    def _get_executor(self):
+        """
+        Internal method to start the worker processes.
+
+        Returns
+        -------
+        ProcessPoolExecutor:
+            executor with the worker processes
+        """
+        if self._executor is None:
+            # transformations are logged by the main process and the workers do not start pools of their own
+            worker_mutation = copy.copy(self.mutation)
+            worker_mutation.logger = None
+            worker_mutation.rule_trials = None
+            worker_mutation.batch_pool = None
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers,
+                                                 mp_context=multiprocessing.get_context(),
+                                                 initializer=_init_worker,
+                                                 initargs=(worker_mutation,))
+        return self._executor
+
+    def map(self, solutions: List[ChemicalSolution], seeds: List[int]):
+        """
+        Mutates a batch of solutions.
+
+        Parameters
+        ----------
+        solutions: List[ChemicalSolution]
+            solutions to mutate
+        seeds: List[int]
+            seeds of the random number generators of each mutation
+
+        Returns
+        -------
+        List[Tuple[ChemicalSolution, Union[Tuple[str, Union[str, int]], None], List[Tuple[int, bool]]]]
+            mutated solutions, transformations and outcomes of the rules tried (in the same order as the solutions)
+        """
+        if len(solutions) == 0:
+            return []
+        executor = self._get_executor()
+        futures = [executor.submit(_mutate_chunk, solutions[i:i + self.chunk_size], seeds[i:i + self.chunk_size])
+                   for i in range(0, len(solutions), self.chunk_size)]
+        for future in futures:
+            # pending chunks are cancelled if the pool is shut down
+            self._pending.add(future)
+            future.add_done_callback(self._pending.discard)
+        return [result for future in futures for result in future.result()]
+
+    def close(self):
+        """
+        Shuts down the worker processes.
+        """
+        if self._executor is not None:
+            for future in list(self._pending):
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._pending = set()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # worker processes are not shared
+        state['_executor'] = None
+        state['_pending'] = set()
+        return state
@@ -1,12 +1,13 @@
 from typing import List
 
-from jmetal.algorithm.multiobjective import NSGAII, SPEA2, IBEA, RandomSearch
+from jmetal.algorithm.multiobjective import SPEA2, IBEA, RandomSearch
 from jmetal.algorithm.singleobjective import SimulatedAnnealing, LocalSearch
 
 from reactea.optimization.ea import AbstractEA
 from .algorithms import ReactorGeneticAlgorithm as GeneticAlgorithm
 from .algorithms import ReactorEvolutionStrategy as EvolutionStrategy
 from .algorithms import ReactorNSGAIII as NSGAIII
+from .algorithms import ReactorNSGAII as NSGAII
 from .evaluators import ChemicalEvaluator
 from .generators import ChemicalGenerator
 from .observers import PrintObjectivesStatObserver, VisualizerObserver
@@ -14,10 +15,12 @@ from .problem import JmetalProblem
 from reactea.constants import EAConstants, ChemConstants, GAConstants, NSGAIIIConstants, \
     LSConstants, NSGAIIConstants, SPEA2Constants
 from .terminators import StoppingByEvaluationsOrImprovement, StoppingByEvaluations
+from ..evaluation_executor import EvaluationExecutor
+from ..fitness_cache import FitnessCache
 from ..problem import ChemicalProblem
 from ...chem.compounds import Compound
 from ...chem.reaction_rules import ReactionRule
-from reactea.chem.standardization import MolecularStandardizer
+from reactea.chem.standardization import MolecularStandardizer, CachedStandardizer
 from ...io_streams import Writers
 
 
@@ -52,7 +55,7 @@ class ChemicalEA(AbstractEA):
         reaction_rules: List[ReactionRule]
             pool of available reaction rules
         standardizer: MolecularStandardizer
-            molecular standardizer to use
+            molecular standardizer (or standardizer class) to use
         max_generations: int
             maximum number of generations
         visualizer: bool
@@ -65,8 +68,17 @@ class ChemicalEA(AbstractEA):
         super(ChemicalEA, self).__init__(problem, initial_population, max_generations, visualizer)
         self.algorithm_name = algorithm
         self.reaction_rules = reaction_rules
-        self.standardizer = standardizer
+        # standardization results are cached and shared by the mutation and crossover operators
+        self.standardizer = CachedStandardizer.from_configs(standardizer, configs if configs is not None else {})
         self.configs = configs
+        # fitness values are cached (and optionally persisted) keyed by compound and evaluation function
+        if isinstance(problem, ChemicalProblem) and problem.fitness_cache is None:
+            problem.fitness_cache = FitnessCache.from_configs(configs if configs is not None else {})
+        # evaluation workers are started once per run and shared by all evaluation functions
+        self.evaluation_executor = EvaluationExecutor.from_configs(configs if configs is not None else {},
+                                                                   problem.fevaluation)
+        if isinstance(problem, ChemicalProblem):
+            problem.executor = self.evaluation_executor
         self.logger = logger
         self.initial_population = ChemicalGenerator(initial_population)
         self.population_evaluator = ChemicalEvaluator()
@@ -122,7 +134,7 @@ class ChemicalEA(AbstractEA):
                                               self.standardizer,
                                               self.configs,
                                               self.logger,
-                                              )
+                                              mutation=mutation)
         except TypeError:
             crossover = EAConstants.CROSSOVER()
         if self.algorithm_name == 'SA':
@@ -227,7 +239,16 @@ class ChemicalEA(AbstractEA):
                              'GA, ES and LS!')
 
         algorithm.observable.register(observer=PrintObjectivesStatObserver())
-        algorithm.run()
+        # the fitness gain of the mutants feeds the reaction rules statistics
+        self.population_evaluator.listeners.append(mutation.update_rule_statistics)
+        try:
+            algorithm.run()
+            mutation.save_rule_statistics()
+        finally:
+            # worker pools are shut down even if the run fails
+            self.population_evaluator.listeners.remove(mutation.update_rule_statistics)
+            mutation.close()
+            self.evaluation_executor.close()
 
         result = algorithm.solutions
         return result
@@ -249,7 +270,8 @@ class ChemicalEA(AbstractEA):
             crossover = EAConstants.CROSSOVER(self.reaction_rules,
                                               self.standardizer,
                                               self.configs,
-                                              self.logger)
+                                              self.logger,
+                                              mutation=mutation)
         except TypeError:
             crossover = EAConstants.CROSSOVER()
         print(f"Running {self.algorithm_name}")
@@ -319,6 +341,15 @@ class ChemicalEA(AbstractEA):
             algorithm.observable.register(observer=VisualizerObserver())
         algorithm.observable.register(observer=PrintObjectivesStatObserver())
 
-        algorithm.run()
+        # the fitness gain of the mutants feeds the reaction rules statistics
+        self.population_evaluator.listeners.append(mutation.update_rule_statistics)
+        try:
+            algorithm.run()
+            mutation.save_rule_statistics()
+        finally:
+            # worker pools are shut down even if the run fails
+            self.population_evaluator.listeners.remove(mutation.update_rule_statistics)
+            mutation.close()
+            self.evaluation_executor.close()
         results = algorithm.solutions
         return results
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Callable
 
 from jmetal.util.evaluator import Evaluator, DaskEvaluator
 
@@ -10,8 +10,20 @@ class ChemicalEvaluator(Evaluator):
     """
     Class representing a ChemicalEvaluator evaluator.
     Evaluates ChemicalSolutions.
+    Listeners (e.g. ReactorMutation.update_rule_statistics) are called with the evaluated solutions.
     """
 
+    def __init__(self, listeners: List[Callable[[List[ChemicalSolution]], None]] = None):
+        """
+        Initializes a ChemicalEvaluator.
+
+        Parameters
+        ----------
+        listeners: List[Callable[[List[ChemicalSolution]], None]]
+            functions called with the evaluated solutions
+        """
+        self.listeners = listeners if listeners is not None else []
+
     def evaluate(self, solution_list: List[ChemicalSolution], problem: Problem):
         """
         Evaluates a list of Chemical Solutions using the problem evaluation functions.
@@ -29,4 +41,6 @@ class ChemicalEvaluator(Evaluator):
             evaluated chemical solutions
         """
         DaskEvaluator.evaluate_solution(solution_list, problem)
+        for listener in self.listeners:
+            listener(solution_list)
         return solution_list
@@ -1,12 +1,23 @@
 import copy
 import random
-from typing import List, Union
+from itertools import islice
+from typing import List, Union, Iterator, Tuple
 
+import numpy as np
 from jmetal.core.operator import Mutation, Crossover
 
 from reactea.chem.compounds import Compound
+from reactea.chem.mol_cache import MolCache
+from reactea.chem.product_filters import ProductFilterChain
+from reactea.chem.reaction_memo import ReactionOutcomeMemo
 from reactea.chem.reaction_rules import ReactionRule
+from reactea.chem.rule_index import RuleApplicabilityIndex, ReactantTemplateGroups
+from reactea.chem.rule_sampling import RuleSampler
+from reactea.chem.rule_statistics import RuleStatistics
+from reactea.chem.similarity import SimilarityEngine
 from reactea.chem.standardization import MolecularStandardizer
+from reactea.optimization.jmetal.batch_mutation import BatchMutationPool
+from reactea.optimization.jmetal.rule_trials import RuleTrialPool
 from reactea.optimization.solution import ChemicalSolution
 from reactea.chem.chem_utils import ChemUtils
 
@@ -20,7 +31,7 @@ class ReactorMutation(Mutation[ChemicalSolution]):
 
     def __init__(self,
                  reaction_rules: List[ReactionRule],
-                 standardizer: Union[MolecularStandardizer, None],
+                 standardizer: Union[MolecularStandardizer, type, None],
                  configs: dict,
                  logger: Union[callable, None] = None):
         """
@@ -30,25 +41,64 @@ class ReactorMutation(Mutation[ChemicalSolution]):
         ----------
         reaction_rules: List[ReactionRule]
             pool or reaction rules to use
-        standardizer: Union[MolecularStandardizer, None]
-            standardizer to standardize new solutions
+        standardizer: Union[MolecularStandardizer, type, None]
+            standardizer (or standardizer class) to standardize new solutions (None to not standardize)
         configs: dict
             configurations of the experiment
         logger: Union[callable, None]
             function to save all intermediate transformations (accepted and not accepted)
-        tolerance: float
         """
         super(ReactorMutation, self).__init__(probability=configs['mutation_probability'])
         self.reaction_rules = reaction_rules
-        self.standardizer = standardizer
+        # the standardizer is instantiated only once
+        self.standardizer = standardizer() if isinstance(standardizer, type) else standardizer
         self.configs = configs
         self.logger = logger
         self.tolerance = configs['tolerance']
+        # maximum number of product sets generated by a rule and number of distinct valid products considered
+        self.max_products = configs.get('max_products', 1000)
+        self.n_products = configs.get('n_products', 20)
+        self.product_filter = ProductFilterChain.from_configs(configs)
+        self.similarity_engine = SimilarityEngine(configs.get('similarity_fingerprint', 'rdkit'))
+        # per rule success and fitness gain statistics (used by the bandit rule selections)
+        self.rule_stats = RuleStatistics.from_configs(reaction_rules, configs)
+        self.rule_sampler = RuleSampler.from_configs(reaction_rules, configs, self.rule_stats)
+        if configs.get('use_rule_index', True):
+            self.rule_index = RuleApplicabilityIndex(reaction_rules)
+        else:
+            self.rule_index = None
+        if configs.get('group_rule_templates', True):
+            self.rule_groups = ReactantTemplateGroups(reaction_rules)
+        else:
+            self.rule_groups = None
+        memo_size = configs.get('reaction_memo_size', 100000)
+        self.memo = ReactionOutcomeMemo(memo_size) if memo_size > 0 else None
+        if configs.get('rule_trial_workers', 0) > 0:
+            self.rule_trials = RuleTrialPool(reaction_rules, self.product_filter, self.max_products, self.n_products,
+                                             configs['rule_trial_workers'], configs.get('rule_trial_chunk_size', 64))
+        else:
+            self.rule_trials = None
+        if configs.get('mutation_workers', 0) > 0:
+            self.batch_pool = BatchMutationPool(self, configs['mutation_workers'])
+        else:
+            self.batch_pool = None
+        # whether the algorithms should mutate the whole offspring population at once (see execute_batch)
+        self.batch = configs.get('batch_mutation', False) or self.batch_pool is not None
+        # the operator draws the seed of each mutation from its own random number generator (seeded from the global
+        # random state), so mutating solutions one at a time or in batches gives the same results
+        self.rng = random.Random(random.getrandbits(64))
 
-    def execute(self, solution: ChemicalSolution):
+    def execute(self, solution: ChemicalSolution, seed: int = None):
         """
         Executes the mutation by trying to apply a set os reaction rules to the compound.
-        Random reaction rules are picked until one can match and produce a product using the present compound.
+        Random reaction rules are drawn (one at a time, uniformly, weighted by the rule priorities or by a bandit
+        policy over the rules statistics) until one can match and produce a product using the present compound.
+        Rules that do not pass the applicability index screen are skipped without being applied, as are rules whose
+        reactant templates (matched once per compound for each group of rules sharing them) do not match.
+        Only the first distinct valid products of a rule (n_products) are considered.
+        Reaction outcomes are memoized and compounds for which all applicable rules failed are not mutated again.
+        If a pool of workers is configured (rule_trial_workers), chunks of rules are tried in parallel and the first
+        successful rule (in the sampled order) is used.
         If a maximum number of tries is reached without a match the mutation doesn't happen and the compound
         remains the same.
 
@@ -56,46 +106,310 @@ class ReactorMutation(Mutation[ChemicalSolution]):
         ----------
         solution: ChemicalSolution
             solution to mutate
+        seed: int
+            seed of the mutation random number generator (drawn from the operator random number generator if None)
         Returns
         -------
         ChemicalSolution
             mutated solution
         """
-        if random.random() <= self.probability:
+        if seed is None:
+            seed = self.rng.getrandbits(32)
+        return self._mutate(solution, random.Random(seed), self.logger)[0]
+
+    def execute_batch(self, solutions: List[ChemicalSolution], seeds: List[int] = None):
+        """
+        Executes the mutation on a batch of solutions (e.g. the whole offspring population).
+        Each mutation uses its own random number generator, seeded in the same way as in execute, so the results are
+        reproducible and do not depend on the number of workers or on whether the solutions are mutated in batches.
+        If a pool of workers is configured (mutation_workers), the solutions are mutated in parallel by worker processes
+        that keep a copy of the operator (reaction rules, caches and standardizer) between batches.
+
+        Parameters
+        ----------
+        solutions: List[ChemicalSolution]
+            solutions to mutate
+        seeds: List[int]
+            seeds of the mutations random number generators (drawn from the operator random number generator if None)
+
+        Returns
+        -------
+        List[ChemicalSolution]
+            mutated solutions (in the same order)
+        """
+        if seeds is None:
+            seeds = [self.rng.getrandbits(32) for _ in solutions]
+        if self.batch_pool is None:
+            return [self._mutate(solution, random.Random(seed), self.logger)[0]
+                    for solution, seed in zip(solutions, seeds)]
+        mutated = []
+        for solution, (mutant, transformation, trials) in zip(solutions, self.batch_pool.map(solutions, seeds)):
+            # transformations are logged (and rules statistics recorded) by the main process
+            if transformation is not None and self.logger:
+                self.logger(self.configs, solution, *transformation)
+            if self.rule_stats is not None:
+                for idx, success in trials:
+                    self.rule_stats.record_trial(idx, success)
+            mutated.append(mutant)
+        return mutated
+
+    def _mutate(self,
+                solution: ChemicalSolution,
+                rng: random.Random,
+                logger: Union[callable, None]):
+        """
+        Internal method to mutate a solution (see execute).
+
+        Parameters
+        ----------
+        solution: ChemicalSolution
+            solution to mutate
+        rng: random.Random
+            random number generator to use
+        logger: Union[callable, None]
+            function to save the transformation
+
+        Returns
+        -------
+        Tuple[ChemicalSolution, Union[Tuple[str, Union[str, int]], None], List[Tuple[int, bool]]]
+            mutated solution, transformation (mutant SMILES and rule id, None if the solution was not mutated) and
+            outcomes of the rules tried (rule position and whether it produced products)
+        """
+        transformation = None
+        trials = []
+        if rng.random() <= self.probability:
             compound = solution.variables
-            rules = random.sample(self.reaction_rules, self.configs['max_rules_by_iter'])
-            products = []
-            i = 0
-            while len(products) < 1 and i < self.configs["max_rules_by_iter"]:
-                rule = rules[i]
-                reactants = rule.reactants_to_mol_list(compound)
-                products = ChemUtils.react(reactants, rule.reaction)
-                if len(products) > 20:
-                    products = random.sample(products, 20)
-                products = [pd for pd in products if ChemUtils.valid_product(pd)]
-                if len(products) > 0:
-                    # keep the most similar compound
-                    most_similar_product = ChemUtils.most_similar_compound(compound.smiles, products, self.tolerance)
+            if self.memo is not None and self.memo.is_dead_end(compound.key):
+                return solution, transformation, trials
+            # rules are drawn lazily, only when the previous ones did not produce products
+            sampled = self.rule_sampler.sample(self.configs['max_rules_by_iter'], rng)
+            if self.rule_index is not None:
+                applicable = self.rule_index.screen(compound)
+                rules_idx = (idx for idx in sampled if applicable[idx])
+                n_applicable = int(applicable.sum())
+            else:
+                rules_idx = sampled
+                n_applicable = len(self.reaction_rules)
+            try:
+                for idx, rule, products in self._successful_rules(compound, rules_idx, trials):
+                    # keep the most similar compound (the compound' fingerprint is computed once and cached)
+                    most_similar_product = self.similarity_engine.most_similar(compound, products, self.tolerance, rng)
                     mutant_id = f"{compound.cmp_id}--{rule.rule_id}_"
-                    if not isinstance(most_similar_product, str):
-                        products = []
-                    else:
-                        mutant = Compound(most_similar_product, mutant_id)
-                        if mutant.mol is not None:
-                            mutant = self.standardizer().standardize(mutant)
-                            if self.logger:
-                                self.logger(self.configs, solution, mutant.smiles, rule.rule_id)
-                            solution.variables = mutant
-                            if 'original_compound' not in solution.attributes.keys():
-                                solution.attributes['original_compound'] = [compound.smiles]
-                                solution.attributes['rule_id'] = [rule.rule_id]
-                            else:
-                                solution.attributes['original_compound'].append(compound.smiles)
-                                solution.attributes['rule_id'].append(rule.rule_id)
+                    mutant = Compound(MolCache.shared().to_smiles(most_similar_product), mutant_id)
+                    if mutant.mol is not None:
+                        if self.standardizer is not None:
+                            mutant = self.standardizer.standardize(mutant)
+                        transformation = mutant.smiles, rule.rule_id
+                        if logger:
+                            logger(self.configs, solution, mutant.smiles, rule.rule_id)
+                        solution.variables = mutant
+                        if 'original_compound' not in solution.attributes.keys():
+                            solution.attributes['original_compound'] = [compound.smiles]
+                            solution.attributes['rule_id'] = [rule.rule_id]
                         else:
-                            products = []
-                i += 1
-        return solution
+                            solution.attributes['original_compound'].append(compound.smiles)
+                            solution.attributes['rule_id'].append(rule.rule_id)
+                        if self.rule_stats is not None:
+                            # the fitness gain is recorded once the mutant is evaluated (objectives are the parent')
+                            solution.attributes['pending_rule'] = idx, list(solution.objectives)
+                        break
+            finally:
+                # ends the draw (weighted samplers put the drawn rules back)
+                sampled.close()
+            if self.rule_stats is not None:
+                for idx, success in trials:
+                    self.rule_stats.record_trial(idx, success)
+            # compounds for which all applicable rules failed are flagged as dead ends
+            if transformation is None and self.memo is not None and self.memo.n_failures(compound.key) >= n_applicable:
+                self.memo.mark_dead_end(compound.key)
+        return solution, transformation, trials
+
+    def _successful_rules(self, compound: Compound, rules_idx: Iterator[int], trials: List[Tuple[int, bool]]):
+        """
+        Applies the reaction rules to a compound (in order) and yields the ones that produce valid products.
+
+        Parameters
+        ----------
+        compound: Compound
+            compound to mutate
+        rules_idx: Iterator[int]
+            positions of the reaction rules to try
+        trials: List[Tuple[int, bool]]
+            list where the outcomes of the rules tried are appended
+
+        Returns
+        -------
+        Iterator[Tuple[int, ReactionRule, List[Mol]]]:
+            positions of the reaction rules that produced products, the rules and their products
+        """
+        if self.rule_trials is None:
+            for idx in rules_idx:
+                rule = self.reaction_rules[idx]
+                products = self._products(compound, idx)
+                trials.append((idx, len(products) > 0))
+                if len(products) > 0:
+                    yield idx, rule, products
+            return
+        # the rule trial pool needs the whole (ordered) list of candidate rules
+        rules_idx = list(rules_idx)
+        start = 0
+        while start < len(rules_idx):
+            start, rule, products = self._next_products(compound, rules_idx, start, trials)
+            if len(products) > 0:
+                yield rules_idx[start], rule, products
+            start += 1
+
+    def update_rule_statistics(self, solutions: List[ChemicalSolution]):
+        """
+        Records the fitness gain of the evaluated mutants in the reaction rules statistics.
+
+        Parameters
+        ----------
+        solutions: List[ChemicalSolution]
+            evaluated solutions
+        """
+        if self.rule_stats is None:
+            return
+        for solution in solutions:
+            pending = solution.attributes.pop('pending_rule', None)
+            if pending is not None:
+                idx, parent_objectives = pending
+                # jMetal objectives are minimized (maximization objectives are negated)
+                gain = float(np.mean(np.subtract(parent_objectives, solution.objectives)))
+                self.rule_stats.record_fitness(idx, gain)
+
+    def save_rule_statistics(self):
+        """
+        Saves the reaction rules statistics (if tracked) to the 'rule_statistics_path' of the configurations.
+        """
+        path = self.configs.get('rule_statistics_path', None)
+        if self.rule_stats is not None and path is not None:
+            self.rule_stats.save(path)
+
+    def close(self):
+        """
+        Shuts down the worker processes of the mutation (rule trials and batch mutation pools).
+        """
+        if self.rule_trials is not None:
+            self.rule_trials.close()
+        if self.batch_pool is not None:
+            self.batch_pool.close()
+
+    def _next_products(self, compound: Compound, rules_idx: List[int], start: int, trials: List[Tuple[int, bool]]):
+        """
+        Finds the next rule (from position start of rules_idx) that produces valid products for a compound.
+        Rules are tried one at a time or, if there are more candidate rules than the chunk size of the rule trial pool,
+        in parallel.
+
+        Parameters
+        ----------
+        compound: Compound
+            compound to mutate
+        rules_idx: List[int]
+            positions of the sampled reaction rules
+        start: int
+            position of rules_idx where to start
+        trials: List[Tuple[int, bool]]
+            list where the outcomes of the rules tried are appended
+
+        Returns
+        -------
+        Tuple[int, Union[ReactionRule, None], List[Mol]]:
+            position (in rules_idx) of the last rule tried, the rule and its products (empty if no rule produced
+            products)
+        """
+        if self.rule_trials is None or len(rules_idx) - start <= self.rule_trials.chunk_size:
+            rule = self.reaction_rules[rules_idx[start]]
+            products = self._products(compound, rules_idx[start])
+            trials.append((rules_idx[start], len(products) > 0))
+            return start, rule, products
+        # rules with memoized outcomes are not sent to the workers
+        candidates = []
+        memoized = None
+        for position in range(start, len(rules_idx)):
+            rule = self.reaction_rules[rules_idx[position]]
+            outcome = self.memo.get(compound.key, rule.rule_id) if self.memo is not None else None
+            if outcome is None and not self._template_matches(compound, rules_idx[position]):
+                outcome = ()
+                if self.memo is not None:
+                    self.memo.put(compound.key, rule.rule_id, [])
+            if outcome is None:
+                candidates.append(rules_idx[position])
+            elif len(outcome) > 0:
+                memoized = position, rule, outcome
+                break
+            else:
+                trials.append((rules_idx[position], False))
+        if len(candidates) > 0:
+            idx, products, failed = self.rule_trials.first_successful(compound, candidates)
+            trials.extend((failed_idx, False) for failed_idx in failed)
+            if self.memo is not None:
+                for failed_idx in failed:
+                    self.memo.put(compound.key, self.reaction_rules[failed_idx].rule_id, [])
+            if idx is not None:
+                rule = self.reaction_rules[idx]
+                if self.memo is not None:
+                    self.memo.put(compound.key, rule.rule_id, products)
+                memoized = rules_idx.index(idx, start), rule, products
+        if memoized is None:
+            return len(rules_idx) - 1, None, []
+        position, rule, products = memoized
+        trials.append((rules_idx[position], True))
+        products = [MolCache.shared().mol(smiles) for smiles in products]
+        return position, rule, [pd for pd in products if pd is not None]
+
+    def _template_matches(self, compound: Compound, idx: int):
+        """
+        Checks if a compound matches the reactant templates of a rule (see ReactantTemplateGroups).
+
+        Parameters
+        ----------
+        compound: Compound
+            compound to mutate
+        idx: int
+            position of the reaction rule
+
+        Returns
+        -------
+        bool:
+            False if the rule can not produce products for the compound, True otherwise
+        """
+        return self.rule_groups is None or self.rule_groups.matches(compound, idx)
+
+    def _products(self, compound: Compound, idx: int):
+        """
+        Gets the distinct valid products of applying a reaction rule to a compound.
+        Outcomes (including the rules that do not produce products) are memoized by compound and rule.
+        Rules whose reactant templates (shared by their group) do not match the compound are not applied.
+
+        Parameters
+        ----------
+        compound: Compound
+            compound to mutate
+        idx: int
+            position of the reaction rule to apply
+
+        Returns
+        -------
+        List[Mol]:
+            products Mol objects
+        """
+        rule = self.reaction_rules[idx]
+        if self.memo is not None:
+            outcome = self.memo.get(compound.key, rule.rule_id)
+            if outcome is not None:
+                products = [MolCache.shared().mol(smiles) for smiles in outcome]
+                return [pd for pd in products if pd is not None]
+        if self._template_matches(compound, idx):
+            reactants = rule.reactants_to_mol_list(compound)
+            # products are enumerated lazily and the enumeration stops once enough valid products are found
+            products = ChemUtils.iter_products(reactants, rule.reaction, self.max_products, self.product_filter)
+            products = list(islice(products, self.n_products))
+        else:
+            products = []
+        if self.memo is not None:
+            self.memo.put(compound.key, rule.rule_id, [MolCache.shared().to_smiles(pd) for pd in products])
+        return products
 
     def get_name(self):
         """
@@ -118,9 +432,10 @@ class ReactorPseudoCrossover(Crossover[ChemicalSolution, ChemicalSolution]):
 
     def __init__(self,
                  reaction_rules: List[ReactionRule],
-                 standardizer: Union[MolecularStandardizer, None],
+                 standardizer: Union[MolecularStandardizer, type, None],
                  configs: dict,
-                 logger: Union[callable, None] = None):
+                 logger: Union[callable, None] = None,
+                 mutation: Union[ReactorMutation, None] = None):
         """
         Initializes a ReactorPseudoCrossover operator.
 
@@ -128,18 +443,28 @@ class ReactorPseudoCrossover(Crossover[ChemicalSolution, ChemicalSolution]):
         ----------
         reaction_rules: List[ReactionRule]
             pool or reaction rules to use
-        standardizer: Union[MolecularStandardizer, None]
-            standardizer to standardize new solutions
+        standardizer: Union[MolecularStandardizer, type, None]
+            standardizer (or standardizer class) to standardize new solutions (None to not standardize)
         configs: dict
             configurations of the experiment
         logger: Union[callable, None]
             function to save all intermediate transformations (accepted and not accepted)
+        mutation: Union[ReactorMutation, None]
+            mutation operator to apply to the parents (a new one is created if None)
         """
         super(ReactorPseudoCrossover, self).__init__(probability=configs['crossover_probability'])
         self.reaction_rules = reaction_rules
         self.standardizer = standardizer
         self.configs = configs
         self.logger = logger
+        # reusing the mutation operator of the algorithm shares its caches and worker processes
+        if mutation is None:
+            mutation = ReactorMutation(reaction_rules, standardizer, configs, logger)
+        self.mutation = mutation
+        # the crossover selection and the seed of the parent mutation are drawn from the operator own random number
+        # generator (not from the mutation one), so crossovers and mutations give the same results whether they are
+        # interleaved (one crossover at a time) or executed in batches
+        self.rng = random.Random(random.getrandbits(64))
 
     def execute(self, parent: List[ChemicalSolution]):
         """
@@ -159,14 +484,51 @@ class ReactorPseudoCrossover(Crossover[ChemicalSolution, ChemicalSolution]):
             raise Exception('The number of parents is not two: {}'.format(len(parent)))
         offspring = [copy.deepcopy(parent[0])]
 
-        if random.random() <= self.probability:
-            m_offspring = ReactorMutation(self.reaction_rules,
-                                          self.standardizer,
-                                          self.configs,
-                                          self.logger).execute(offspring[0])
+        selected, seed = self._draw()
+        if selected:
+            m_offspring = self.mutation.execute(offspring[0], seed)
             offspring[0] = m_offspring
         return offspring
 
+    def execute_batch(self, parents: List[List[ChemicalSolution]]):
+        """
+        Executes the operator on a batch of parents (e.g. the whole mating population).
+        The offspring selected for crossover are mutated at once (see ReactorMutation.execute_batch), with the same
+        results as executing the crossovers one at a time.
+
+        Parameters
+        ----------
+        parents: List[List[ChemicalSolution]]
+            parents of each crossover
+
+        Returns
+        -------
+        List[List[ChemicalSolution]]
+            offspring of each crossover (in the same order)
+        """
+        for parent in parents:
+            if len(parent) != self.get_number_of_parents():
+                raise Exception('The number of parents is not two: {}'.format(len(parent)))
+        offspring = [[copy.deepcopy(parent[0])] for parent in parents]
+        draws = [self._draw() for _ in offspring]
+        selected = [i for i, (is_selected, _) in enumerate(draws) if is_selected]
+        mutated = self.mutation.execute_batch([offspring[i][0] for i in selected], [draws[i][1] for i in selected])
+        for i, m_offspring in zip(selected, mutated):
+            offspring[i][0] = m_offspring
+        return offspring
+
+    def _draw(self):
+        """
+        Draws whether a crossover happens and the seed of its mutation.
+        The seed is drawn even if the crossover does not happen, so each crossover uses the same random numbers.
+
+        Returns
+        -------
+        Tuple[bool, int]
+            whether the parent is mutated and the seed of the mutation random number generator
+        """
+        return self.rng.random() <= self.probability, self.rng.getrandbits(32)
+
     def get_number_of_parents(self) -> int:
         """
         Number of parent compounds used.
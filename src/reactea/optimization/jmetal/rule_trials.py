@@ -0,0 +1,192 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import List
+
+from rdkit import RDLogger
+
+from reactea.chem.chem_utils import ChemUtils
+from reactea.chem.compounds import Compound
+from reactea.chem.mol_cache import MolCache
+from reactea.chem.product_filters import ProductFilterChain
+from reactea.chem.reaction_rules import ReactionRule
+
+# state of the worker processes (reaction rules are loaded once per worker)
+_worker_state = {}
+
+
+def _init_worker(reaction_rules: List[ReactionRule],
+                 product_filter: ProductFilterChain,
+                 max_products: int,
+                 n_products: int,
+                 current_round):
+    """
+    Initializes a worker process with the reaction rules and the products settings.
+    """
+    RDLogger.DisableLog("rdApp.*")
+    _worker_state['reaction_rules'] = reaction_rules
+    _worker_state['product_filter'] = product_filter
+    _worker_state['max_products'] = max_products
+    _worker_state['n_products'] = n_products
+    _worker_state['current_round'] = current_round
+
+
+def _try_rules(smiles: str, rules_idx: List[int], trial_round: int):
+    """
+    Applies reaction rules to a compound (in order) until one produces valid products.
+    Stops early if the trial round was already solved by another chunk.
+
+    Parameters
+    ----------
+    smiles: str
+        compound SMILES string
+    rules_idx: List[int]
+        positions of the reaction rules to try
+    trial_round: int
+        round of the trial
+
+    Returns
+    -------
+    Tuple[Union[int, None], List[str], List[int]]:
+        position of the successful rule (None if no rule produced products), products SMILES and positions of the
+        rules that failed
+    """
+    compound = Compound(smiles, 'trial')
+    reaction_rules = _worker_state['reaction_rules']
+    failed = []
+    for idx in rules_idx:
+        if _worker_state['current_round'].value != trial_round:
+            break
+        rule = reaction_rules[idx]
+        products = ChemUtils.iter_products(rule.reactants_to_mol_list(compound),
+                                           rule.reaction,
+                                           _worker_state['max_products'],
+                                           _worker_state['product_filter'])
+        products = list(islice(products, _worker_state['n_products']))
+        if len(products) > 0:
+            return idx, [MolCache.shared().to_smiles(pd) for pd in products], failed
+        failed.append(idx)
+    return None, [], failed
+
+
+class RuleTrialPool:
+    """
+    Class to represent a pool of worker processes that try reaction rules on a compound in parallel.
+    The candidate rules are split in ordered chunks that are tried speculatively by the workers. The successful rule
+    with the lowest position is picked (as if the rules were tried one after another) and the remaining chunks are
+    cancelled.
+    """
+
+    def __init__(self,
+                 reaction_rules: List[ReactionRule],
+                 product_filter: ProductFilterChain,
+                 max_products: int = 1000,
+                 n_products: int = 20,
+                 n_workers: int = 2,
+                 chunk_size: int = 64):
+        """
+        Initializes the Rule Trial Pool (the worker processes are only started when first needed).
+
+        Parameters
+        ----------
+        reaction_rules: List[ReactionRule]
+            pool of reaction rules (preloaded in each worker)
+        product_filter: ProductFilterChain
+            filters the products must pass
+        max_products: int
+            maximum number of product sets generated by a rule
+        n_products: int
+            number of distinct valid products of a rule to return
+        n_workers: int
+            number of worker processes
+        chunk_size: int
+            number of rules sent to a worker at once
+        """
+        self.reaction_rules = reaction_rules
+        self.product_filter = product_filter
+        self.max_products = max_products
+        self.n_products = n_products
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._current_round = None
+        self._pending = set()
+
+    def _get_executor(self):
+        """
+        Internal method to start the worker processes.
+
+        Returns
+        -------
+        ProcessPoolExecutor:
+            executor with the worker processes
+        """
+        if self._executor is None:
+            context = multiprocessing.get_context()
+            self._current_round = context.Value('L', 0, lock=False)
+            self._executor = ProcessPoolExecutor(max_workers=self.n_workers,
+                                                 mp_context=context,
+                                                 initializer=_init_worker,
+                                                 initargs=(self.reaction_rules, self.product_filter,
+                                                           self.max_products, self.n_products, self._current_round))
+        return self._executor
+
+    def first_successful(self, compound: Compound, rules_idx: List[int]):
+        """
+        Finds the first rule (in the order of rules_idx) that produces valid products for a compound.
+
+        Parameters
+        ----------
+        compound: Compound
+            compound to mutate
+        rules_idx: List[int]
+            positions of the candidate reaction rules (in the order they should be tried)
+
+        Returns
+        -------
+        Tuple[Union[int, None], List[str], List[int]]:
+            position of the first successful rule (None if no rule produced products), products SMILES and positions
+            of the rules known to fail
+        """
+        executor = self._get_executor()
+        trial_round = self._current_round.value
+        chunks = [rules_idx[i:i + self.chunk_size] for i in range(0, len(rules_idx), self.chunk_size)]
+        futures = [executor.submit(_try_rules, compound.smiles, chunk, trial_round) for chunk in chunks]
+        for future in futures:
+            self._pending.add(future)
+            future.add_done_callback(self._pending.discard)
+        failed = []
+        result = None, [], failed
+        try:
+            for future in futures:
+                idx, products, chunk_failed = future.result()
+                failed.extend(chunk_failed)
+                if idx is not None:
+                    result = idx, products, failed
+                    break
+        finally:
+            # running chunks stop at their next rule and pending chunks are cancelled
+            self._current_round.value = trial_round + 1
+            for future in futures:
+                future.cancel()
+        return result
+
+    def close(self):
+        """
+        Shuts down the worker processes.
+        """
+        if self._executor is not None:
+            for future in list(self._pending):
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._current_round = None
+            self._pending = set()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # worker processes are not shared
+        state['_executor'] = None
+        state['_current_round'] = None
+        state['_pending'] = set()
+        return state
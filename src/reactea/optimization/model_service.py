@@ -0,0 +1,294 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Any, List, Sequence, Union
+
+from rdkit.Chem import Mol
+
+from reactea.chem.mol_cache import MolCache
+from reactea.io_streams import Loaders
+
+
+class _PredictionRequest:
+    """
+    Molecules submitted by a caller of a Model Service and their predictions.
+    """
+
+    __slots__ = ('items', 'scores', 'error', 'done')
+
+    def __init__(self, items: dict):
+        self.items = items
+        self.scores = {}
+        self.error = None
+        self.done = False
+
+
+class ModelService:
+    """
+    Class to represent a load-once inference service for a (machine learning) model.
+    The model is only loaded the first time it is needed and is kept for the lifetime of the process, so evaluation
+    functions can be created (or copied) freely without reloading it.
+    Molecules submitted by concurrent callers are gathered into micro-batches (of at most max_batch_size molecules)
+    and predictions are cached per molecule (keyed by canonical SMILES), so each distinct molecule is only predicted
+    once while it is in the cache.
+    """
+
+    DEFAULT_BATCH_SIZE = 256
+    DEFAULT_MAX_WAIT = 0.0
+    DEFAULT_CACHE_SIZE = 100000
+
+    # process-wide services (by name) and their settings
+    _shared = {}
+    _settings = {'max_batch_size': DEFAULT_BATCH_SIZE, 'max_wait': DEFAULT_MAX_WAIT, 'cache_size': DEFAULT_CACHE_SIZE}
+
+    def __init__(self,
+                 loader: Callable[[], Any],
+                 predict: Callable[[Any, List[Mol]], Sequence[float]],
+                 max_batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_wait: float = DEFAULT_MAX_WAIT,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        """
+        Initializes the Model Service (the model is only loaded when first needed).
+
+        Parameters
+        ----------
+        loader: Callable[[], Any]
+            function that loads the model
+        predict: Callable[[Any, List[Mol]], Sequence[float]]
+            function that predicts a batch of molecules with the model (one score per molecule)
+        max_batch_size: int
+            maximum number of molecules predicted at once
+        max_wait: float
+            seconds to wait for other callers before predicting a micro-batch (0 to only gather the molecules
+            submitted while the model is busy)
+        cache_size: int
+            maximum number of predictions kept in memory (0 disables the cache)
+        """
+        self.loader = loader
+        self.predict_batch = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self.n_batches = 0
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._cond = threading.Condition()
+        self._pending = []
+        self._busy = False
+        self._pid = os.getpid()
+
+    @classmethod
+    def shared(cls, name: str, loader: Callable[[], Any], predict: Callable[[Any, List[Mol]], Sequence[float]]):
+        """
+        Gets the process-wide Model Service of a model (creating it if needed).
+        Services are not inherited by forked processes: each process loads the model once.
+
+        Parameters
+        ----------
+        name: str
+            name of the model
+        loader: Callable[[], Any]
+            function that loads the model
+        predict: Callable[[Any, List[Mol]], Sequence[float]]
+            function that predicts a batch of molecules with the model
+
+        Returns
+        -------
+        ModelService:
+            shared Model Service
+        """
+        service = cls._shared.get(name)
+        if service is None or service._pid != os.getpid():
+            service = cls(loader, predict, **cls._settings)
+            cls._shared[name] = service
+        return service
+
+    @classmethod
+    def deepsweet(cls):
+        """
+        Gets the process-wide Model Service of the DeepSweet ensemble.
+
+        Returns
+        -------
+        ModelService:
+            shared DeepSweet Model Service
+        """
+        return cls.shared('deepsweet', Loaders.load_deepsweet_ensemble,
+                          lambda ensemble, mols: ensemble.predict(mols)[0])
+
+    @classmethod
+    def configure(cls, configs: dict):
+        """
+        Sets the micro-batching and cache settings of the shared Model Services.
+
+        Parameters
+        ----------
+        configs: dict
+            configurations of the experiment (keys 'model_batch_size', 'model_batch_wait' and 'model_cache_size')
+        """
+        cls._settings = {'max_batch_size': configs.get('model_batch_size', cls.DEFAULT_BATCH_SIZE),
+                         'max_wait': configs.get('model_batch_wait', cls.DEFAULT_MAX_WAIT),
+                         'cache_size': configs.get('model_cache_size', cls.DEFAULT_CACHE_SIZE)}
+        for service in cls._shared.values():
+            with service._cond:
+                service.max_batch_size = cls._settings['max_batch_size']
+                service.max_wait = cls._settings['max_wait']
+                service.cache_size = cls._settings['cache_size']
+                while len(service._cache) > max(service.cache_size, 0):
+                    service._cache.popitem(last=False)
+
+    @property
+    def model(self):
+        """
+        Gets the model, loading it if needed.
+
+        Returns
+        -------
+        Any:
+            model
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self.loader()
+        return self._model
+
+    def _predict_requests(self, requests: List[_PredictionRequest]):
+        """
+        Internal method to predict the molecules of a set of requests (in batches of at most max_batch_size
+        molecules) and cache the predictions.
+
+        Parameters
+        ----------
+        requests: List[_PredictionRequest]
+            requests to predict
+        """
+        items = {}
+        for request in requests:
+            items.update(request.items)
+        keys = list(items.keys())
+        scores = {}
+        try:
+            for i in range(0, len(keys), self.max_batch_size):
+                batch = keys[i:i + self.max_batch_size]
+                batch_scores = self.predict_batch(self.model, [items[key] for key in batch])
+                self.n_batches += 1
+                scores.update(zip(batch, batch_scores))
+        except Exception as e:
+            for request in requests:
+                request.error = e
+            return
+        with self._cond:
+            for key, score in scores.items():
+                # molecules without a canonical SMILES (invalid molecules) are not cached
+                if isinstance(key, str) and self.cache_size > 0:
+                    self._cache[key] = score
+                    self._cache.move_to_end(key)
+            while len(self._cache) > max(self.cache_size, 0):
+                self._cache.popitem(last=False)
+        for request in requests:
+            request.scores = {key: scores[key] for key in request.items}
+
+    def _next_batch(self):
+        """
+        Internal method to take the pending requests of the next micro-batch (must hold the condition lock).
+
+        Returns
+        -------
+        List[_PredictionRequest]:
+            requests of the next micro-batch
+        """
+        batch = []
+        n_items = 0
+        while self._pending and (not batch or n_items + len(self._pending[0].items) <= self.max_batch_size):
+            request = self._pending.pop(0)
+            batch.append(request)
+            n_items += len(request.items)
+        return batch
+
+    def predict(self, mols: List[Union[Mol, None]]):
+        """
+        Predicts a list of molecules, reusing cached predictions.
+
+        Parameters
+        ----------
+        mols: List[Union[Mol, None]]
+            molecules to predict
+
+        Returns
+        -------
+        List[float]:
+            prediction of each molecule
+        """
+        keys = []
+        for i, mol in enumerate(mols):
+            key = MolCache.shared().to_smiles(mol) if isinstance(mol, Mol) else None
+            keys.append(key if key is not None else (id(mols), i))
+        results = {}
+        with self._cond:
+            for key in keys:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[key] = self._cache[key]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        items = {key: mol for key, mol in zip(keys, mols) if key not in results}
+        if len(items) > 0:
+            request = _PredictionRequest(items)
+            with self._cond:
+                self._pending.append(request)
+                # while another caller is predicting, it also predicts this request
+                while self._busy and not request.done:
+                    self._cond.wait()
+                leader = not request.done
+                if leader:
+                    self._busy = True
+            if leader:
+                try:
+                    if self.max_wait > 0:
+                        # let concurrent callers join the micro-batch
+                        time.sleep(self.max_wait)
+                    while True:
+                        with self._cond:
+                            batch = self._next_batch()
+                            if not batch:
+                                break
+                        self._predict_requests(batch)
+                        with self._cond:
+                            for pending in batch:
+                                pending.done = True
+                            self._cond.notify_all()
+                finally:
+                    with self._cond:
+                        self._busy = False
+                        self._cond.notify_all()
+            if request.error is not None:
+                raise request.error
+            results.update(request.scores)
+        return [results[key] for key in keys]
+
+    def stats(self):
+        """
+        Gets the service statistics.
+
+        Returns
+        -------
+        dict:
+            number of cache hits, misses, predicted batches and predictions kept in memory
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'batches': self.n_batches, 'size': len(self._cache)}
+
+    def clear(self):
+        """
+        Removes all cached predictions and resets the statistics of the service.
+        """
+        with self._cond:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+            self.n_batches = 0
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
 from typing import List, Union
 
+import numpy as np
+
 from reactea.chem.compounds import Compound
 from reactea.optimization.evaluation import ChemicalEvaluationFunction
+from reactea.optimization.evaluation_plan import EvaluationPlan
+from reactea.optimization.fitness_cache import FitnessCache
 
 Num = Union[int, float]
 
@@ -74,7 +78,7 @@ class ChemicalProblem(Problem):
     A Chemical Problem evaluates solutions represented as Compounds.
     """
 
-    def __init__(self, fevaluation: List[ChemicalEvaluationFunction]):
+    def __init__(self, fevaluation: List[ChemicalEvaluationFunction], fitness_cache: FitnessCache = None):
         """
         Initializes a Chemical Problem.
 
@@ -82,8 +86,47 @@ class ChemicalProblem(Problem):
         ----------
         fevaluation: List[ChemicalEvaluationFunction]
             list of chemical evaluation functions
+        fitness_cache: FitnessCache
+            cache of the fitness of the compounds (None to always evaluate them)
         """
         super(ChemicalProblem, self).__init__("ChemicalProblem", fevaluation)
+        self.fitness_cache = fitness_cache
+        self.plan = EvaluationPlan(self.fevaluation)
+        self.executor = None
+
+    def _fitness_matrix(self, candidates: List[Compound]):
+        """
+        Internal method to get the fitness of a list of Compounds for all evaluation functions.
+        All objectives are evaluated in a single pass by the evaluation plan, and only for the distinct compounds that
+        are not cached.
+
+        Parameters
+        ----------
+        candidates: List[Compound]
+            compounds to evaluate
+
+        Returns
+        -------
+        np.ndarray:
+            fitness of the compounds (one row per compound and one column per evaluation function)
+        """
+        keys = [candidate.key for candidate in candidates]
+        cached = []
+        if self.fitness_cache is not None:
+            signatures = [f.signature() for f in self.fevaluation]
+            cached = [self.fitness_cache.get_many(signature, keys) for signature in signatures]
+        missing = {}
+        for key, candidate in zip(keys, candidates):
+            if key not in missing and (self.fitness_cache is None or any(key not in fitness for fitness in cached)):
+                missing[key] = candidate.mol
+        rows = dict(zip(missing.keys(), self.plan.evaluate(list(missing.values()), self.executor)))
+        if self.fitness_cache is not None:
+            for j, signature in enumerate(signatures):
+                self.fitness_cache.put_many(signature, {key: float(row[j]) for key, row in rows.items()})
+        fitness = np.empty((len(candidates), self.number_of_objectives), dtype=np.float64)
+        for i, key in enumerate(keys):
+            fitness[i] = rows[key] if key in rows else [objective_cache[key] for objective_cache in cached]
+        return fitness
 
     def evaluate_solutions(self, candidates: Union[Compound, List[Compound]]):
         """
@@ -100,17 +143,8 @@ class ChemicalProblem(Problem):
             fitness of the solutions for each evaluation function.
         """
         if isinstance(candidates, list):
-            list_mols = [smi.mol for smi in candidates]
-            evals = []
-            for f in self.fevaluation:
-                evals.append(f(list_mols))
-            return list(zip(*evals))
-        else:
-            candidates = candidates.mol
-            evals = []
-            for f in self.fevaluation:
-                evals.append(f(candidates))
-            return [x for xs in evals for x in xs]
+            return [tuple(row) for row in self._fitness_matrix(candidates).tolist()]
+        return self._fitness_matrix([candidates])[0].tolist()
 
     @staticmethod
     def get_name():
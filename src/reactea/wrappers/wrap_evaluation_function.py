@@ -1,17 +1,54 @@
+from typing import List, Union
+
 from rdkit.Chem import Mol
 
+from reactea.chem.featurization import FeatureCache
 from reactea.optimization.evaluation import ChemicalEvaluationFunction
 
 
 class EvaluationFunctionWrapper(ChemicalEvaluationFunction):
     """
     Wrapper for the evaluation function to be used in the optimization process in ReactEA.
+    If a feature type is provided (see FeatureCache), the wrapped function is a batch model: it is called with the
+    (cached) feature matrix of a batch of molecules and must return one fitness per row.
     """
 
-    def __init__(self, evaluation_function, maximize, worst_fitness, name):
+    def __init__(self, evaluation_function, maximize, worst_fitness, name, features: str = None):
         super().__init__(maximize, worst_fitness)
         self.evaluation_function = evaluation_function
         self.name = name
+        self.features = features
+        if features is not None:
+            # batches are featurized and predicted by the main process
+            self.parallel = False
+
+    def get_fitness(self, candidates: Union[Mol, List[Mol]]):
+        """
+        Evaluates the fitness of the candidate(s).
+        Batch models are called once with the feature matrix of all candidates.
+
+        Parameters
+        ----------
+        candidates: Union[Mol, List[Mol]]
+            The candidate(s) to evaluate.
+
+        Returns
+        -------
+        List[float]
+            The fitness(es) of the candidate(s).
+        """
+        if self.features is None:
+            return super().get_fitness(candidates)
+        if isinstance(candidates, Mol):
+            candidates = [candidates]
+        features = FeatureCache.shared().features(candidates, self.features)
+        try:
+            scores = list(self.evaluation_function(features))
+        except Exception:
+            return [self.worst_fitness] * len(candidates)
+        # invalid molecules get the worst fitness
+        return [score if isinstance(candidate, Mol) else self.worst_fitness
+                for candidate, score in zip(candidates, scores)]
 
     def get_fitness_single(self, candidate: Mol):
         """
@@ -27,11 +64,32 @@ class EvaluationFunctionWrapper(ChemicalEvaluationFunction):
         float:
             The fitness of the candidate.
         """
+        if self.features is not None:
+            return self.get_fitness(candidate)[0]
         try:
             return self.evaluation_function(candidate)
         except :
             return self.worst_fitness
 
+    def _signature_params(self):
+        """
+        Internal method to get the parameters that define the fitness computed by the evaluation function.
+        Includes the module and qualified name of the wrapped function and the feature type.
+        Changes to the body of the wrapped function are not detected: fitness values persisted between runs
+        (fitness_cache_path) need a new name (or a new cache) when the function changes.
+
+        Returns
+        -------
+        dict:
+            parameters of the evaluation function
+        """
+        params = super()._signature_params()
+        function = self.evaluation_function
+        params['function'] = f"{getattr(function, '__module__', type(function).__module__)}." \
+                             f"{getattr(function, '__qualname__', type(function).__qualname__)}"
+        params['features'] = self.features
+        return params
+
     def method_str(self):
         """
         Returns the name of the evaluation function.
@@ -42,7 +100,8 @@ class EvaluationFunctionWrapper(ChemicalEvaluationFunction):
 def evaluation_functions_wrapper(function: callable,
                                  maximize: bool,
                                  worst_fitness: float,
-                                 name: str):
+                                 name: str,
+                                 features: str = None):
     """
     Wraps a function to be used as an evaluation function for the optimization process.
 
@@ -55,11 +114,17 @@ def evaluation_functions_wrapper(function: callable,
     worst_fitness: float
         The worst fitness value that the function can return.
     name: str
-        The name of the function.
+        The name of the function (part of the signature that keys cached fitness values, together with the module and
+        qualified name of the function: bump the name, e.g. 'score_v2', when the function changes and fitness values
+        are persisted between runs with fitness_cache_path).
+    features: str
+        Type of features (see FeatureCache) the function takes. If provided, the function is called with the
+        feature matrix of a batch of molecules (shared and cached between evaluation functions) and must return one
+        fitness per row. If None, the function is called with each Mol object.
 
     Returns
     -------
     EvaluationFunctionWrapper
         The wrapped function.
     """
-    return EvaluationFunctionWrapper(function, maximize, worst_fitness, name)
+    return EvaluationFunctionWrapper(function, maximize, worst_fitness, name, features)
@@ -18,6 +18,8 @@ class CaseStudiesBaseTestCase(ABC):
         config_path = os.path.join(TEST_DIR, 'configs/base_config.yaml')
         self.configs = Loaders.get_config_from_yaml(config_path)
         self.output_folder = f"{TEST_DIR}/outputs/{self.configs['exp_name']}/"
+        # small set of reaction rules
+        self.rules_path = os.path.join(TEST_DIR, 'data/reactionrules/reaction_rules_sample.tsv.bz2')
 
     def tearDown(self):
         if os.path.exists(self.output_folder):
@@ -37,6 +39,8 @@ class AlgorithmsBaseTestCase(ABC):
         config_path = os.path.join(TEST_DIR, 'configs/base_config.yaml')
         self.configs = Loaders.get_config_from_yaml(config_path)
         self.output_folder = f"{TEST_DIR}/outputs/{self.configs['exp_name']}/"
+        # small set of reaction rules
+        self.rules_path = os.path.join(TEST_DIR, 'data/reactionrules/reaction_rules_sample.tsv.bz2')
 
     def tearDown(self):
         if os.path.exists(self.output_folder):
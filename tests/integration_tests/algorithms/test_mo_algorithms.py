@@ -32,7 +32,7 @@ class TestMOAlgorithms(AlgorithmsBaseTestCase, TestCase):
         objective = case_study.objective
 
         # initialize reaction rules
-        reaction_rules = Loaders.initialize_rules()
+        reaction_rules = Loaders.initialize_rules(rules_path=self.rules_path)
 
         # set up folders
         Writers.set_up_folders(self.output_folder)
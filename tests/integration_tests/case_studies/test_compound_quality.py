@@ -38,7 +38,7 @@ class TestCompoundQuality(CaseStudiesBaseTestCase, TestCase):
         self.assertEqual(objective().get_name(), "ChemicalProblem")
 
         # initialize reaction rules
-        reaction_rules = Loaders.initialize_rules()
+        reaction_rules = Loaders.initialize_rules(rules_path=self.rules_path)
 
         # set up folders
         Writers.set_up_folders(self.output_folder)
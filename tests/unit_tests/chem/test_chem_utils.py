@@ -0,0 +1,38 @@
+from itertools import islice
+from unittest import TestCase
+
+from rdkit.Chem import MolFromSmiles
+from rdkit.Chem.rdChemReactions import ReactionFromSmarts
+
+from reactea.chem import ChemUtils, MolCache, ProductFilterChain
+
+
+class TestChemUtils(TestCase):
+
+    def test_iter_products(self):
+        # hydroxylation of any aliphatic carbon
+        rule = ReactionFromSmarts('[#6&H1,#6&H2,#6&H3:1]>>[#6:1]-[#8]')
+        mol = MolFromSmiles('CCCCCC')
+        products = list(ChemUtils.iter_products(mol, rule))
+        products_smiles = [MolCache.shared().to_smiles(pd) for pd in products]
+        # distinct products only
+        self.assertEqual(sorted(products_smiles), ['CCCC(O)CC', 'CCCCC(C)O', 'CCCCCCO'])
+        self.assertEqual(sorted(products_smiles), sorted(p for p in ChemUtils.react(mol, rule)))
+
+        # the enumeration can be stopped early
+        self.assertEqual(len(list(islice(ChemUtils.iter_products(mol, rule), 2))), 2)
+
+        # invalid products (less than 4 atoms) are skipped
+        self.assertEqual(list(ChemUtils.iter_products(MolFromSmiles('CC'), rule)), [])
+        self.assertEqual(len(list(ChemUtils.iter_products(MolFromSmiles('CC'), rule, product_filter=ProductFilterChain([])))), 1)
+
+        # reactions that can not be applied do not produce products
+        self.assertEqual(list(ChemUtils.iter_products(MolFromSmiles('O'), rule)), [])
+        self.assertEqual(list(ChemUtils.iter_products([mol, mol], rule)), [])
+
+    def test_valid_product(self):
+        self.assertTrue(ChemUtils.valid_product('CCCO'))
+        self.assertFalse(ChemUtils.valid_product('CCO'))
+        self.assertFalse(ChemUtils.valid_product('CCC*'))
+        self.assertFalse(ChemUtils.valid_product('NNNO'))
+        self.assertFalse(ChemUtils.valid_product('C1CCC'))
@@ -36,3 +36,30 @@ class TestCompound(TestCase):
         cmp2.smiles = invalid_smiles
         self.assertEqual(cmp2.smiles, invalid_smiles)
         self.assertTrue(cmp2.mol is None)
+
+    def test_lazy_compound(self):
+        cmp = Compound('OCC', 'id1')
+        # nothing is parsed until requested
+        self.assertFalse(cmp._mol_ready)
+        self.assertEqual(cmp.smiles, 'CCO')
+        self.assertTrue(cmp._mol_ready)
+        mol = cmp.mol
+        # the Mol object is cached
+        self.assertTrue(cmp.mol is mol)
+        self.assertEqual(cmp.key, 'CCO')
+
+        cmp_not_canonical = Compound('OCC', 'id2', canonicalize=False)
+        self.assertEqual(cmp_not_canonical.smiles, 'OCC')
+        self.assertEqual(cmp_not_canonical.key, 'CCO')
+
+        cmp_with_key = Compound('OCC', 'id3', key='LFQSCWFLJHTTHZ-UHFFFAOYSA-N')
+        self.assertEqual(cmp_with_key.key, 'LFQSCWFLJHTTHZ-UHFFFAOYSA-N')
+        self.assertEqual(cmp_with_key.smiles, 'CCO')
+
+        cmp.mol = cmp_with_key.mol
+        self.assertEqual(cmp.smiles, 'CCO')
+        cmp.mol = None
+        self.assertTrue(cmp.smiles is None)
+
+        with self.assertRaises(AttributeError):
+            cmp.new_attribute = 'value'
@@ -0,0 +1,74 @@
+from unittest import TestCase
+
+from rdkit.Chem import MolFromSmiles, AddHs
+from rdkit.Chem.Crippen import MolLogP
+from rdkit.Chem.QED import qed, properties
+
+from reactea.chem import DescriptorMemo
+from reactea.optimization.evaluation import QED, LogP, MolecularWeight, AggregatedSum
+
+
+class TestDescriptorMemo(TestCase):
+
+    def setUp(self) -> None:
+        self.smiles = ['CCO', 'c1ccccc1O', 'CC(=O)Oc1ccccc1C(=O)O', 'C1CCCCCCCC1', 'N[C@@H](C)C(=O)O']
+        self.mols = [MolFromSmiles(smi) for smi in self.smiles]
+        self.descriptors = DescriptorMemo.DESCRIPTORS
+        self.calls = []
+
+        self.qed_calls = []
+
+        def counted_logp(mol):
+            self.calls.append(mol)
+            return MolLogP(mol)
+
+        def counted_qed_properties(mol):
+            self.qed_calls.append(mol)
+            return properties(mol)
+        DescriptorMemo.DESCRIPTORS = {**self.descriptors, 'MolLogP': counted_logp,
+                                      'QEDProperties': counted_qed_properties}
+
+    def tearDown(self) -> None:
+        DescriptorMemo.DESCRIPTORS = self.descriptors
+
+    def test_scope(self):
+        mol = self.mols[0]
+        # descriptors are not memoized outside a scope
+        DescriptorMemo.get(mol, 'MolLogP')
+        DescriptorMemo.get(mol, 'MolLogP')
+        self.assertEqual(len(self.calls), 2)
+        with DescriptorMemo.scope():
+            self.assertEqual(DescriptorMemo.get(mol, 'MolLogP'), MolLogP(mol))
+            with DescriptorMemo.scope():
+                DescriptorMemo.get(mol, 'MolLogP')
+            DescriptorMemo.get(mol, 'MolLogP')
+        self.assertEqual(len(self.calls), 3)
+        # the memo is released when the scope exits
+        DescriptorMemo.get(mol, 'MolLogP')
+        self.assertEqual(len(self.calls), 4)
+
+    def test_shared_descriptors(self):
+        f = AggregatedSum([QED(), LogP(), MolecularWeight(), QED(), LogP()])
+        for mol in self.mols:
+            f.get_fitness_single(mol)
+        # logP and the QED properties are computed once per molecule
+        self.assertEqual(len(self.calls), len(self.mols))
+        self.assertEqual(len(self.qed_calls), len(self.mols))
+
+    def test_qed(self):
+        mols = self.mols + [AddHs(self.mols[2]), MolFromSmiles('c1ccc2ccccc2c1CC1CC1')]
+        with DescriptorMemo.scope():
+            for mol in mols:
+                self.assertEqual(QED().get_fitness_single(mol), qed(mol))
+        self.assertEqual(QED().get_fitness(mols), [qed(mol) for mol in mols])
+        self.assertEqual(QED(worst_fitness=-1.0).get_fitness_single(None), -1.0)
+
+    def test_errors(self):
+        with DescriptorMemo.scope():
+            with self.assertRaises(Exception):
+                DescriptorMemo.get(None, 'MolWt')
+            self.assertEqual(MolecularWeight(worst_fitness=-1.0).get_fitness_single(None), -1.0)
+
+    def test_register(self):
+        DescriptorMemo.register('NumAtoms', lambda mol: mol.GetNumAtoms())
+        self.assertEqual(DescriptorMemo.get(self.mols[1], 'NumAtoms'), 7)
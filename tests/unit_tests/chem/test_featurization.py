@@ -0,0 +1,93 @@
+from unittest import TestCase
+
+import numpy as np
+from rdkit.Chem import MolFromSmiles
+
+from reactea.chem import FeatureCache
+from reactea.wrappers import evaluation_functions_wrapper
+
+
+class TestFeatureCache(TestCase):
+
+    def setUp(self) -> None:
+        self.smiles = ['CCO', 'OCCO', 'c1ccccc1O', 'CC(=O)O', 'CCCCCC']
+        self.mols = [MolFromSmiles(smi) for smi in self.smiles]
+
+    def test_features(self):
+        cache = FeatureCache()
+        for feature_type in FeatureCache.FEATURIZERS:
+            features = cache.features(self.mols, feature_type)
+            self.assertEqual(features.shape[0], len(self.mols))
+            self.assertTrue(features.flags['C_CONTIGUOUS'])
+            # cached features are the same as the computed ones
+            np.testing.assert_array_equal(cache.features(self.mols[::-1], feature_type), features[::-1])
+        self.assertEqual(cache.features(self.mols[:1], 'ecfp4').dtype, np.uint8)
+        self.assertEqual(cache.stats()['misses'], len(self.mols) * len(FeatureCache.FEATURIZERS))
+        self.assertEqual(cache.stats()['size']['maccs'], len(self.mols))
+        with self.assertRaises(ValueError):
+            cache.features(self.mols, 'unknown')
+
+    def test_invalid_mols(self):
+        cache = FeatureCache()
+        features = cache.features([self.mols[0], None, 'CC=('], '2d')
+        self.assertFalse(np.isnan(features[0]).all())
+        self.assertTrue(np.isnan(features[1]).all())
+        self.assertTrue(np.isnan(features[2]).all())
+        self.assertEqual(cache.features([None], 'ecfp4').shape, (1, 0))
+
+    def test_eviction(self):
+        cache = FeatureCache(maxsize=2)
+        expected = FeatureCache().features(self.mols, 'maccs')
+        np.testing.assert_array_equal(cache.features(self.mols, 'maccs'), expected)
+        self.assertEqual(cache.stats()['size']['maccs'], 2)
+        # evicted rows are reused by other molecules
+        np.testing.assert_array_equal(cache.features(self.mols, 'maccs'), expected)
+        cache.resize(1)
+        self.assertEqual(cache.stats()['size']['maccs'], 1)
+        np.testing.assert_array_equal(cache.features(self.mols[::-1], 'maccs'), expected[::-1])
+
+    def test_register(self):
+        featurizers = FeatureCache.FEATURIZERS
+        FeatureCache.register('n_atoms', lambda mol: [mol.GetNumAtoms()])
+        try:
+            features = FeatureCache().features(self.mols, 'n_atoms')
+            self.assertEqual(features[:, 0].tolist(), [mol.GetNumAtoms() for mol in self.mols])
+        finally:
+            FeatureCache.FEATURIZERS = featurizers
+
+    def test_wrapped_model(self):
+        calls = []
+
+        def model(features):
+            calls.append(features.shape)
+            return features.sum(axis=1) / features.shape[1]
+
+        f = evaluation_functions_wrapper(model, True, -1.0, 'ECFP4 density', features='ecfp4')
+        self.assertFalse(f.parallel)
+        scores = f.get_fitness(self.mols + [None])
+        self.assertEqual(len(scores), len(self.mols) + 1)
+        self.assertEqual(scores[-1], -1.0)
+        # the model is called once per batch
+        self.assertEqual(calls, [(len(self.mols) + 1, 2048)])
+        self.assertAlmostEqual(f.get_fitness_single(self.mols[0]), scores[0])
+
+    def test_cached_featurizer(self):
+        class MorganFingerprint:
+            def __init__(self, radius=2):
+                self.radius = radius
+                self.calls = 0
+
+            def _featurize(self, mol):
+                self.calls += 1
+                return np.zeros(8)
+
+        MorganFingerprint._featurize = FeatureCache.cached_featurizer(MorganFingerprint._featurize, 'ecfp4',
+                                                                      {'radius': 2})
+        expected = FeatureCache().features(self.mols, 'ecfp4')
+        featurizer = MorganFingerprint()
+        for _ in range(2):
+            for mol, features in zip(self.mols, expected):
+                np.testing.assert_array_equal(featurizer._featurize(mol), features)
+        self.assertEqual(featurizer.calls, 0)
+        # features computed with other settings are not cached
+        self.assertEqual(len(MorganFingerprint(radius=3)._featurize(self.mols[0])), 8)
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+from rdkit import DataStructs
+from rdkit.Chem import Mol, MolFromSmiles
+from rdkit.Chem.rdMolDescriptors import GetMorganFingerprintAsBitVect
+
+from reactea.chem import PackedFingerprintMatrix
+
+
+class TestPackedFingerprintMatrix(TestCase):
+
+    def setUp(self) -> None:
+        self.seeds = ['CCO', 'OCCO', 'c1ccccc1O', 'CC(=O)O', 'CCCCCC', 'CC(=O)Oc1ccccc1C(=O)O']
+        self.mols = [MolFromSmiles(smi) for smi in ['CCCO', 'c1ccccc1N', 'OC(=O)CCC(=O)O']]
+
+    def _expected(self, mols, method):
+        seeds = [GetMorganFingerprintAsBitVect(MolFromSmiles(smi), 2, nBits=1024) for smi in self.seeds]
+        sims = [DataStructs.BulkTanimotoSimilarity(GetMorganFingerprintAsBitVect(mol, 2, nBits=1024), seeds)
+                for mol in mols]
+        return np.max(sims, axis=1) if method == 'max' else np.mean(sims, axis=1)
+
+    def test_similarities(self):
+        matrix = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024)
+        self.assertEqual(matrix.planes.shape, (1024, 1))
+        self.assertEqual(matrix.counts.tolist(), [fp.sum() for fp in matrix.fingerprints(self.seeds, 1024)[0]])
+        for method in ['max', 'mean']:
+            np.testing.assert_allclose(matrix.similarities(self.mols, method), self._expected(self.mols, method))
+        with self.assertRaises(ValueError):
+            matrix.similarities(self.mols, 'min')
+
+    def test_blocks(self):
+        self.seeds = self.seeds * 3
+        matrix = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024)
+        # blocks of 8 seeds
+        matrix.BLOCK_BYTES = 1
+        self.assertEqual(len(matrix._blocks(10)), 3)
+        for method in ['max', 'mean']:
+            np.testing.assert_allclose(matrix.similarities(self.mols, method), self._expected(self.mols, method))
+
+    def test_batches(self):
+        matrix = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024)
+        # groups of 2 molecules with different numbers of bits set, in batches of 3 molecules
+        matrix.GROUP_SIZE = 2
+        matrix.QUERY_CHUNK_SIZE = 3
+        mols = self.mols + [MolFromSmiles(smi) for smi in self.seeds] + self.mols[::-1]
+        for method in ['max', 'mean']:
+            np.testing.assert_allclose(matrix.similarities(mols, method), self._expected(mols, method))
+        # empty fingerprints are not similar to any fingerprint
+        self.assertEqual(matrix.similarities([Mol(), self.mols[0]]).tolist()[0], 0.0)
+
+    def test_invalid_mols(self):
+        matrix = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024)
+        sims = matrix.similarities([self.mols[0], None, 'CC=('], 'max')
+        self.assertFalse(np.isnan(sims[0]))
+        self.assertTrue(np.isnan(sims[1:]).all())
+        with self.assertRaises(ValueError):
+            PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=0)
+
+    def test_memmap(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'seeds.npy')
+            matrix = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024, path=path)
+            self.assertIsInstance(matrix.planes, np.memmap)
+            np.testing.assert_allclose(matrix.similarities(self.mols), self._expected(self.mols, 'max'))
+            # the file is reused
+            reloaded = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024, path=path)
+            np.testing.assert_array_equal(reloaded.planes, matrix.planes)
+            np.testing.assert_array_equal(reloaded.counts, matrix.counts)
+            # and rebuilt if it does not match the molecules
+            rebuilt = PackedFingerprintMatrix.from_molecules(self.seeds[:2], n_bits=1024, path=path)
+            self.assertEqual(len(rebuilt), 2)
+            # including other molecules with the same number of seeds
+            self.seeds = ['CCCCCCCCCC'] * 2
+            other = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024, path=path)
+            np.testing.assert_allclose(other.similarities(self.mols), self._expected(self.mols, 'max'))
+            # or other fingerprint parameters
+            other = PackedFingerprintMatrix.from_molecules(self.seeds, n_bits=1024, radius=3, path=path)
+            self.assertEqual(other.radius, 3)
+            self.assertEqual(json.load(open(f'{path}.json'))['radius'], 3)
+            del matrix, reloaded, rebuilt, other
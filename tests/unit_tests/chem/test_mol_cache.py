@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from reactea.chem import MolCache, Compound, ChemUtils
+
+
+class TestMolCache(TestCase):
+
+    def test_mol_cache(self):
+        cache = MolCache(maxsize=3)
+        mol, key = cache.get('OCC')
+        self.assertEqual(key, 'CCO')
+        self.assertEqual(cache.stats()['misses'], 1)
+        # the canonical form shares the entry of the parsed string
+        self.assertTrue(cache.mol('CCO') is mol)
+        self.assertTrue(cache.mol('OCC') is mol)
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.to_smiles(mol), 'CCO')
+        self.assertEqual(cache.stats()['hits'], 3)
+
+        # invalid SMILES strings are also cached
+        self.assertEqual(cache.get('C1CC'), (None, None))
+        self.assertEqual(cache.get('C1CC'), (None, None))
+        self.assertEqual(len(cache), 3)
+
+        # least recently used entries are evicted first
+        cache.get('c1ccccc1')
+        self.assertEqual(len(cache), 3)
+        self.assertFalse('CCO' in cache._entries)
+        # the evicted canonical entry is no longer reachable by identity
+        self.assertEqual(cache.to_smiles(mol), 'CCO')
+        self.assertEqual(cache.stats()['misses'], 4)
+        self.assertTrue('c1ccccc1' in cache._entries)
+
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()['maxsize'], 1)
+
+        cache.clear()
+        self.assertEqual(cache.stats(), {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'size': 0, 'maxsize': 1})
+
+        no_cache = MolCache(maxsize=0)
+        self.assertEqual(no_cache.canonical('OCC'), 'CCO')
+        self.assertEqual(len(no_cache), 0)
+
+    def test_shared_mol_cache(self):
+        cache = MolCache.shared()
+        self.assertTrue(MolCache.shared() is cache)
+        cmp1 = Compound('OCC', 'id1')
+        cmp2 = Compound('CCO', 'id2')
+        self.assertTrue(cmp1.mol is cmp2.mol)
+        hits = cache.stats()['hits']
+        self.assertEqual(ChemUtils.canonicalize_smiles('OCC'), 'CCO')
+        self.assertEqual(cache.stats()['hits'], hits + 1)
@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from rdkit.Chem import MolFromSmiles
+
+from reactea.chem import ProductFilterChain, WildcardAtomsFilter, MinAtomsFilter, RequiredElementsFilter, \
+    PropertyWindowFilter
+
+
+class TestProductFilters(TestCase):
+
+    def test_product_filters(self):
+        self.assertFalse(WildcardAtomsFilter()(MolFromSmiles('CCC*')))
+        self.assertTrue(WildcardAtomsFilter()(MolFromSmiles('CCCC')))
+        self.assertFalse(MinAtomsFilter(4)(MolFromSmiles('CCO')))
+        self.assertTrue(MinAtomsFilter(3)(MolFromSmiles('CCO')))
+        self.assertTrue(RequiredElementsFilter(['C', 'N'])(MolFromSmiles('c1ccncc1')))
+        self.assertFalse(RequiredElementsFilter(['C', 'N'])(MolFromSmiles('c1ccccc1')))
+        self.assertTrue(PropertyWindowFilter('MolWt', 40, 50)(MolFromSmiles('CCO')))
+        self.assertFalse(PropertyWindowFilter('MolWt', None, 40)(MolFromSmiles('CCO')))
+        with self.assertRaises(ValueError):
+            PropertyWindowFilter('NotADescriptor', 0, 1)
+
+    def test_product_filter_chain(self):
+        default_chain = ProductFilterChain.build()
+        self.assertTrue(default_chain(MolFromSmiles('CCCO', sanitize=False)))
+        self.assertFalse(default_chain(MolFromSmiles('NNNO', sanitize=False)))
+        # products that can not be sanitized are rejected
+        self.assertFalse(default_chain(MolFromSmiles('CC(C)(C)(C)C', sanitize=False)))
+
+        configs = {'product_min_atoms': 2,
+                   'product_required_elements': ['O'],
+                   'product_property_windows': {'MolWt': [None, 50], 'NumHDonors': [1, None]}}
+        chain = ProductFilterChain.from_configs(configs)
+        self.assertEqual(len(chain.filters), 5)
+        self.assertTrue(chain(MolFromSmiles('CO')))
+        self.assertFalse(chain(MolFromSmiles('COC')))
+        self.assertFalse(chain(MolFromSmiles('CCCCO')))
+        self.assertFalse(chain(MolFromSmiles('CC')))
@@ -0,0 +1,61 @@
+import pickle
+from unittest import TestCase
+
+from reactea.chem import ReactionOutcomeMemo
+
+
+class TestReactionOutcomeMemo(TestCase):
+
+    def test_reaction_outcome_memo(self):
+        memo = ReactionOutcomeMemo(maxsize=2)
+        self.assertTrue(memo.get('CCO', 'R1') is None)
+        memo.put('CCO', 'R1', ['CC=O'])
+        memo.put('CCO', 'R2', [])
+        self.assertEqual(memo.get('CCO', 'R1'), ('CC=O',))
+        # "no products" outcomes are also stored
+        self.assertEqual(memo.get('CCO', 'R2'), ())
+        self.assertEqual(memo.stats()['hits'], 2)
+        self.assertEqual(memo.stats()['negative_hits'], 1)
+        self.assertEqual(memo.stats()['misses'], 1)
+
+        # least recently used outcomes are evicted first
+        memo.put('CCO', 'R3', [])
+        self.assertEqual(len(memo), 2)
+        self.assertTrue(memo.get('CCO', 'R1') is None)
+        self.assertEqual(memo.n_failures('CCO'), 2)
+
+        self.assertFalse(memo.is_dead_end('CCO'))
+        memo.mark_dead_end('CCO')
+        self.assertTrue(memo.is_dead_end('CCO'))
+        self.assertEqual(memo.stats()['dead_ends'], 1)
+        self.assertEqual(memo.stats()['dead_end_hits'], 1)
+
+        memo = pickle.loads(pickle.dumps(memo))
+        self.assertTrue(memo.is_dead_end('CCO'))
+        memo.clear()
+        self.assertEqual(len(memo), 0)
+        self.assertFalse(memo.is_dead_end('CCO'))
+
+        disabled_memo = ReactionOutcomeMemo(maxsize=0)
+        disabled_memo.put('CCO', 'R1', ['CC=O'])
+        self.assertTrue(disabled_memo.get('CCO', 'R1') is None)
+
+    def test_bounded_failures_and_dead_ends(self):
+        memo = ReactionOutcomeMemo(maxsize=3)
+        for rule_id in ['R1', 'R2', 'R3', 'R2']:
+            memo.put('CCO', rule_id, [])
+        self.assertEqual(memo.n_failures('CCO'), 3)
+        # failed rule ids are bounded over all compounds (least recently used compounds are evicted first)
+        memo.put('CCC', 'R1', [])
+        self.assertEqual(memo.n_failures('CCO'), 0)
+        self.assertEqual(memo.n_failures('CCC'), 1)
+        self.assertEqual(memo._n_failed_rules, 1)
+
+        for key in ['C1', 'C2', 'C3']:
+            memo.mark_dead_end(key)
+        self.assertTrue(memo.is_dead_end('C1'))
+        memo.mark_dead_end('C4')
+        self.assertEqual(memo.stats()['dead_ends'], 3)
+        # the least recently used dead end is evicted
+        self.assertFalse(memo.is_dead_end('C2'))
+        self.assertTrue(memo.is_dead_end('C1'))
@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from reactea.chem import ReactionRule
+from reactea.chem import ReactionRule, Compound
 
 
 class TestReactionRules(TestCase):
@@ -49,3 +49,47 @@ class TestReactionRules(TestCase):
         r_r_2.smarts = invalid_smarts
         self.assertEqual(r_r_2.smarts, invalid_smarts)
         self.assertTrue(r_r_2.reaction is None)
+
+    def test_coreactants(self):
+        rr = '[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]'
+        r_r = ReactionRule(rr, 'id1', 'O;Any')
+        cmp = Compound('CCN', 'cmp1')
+
+        coreactants = r_r.coreactants
+        self.assertEqual(len(coreactants), 2)
+        self.assertTrue(coreactants[1] is None)
+        # coreactants are only parsed once
+        self.assertTrue(r_r.coreactants[0] is coreactants[0])
+
+        reactants = r_r.reactants_to_mol_list(cmp)
+        self.assertEqual(len(reactants), 2)
+        self.assertTrue(reactants[0] is coreactants[0])
+        self.assertTrue(reactants[1] is cmp.mol)
+        self.assertTrue(len(r_r.reaction.RunReactants(tuple(reactants))) > 0)
+
+        r_r_invalid = ReactionRule(rr, 'id2', 'C)(C;Any')
+        reactants = r_r_invalid.reactants_to_mol_list(cmp)
+        self.assertTrue(reactants[0] is None)
+        self.assertTrue(reactants[1] is cmp.mol)
+
+    def test_lazy_reaction_rules(self):
+        rr = '([#8&v2&H1:1]-[#8&v2&H0:2]-[#6&v4&H1:3])>>([#8&v2&H1:2]-[#6&v4&H1:3].[#8&v2&H2:1])'
+        r_r = ReactionRule(rr, 'id1', lazy=True)
+        self.assertFalse(r_r.compiled)
+        self.assertEqual(ReactionRule.n_compiled([r_r, ReactionRule(rr, 'id0')]), 1)
+
+        reaction = r_r.reaction
+        self.assertTrue(r_r.compiled)
+        self.assertTrue(reaction is not None)
+        self.assertEqual(ReactionRule.n_compiled([r_r]), 1)
+        # the reaction is memoized
+        self.assertTrue(r_r.reaction is reaction)
+        self.assertEqual(ReactionRule.n_compiled([r_r]), 1)
+
+        r_r_serialized = ReactionRule(rr, 'id2', reaction=reaction.ToBinary(), lazy=True)
+        self.assertFalse(r_r_serialized.compiled)
+        self.assertEqual(r_r_serialized.reaction.GetNumReactantTemplates(), 1)
+
+        r_r_invalid = ReactionRule('!!' + rr, 'id3', lazy=True)
+        self.assertTrue(r_r_invalid.reaction is None)
+        self.assertTrue(r_r_invalid.compiled)
@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+from reactea.chem import Compound, ReactionRule, RuleApplicabilityIndex, ReactantTemplateGroups
+
+
+class TestRuleApplicabilityIndex(TestCase):
+
+    def test_rule_applicability_index(self):
+        rules = [ReactionRule('([#8&v2&H1:1]-[#8&v2&H0:2]-[#6&v4&H1:3])>>([#8&v2&H1:2]-[#6&v4&H1:3].[#8&v2&H2:1])',
+                              'R1'),
+                 ReactionRule('([#6&v4&H1:1](=[#8&v2&H0:2])-[#6&v4&H2:3]-[#6&v4&H3:4])>>([#6&v4&H2:1](-[#8&v2&H1:2])'
+                              '-[#6&v4&H1:3](-[#6&v4&H3:4])-[#8&v2&H1])', 'R2'),
+                 ReactionRule('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R3', 'O;Any'),
+                 ReactionRule('!![#6:1]>>[#6:1]', 'R4')]
+        index = RuleApplicabilityIndex(rules)
+        self.assertEqual(len(index), 4)
+
+        compounds = [Compound('OOC(C)C', 'C1'), Compound('CCC=O', 'C2'), Compound('CCN', 'C3'),
+                     Compound('CC)(CC=', 'C4')]
+        for compound in compounds:
+            mask = index.screen(compound)
+            self.assertEqual(mask.shape, (len(rules),))
+            for i, rule in enumerate(rules):
+                if rule.reaction is None:
+                    self.assertFalse(mask[i])
+                    continue
+                reactants = rule.reactants_to_mol_list(compound)
+                reactants = reactants if isinstance(reactants, list) else [reactants]
+                if compound.mol is not None and len(rule.reaction.RunReactants(tuple(reactants))) > 0:
+                    # rules that can fire must never be screened out
+                    self.assertTrue(mask[i])
+
+        self.assertEqual(list(index.applicable_rules(compounds[0])), [0])
+        self.assertEqual(list(index.applicable_rules(compounds[1])), [1])
+        self.assertEqual(list(index.applicable_rules(compounds[2])), [2])
+        self.assertEqual(len(index.applicable_rules(compounds[3])), 0)
+
+
+class TestReactantTemplateGroups(TestCase):
+
+    def test_reactant_template_groups(self):
+        rules = [ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R1'),
+                 # same reactant template (with other atom maps) and different products
+                 ReactionRule('[#6:2]-[#8&H1:1]>>[#6:2]-[#8:1]-[#6]', 'R2'),
+                 ReactionRule('[#7:1]-[#6:2]>>[#7:1].[#6:2]', 'R3'),
+                 ReactionRule('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R4', 'O;Any'),
+                 ReactionRule('!![#6:1]>>[#6:1]', 'R5')]
+        groups = ReactantTemplateGroups(rules)
+        compound = Compound('CCCO', 'C1')
+        self.assertTrue(groups.matches(compound, 0))
+        self.assertTrue(groups.matches(compound, 1))
+        self.assertFalse(groups.matches(compound, 2))
+        self.assertFalse(groups.matches(compound, 3))
+        # invalid rules are not grouped
+        self.assertTrue(groups.matches(compound, 4))
+        self.assertEqual(groups.group_of[0], groups.group_of[1])
+        self.assertEqual(groups.group_of[2], groups.group_of[3])
+        self.assertEqual(groups.group_of[4], -1)
+        self.assertEqual(len(groups), 2)
+        stats = groups.stats()
+        # the templates of each group are matched once for the compound
+        self.assertEqual(stats['matched'], 2)
+        self.assertEqual(stats['skipped'], 2)
+        self.assertEqual(stats['average_group_size'], 2.0)
+
+        for smiles in ['CCN', 'OCCN', 'CCC', 'CC)(CC=']:
+            compound = Compound(smiles, 'C2')
+            for i, rule in enumerate(rules[:4]):
+                reactants = rule.reactants_to_mol_list(compound)
+                reactants = reactants if isinstance(reactants, list) else [reactants]
+                if compound.mol is not None and len(rule.reaction.RunReactants(tuple(reactants))) > 0:
+                    # rules that can fire must always match
+                    self.assertTrue(groups.matches(compound, i))
+                elif compound.mol is None:
+                    self.assertFalse(groups.matches(compound, i))
@@ -0,0 +1,101 @@
+import random
+from collections import Counter
+from unittest import TestCase
+
+import numpy as np
+
+from reactea.chem.reaction_rules import ReactionRule
+from reactea.chem.rule_sampling import RuleSampler, UniformRuleSampler, WeightedRuleSampler, BanditRuleSampler
+from reactea.chem.rule_statistics import RuleStatistics
+
+
+class TestRuleSampling(TestCase):
+
+    def test_uniform_rule_sampler(self):
+        sampler = UniformRuleSampler(100)
+        drawn = list(sampler.sample(10, random.Random(0)))
+        self.assertEqual(len(drawn), 10)
+        self.assertEqual(len(set(drawn)), 10)
+        # the same seed draws the same rules
+        self.assertEqual(drawn, list(sampler.sample(10, random.Random(0))))
+        # drawing all the rules gives a permutation
+        self.assertEqual(sorted(sampler.sample(1000, random.Random(1))), list(range(100)))
+
+        counts = Counter(next(iter(UniformRuleSampler(4).sample(1, random.Random(i)))) for i in range(4000))
+        self.assertEqual(set(counts), {0, 1, 2, 3})
+        for count in counts.values():
+            self.assertAlmostEqual(count / 4000, 0.25, delta=0.05)
+
+    def test_weighted_rule_sampler(self):
+        sampler = WeightedRuleSampler([1.0, 0.0, 3.0, 0.5])
+        self.assertEqual(sampler.n_positive, 3)
+        # rules with priority 0 are never drawn
+        self.assertEqual(sorted(sampler.sample(10, random.Random(0))), [0, 2, 3])
+
+        rng = random.Random(0)
+        counts = Counter()
+        for _ in range(9000):
+            draw = sampler.sample(2, rng)
+            counts[next(draw)] += 1
+            # the draw is abandoned (the drawn rule is put back)
+            draw.close()
+        self.assertEqual(counts[1], 0)
+        self.assertAlmostEqual(counts[0] / 9000, 1 / 4.5, delta=0.03)
+        self.assertAlmostEqual(counts[2] / 9000, 3 / 4.5, delta=0.03)
+        self.assertAlmostEqual(counts[3] / 9000, 0.5 / 4.5, delta=0.03)
+
+        with self.assertRaises(ValueError):
+            WeightedRuleSampler([0.0, 0.0])
+        with self.assertRaises(ValueError):
+            WeightedRuleSampler([1.0, -1.0])
+
+    def test_from_configs(self):
+        rules = [ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R1'),
+                 ReactionRule('[#7:1]-[#6:2]>>[#7:1].[#6:2]', 'R2')]
+        self.assertIsInstance(RuleSampler.from_configs(rules, {}), UniformRuleSampler)
+        sampler = RuleSampler.from_configs(rules, {'rule_priorities': {'R1': 0}})
+        self.assertIsInstance(sampler, WeightedRuleSampler)
+        # rules without a priority get the default priority
+        self.assertEqual(list(sampler.sample(2)), [1])
+
+    def test_bandit_rule_sampler(self):
+        stats = RuleStatistics(['R1', 'R2', 'R3'])
+        sampler = BanditRuleSampler(stats, 'ucb')
+        # rules never tried are drawn first
+        stats.record_trial(0, False)
+        stats.record_trial(1, True)
+        self.assertEqual(next(iter(sampler.sample(1, random.Random(0)))), 2)
+        stats.record_trial(2, False)
+        self.assertEqual(list(sampler.sample(3, random.Random(0)))[0], 1)
+
+        # untried rules are drawn in random order
+        sampler = BanditRuleSampler(RuleStatistics(range(1000)), 'ucb')
+        orders = {tuple(sampler.sample(8, random.Random(seed))) for seed in range(5)}
+        self.assertEqual(len(orders), 5)
+        self.assertNotIn(tuple(range(8)), orders)
+        self.assertEqual(sorted(sampler.sample(2000)), list(range(1000)))
+
+        # rules are ranked lazily (in rounds of doubling size) in the same order as a full ranking
+        ranked_stats = RuleStatistics(range(100))
+        rng = random.Random(0)
+        for i in range(100):
+            for _ in range(rng.randrange(1, 5)):
+                ranked_stats.record_trial(i, rng.random() < 0.5)
+        sampler = BanditRuleSampler(ranked_stats, 'ucb')
+        expected = list(np.argsort(-sampler.scores(random.Random(3)), kind='stable'))
+        self.assertEqual(list(sampler.sample(100, random.Random(3))), expected)
+        self.assertEqual(list(sampler.sample(20, random.Random(3))), expected[:20])
+
+        for _ in range(50):
+            stats.record_trial(0, False)
+            stats.record_trial(1, True)
+            stats.record_trial(2, False)
+        sampler = BanditRuleSampler(stats, 'thompson')
+        counts = Counter(next(iter(sampler.sample(1, random.Random(i)))) for i in range(200))
+        self.assertGreater(counts[1], 190)
+        self.assertEqual(sorted(sampler.sample(5)), [0, 1, 2])
+
+        with self.assertRaises(ValueError):
+            BanditRuleSampler(stats, 'greedy')
+        with self.assertRaises(ValueError):
+            RuleSampler.from_configs([], {'rule_selection': 'ucb'})
@@ -0,0 +1,40 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from reactea.chem.reaction_rules import ReactionRule
+from reactea.chem.rule_statistics import RuleStatistics
+
+
+class TestRuleStatistics(TestCase):
+
+    def test_rule_statistics(self):
+        stats = RuleStatistics(['R1', 'R2', 'R3'])
+        stats.record_trial(0, True)
+        stats.record_trial(0, True)
+        stats.record_trial(1, False)
+        stats.record_fitness(0, 0.5)
+        stats.record_fitness(0, -0.1)
+        np.testing.assert_array_equal(stats.trials, [2, 1, 0])
+        np.testing.assert_array_equal(stats.successes, [2, 0, 0])
+        np.testing.assert_array_equal(stats.improvements, [1, 0, 0])
+        np.testing.assert_allclose(stats.success_rate(), [3 / 4, 1 / 3, 1 / 2])
+        np.testing.assert_allclose(stats.improvement_rate(), [2 / 4, 1 / 2, 1 / 2])
+        self.assertEqual(int(np.argmax(stats.expected_reward())), 0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'rule_statistics.tsv')
+            stats.save(path)
+            # statistics are matched by rule id (unknown rules are ignored)
+            loaded = RuleStatistics(['R4', 'R2', 'R1'])
+            loaded.load(path)
+            np.testing.assert_array_equal(loaded.trials, [0, 1, 2])
+            np.testing.assert_allclose(loaded.fitness_gain, [0.0, 0.0, 0.4])
+
+            rules = [ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R1')]
+            self.assertIsNone(RuleStatistics.from_configs(rules, {}))
+            from_configs = RuleStatistics.from_configs(rules, {'rule_statistics_path': path})
+            np.testing.assert_array_equal(from_configs.trials, [2])
+            self.assertEqual(RuleStatistics.from_configs(rules, {'rule_selection': 'ucb'}).trials.sum(), 0)
@@ -0,0 +1,40 @@
+from unittest import TestCase
+
+from reactea.chem import ReactionRule, RuleValidator
+
+
+class TestRuleValidator(TestCase):
+
+    def test_check(self):
+        self.assertIsNone(RuleValidator.check(ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R1')))
+        self.assertIsNone(RuleValidator.check(ReactionRule('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R2',
+                                                           'O;Any')))
+        self.assertEqual(RuleValidator.check(ReactionRule('!![#6:1]>>[#6:1]', 'R3')), RuleValidator.PARSE_ERROR)
+        # two reactant templates and a single reactant
+        self.assertEqual(RuleValidator.check(ReactionRule('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R4')),
+                         RuleValidator.REACTANT_COUNT)
+        # the coreactant can never match its template
+        self.assertEqual(RuleValidator.check(ReactionRule('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R5',
+                                                          'C;Any')),
+                         RuleValidator.UNMATCHED_COREACTANT)
+        self.assertEqual(RuleValidator.check(ReactionRule('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R6',
+                                                          'O;O')),
+                         RuleValidator.NO_COMPOUND_REACTANT)
+
+    def test_validate_records(self):
+        records = [('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R1', 'Any'),
+                   ('!![#6:1]>>[#6:1]', 'R2', 'Any'),
+                   ('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R3', float('nan')),
+                   ('[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]', 'R4', 'O;Any')]
+        for n_jobs in [1, 2]:
+            rules, report = RuleValidator.validate_records(records, lazy=True, n_jobs=n_jobs, chunk_size=2)
+            self.assertEqual([rule.rule_id for rule in rules], ['R1', 'R4'])
+            self.assertFalse(rules[0].compiled)
+            self.assertEqual(rules[1].reaction.GetNumReactantTemplates(), 2)
+            self.assertIsNotNone(rules[1].template_fingerprint)
+            self.assertEqual(list(report['InternalID']), ['R2', 'R3'])
+            self.assertEqual(list(report['Reason']), [RuleValidator.PARSE_ERROR, RuleValidator.REACTANT_COUNT])
+
+        rules, report = RuleValidator.validate([ReactionRule(*record) for record in records[:2]])
+        self.assertEqual(len(rules), 1)
+        self.assertEqual(list(report['Reason']), [RuleValidator.PARSE_ERROR])
@@ -0,0 +1,42 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from reactea.chem import SimilarityEngine, Compound, ChemUtils
+
+
+class TestSimilarityEngine(TestCase):
+
+    def test_similarities(self):
+        engine = SimilarityEngine()
+        reference = Compound('CCCCCCO', 'id0')
+        candidates = ['CCCCCCN', 'CCCCCC(O)O', 'c1ccccc1', 'C1CC', 'CCCCCCO']
+        sims = engine.similarities(reference, candidates)
+        expected = [ChemUtils.calc_fingerprint_similarity('CCCCCCO', c) for c in candidates]
+        self.assertTrue(np.allclose(sims, expected))
+        self.assertEqual(sims[3], 0.0)
+        self.assertEqual(sims[4], 1.0)
+        # the fingerprint of the reference compound is cached
+        self.assertTrue(reference.get_fingerprint('rdkit') is engine.fingerprint(reference))
+        reference.smiles = 'CCCCCCN'
+        self.assertTrue(reference.get_fingerprint('rdkit') is None)
+
+        for fingerprint_type in ['morgan', 'maccs']:
+            sims = SimilarityEngine(fingerprint_type).similarities(reference, candidates)
+            self.assertEqual(sims[0], 1.0)
+            self.assertEqual(sims[3], 0.0)
+        with self.assertRaises(ValueError):
+            SimilarityEngine('not_a_fingerprint')
+
+    def test_most_similar(self):
+        engine = SimilarityEngine()
+        candidates = ['c1ccccc1', 'CCCCCCN', 'CCCCCCO']
+        self.assertEqual(engine.most_similar('CCCCCCO', candidates, tolerance=0.0), 'CCCCCCO')
+        self.assertEqual(engine.most_similar_index('CCCCCCO', candidates, tolerance=0.0), 2)
+        self.assertEqual(engine.most_similar('CCCCCCO', ['c1ccccc1']), 'c1ccccc1')
+
+        random.seed(42)
+        picked = {engine.most_similar('CCCCCCO', candidates, tolerance=1.0) for _ in range(50)}
+        self.assertEqual(picked, set(candidates))
+        self.assertEqual(ChemUtils.most_similar_compound('CCCCCCO', candidates, tolerance=0.0), 'CCCCCCO')
@@ -1,8 +1,11 @@
+import os
+import pickle
+import tempfile
 from unittest import TestCase
 
 from rdkit.Chem import Mol
 
-from reactea.chem import Compound, ChEMBLStandardizer
+from reactea.chem import Compound, ChEMBLStandardizer, CachedStandardizer
 
 
 class TestChEMBLStandardizer(TestCase):
@@ -17,3 +20,43 @@ class TestChEMBLStandardizer(TestCase):
         self.assertIsInstance(cmp1.mol, Mol)
 
         self.assertTrue(cmp2.mol is None)
+
+
+class TestCachedStandardizer(TestCase):
+
+    def test_cached_standardizer(self):
+        smiles = 'CCCCCCCCCCCCCCCCCC(=O)OC(CO)COP(=O)(O)OCCN.[Na+].[Cl-]'
+        expected = ChEMBLStandardizer().standardize(Compound(smiles, 'id0')).smiles
+
+        standardizer = CachedStandardizer(ChEMBLStandardizer)
+        cmp1 = standardizer.standardize(Compound(smiles, 'id1'))
+        self.assertEqual(cmp1.smiles, expected)
+        self.assertEqual(standardizer.stats(), {'hits': 0, 'misses': 1, 'size': 2})
+        cmp2 = standardizer.standardize(Compound(smiles, 'id2'))
+        self.assertEqual(cmp2.smiles, expected)
+        self.assertEqual(cmp2.cmp_id, 'id2')
+        # previously standardized compounds are returned immediately
+        cmp3 = standardizer.standardize(cmp1)
+        self.assertEqual(cmp3.smiles, expected)
+        self.assertEqual(standardizer.stats()['hits'], 2)
+        self.assertTrue(standardizer.standardize(Compound('CC)(CC=', 'id3')).mol is None)
+
+        self.assertTrue(CachedStandardizer.from_configs(None, {}) is None)
+        self.assertTrue(CachedStandardizer.from_configs(standardizer, {}) is standardizer)
+        self.assertTrue(CachedStandardizer.from_configs(ChEMBLStandardizer, {'standardization_cache_size': 0})
+                        is ChEMBLStandardizer)
+
+    def test_persistent_cached_standardizer(self):
+        smiles = 'CCCCCCCCCCCCCCCCCC(=O)OC(CO)COP(=O)(O)OCCN.[Na+].[Cl-]'
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, 'standardization.sqlite')
+            standardizer = CachedStandardizer.from_configs(ChEMBLStandardizer(),
+                                                           {'standardization_cache_path': db_path})
+            expected = standardizer.standardize(Compound(smiles, 'id1')).smiles
+            standardizer.close()
+
+            # results are reused by new standardizers (e.g. in other runs or processes)
+            new_standardizer = pickle.loads(pickle.dumps(CachedStandardizer(ChEMBLStandardizer, db_path=db_path)))
+            self.assertEqual(new_standardizer.standardize(Compound(smiles, 'id2')).smiles, expected)
+            self.assertEqual(new_standardizer.stats()['hits'], 1)
+            new_standardizer.close()
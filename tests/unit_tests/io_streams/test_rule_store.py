@@ -0,0 +1,67 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from reactea.chem import RuleApplicabilityIndex, Compound
+from reactea.io_streams import ReactionRuleStore
+
+
+class TestReactionRuleStore(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source_path = os.path.join(self.tmp_dir, 'rules.tsv.bz2')
+        rules_df = pd.DataFrame({'InternalID': ['R1', 'R2', 'R3'],
+                                 'SMARTS': ['([#8&v2&H1:1]-[#8&v2&H0:2]-[#6&v4&H1:3])>>([#8&v2&H1:2]-[#6&v4&H1:3].'
+                                            '[#8&v2&H2:1])',
+                                            '[#8:3].[#7:1]-[#6:2]>>[#7:1]-[#8:3].[#6:2]',
+                                            '!![#6:1]>>[#6:1]'],
+                                 'Reactants': ['Any', 'O;Any', 'Any']})
+        rules_df.to_csv(self.source_path, sep='\t', index=False, compression='bz2')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_rule_store(self):
+        store_path = ReactionRuleStore.store_path(self.source_path)
+        self.assertFalse(ReactionRuleStore.is_up_to_date(store_path, self.source_path))
+
+        compiled_rules = ReactionRuleStore.load_or_compile(self.source_path)
+        self.assertTrue(os.path.exists(store_path))
+        self.assertTrue(ReactionRuleStore.is_up_to_date(store_path, self.source_path))
+
+        # the invalid rule is quarantined
+        self.assertEqual([rule.rule_id for rule in compiled_rules], ['R1', 'R2'])
+        report = pd.read_csv(ReactionRuleStore.report_path(store_path), sep='\t')
+        self.assertEqual(list(report['InternalID']), ['R3'])
+        self.assertEqual(list(report['Reason']), ['parse_error'])
+
+        rules = ReactionRuleStore.load(store_path)
+        self.assertEqual(len(rules), len(compiled_rules))
+        for rule, compiled_rule in zip(rules, compiled_rules):
+            self.assertEqual(rule.rule_id, compiled_rule.rule_id)
+            self.assertEqual(rule.smarts, compiled_rule.smarts)
+            self.assertEqual(rule.reactants, compiled_rule.reactants)
+        self.assertTrue(rules[0].reaction is not None)
+        self.assertEqual(rules[1].reaction.GetNumReactantTemplates(), 2)
+
+        # the index built from the stored fingerprints screens compounds like the one built from the compiled rules
+        cmp = Compound('CCN', 'C1')
+        self.assertEqual(list(RuleApplicabilityIndex(rules).screen(cmp)),
+                         list(RuleApplicabilityIndex(compiled_rules).screen(cmp)))
+
+        lazy_rules = ReactionRuleStore.load(store_path, lazy=True)
+        self.assertFalse(any(rule.compiled for rule in lazy_rules))
+        # the index is built from the stored fingerprints without compiling valid rules
+        RuleApplicabilityIndex(lazy_rules)
+        self.assertFalse(lazy_rules[0].compiled)
+        self.assertEqual(lazy_rules[0].reaction.GetNumReactantTemplates(), 1)
+        self.assertTrue(lazy_rules[0].compiled)
+
+        # changing the source file invalidates the store
+        with open(self.source_path, 'ab') as f:
+            f.write(b'\n')
+        self.assertFalse(ReactionRuleStore.is_up_to_date(store_path, self.source_path))
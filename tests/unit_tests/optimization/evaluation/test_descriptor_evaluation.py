@@ -0,0 +1,63 @@
+from unittest import TestCase
+
+import numpy as np
+from rdkit.Chem import MolFromSmiles
+
+from reactea.optimization.evaluation import LogP, MolecularWeight, NumberOfLargeRings, StereoisomersCounter
+from reactea.optimization.evaluation_executor import EvaluationExecutor
+from reactea.optimization.evaluation_plan import EvaluationPlan
+from .test_evaluation_functions import EvaluationFunctionBaseTestCase
+
+
+def _reference_score(f, value):
+    """
+    Scalar scoring curves of the descriptor based evaluation functions.
+    """
+    if isinstance(f, LogP):
+        return 1.0 if value < 0 else 0.0 if value > f.max_logp else (f.max_logp - value) / f.max_logp
+    if isinstance(f, MolecularWeight):
+        if value < f.min_weight:
+            return np.cos((value - f.min_weight + 200) / 320)
+        return 1.0 if value < f.max_weight else 1.0 / np.log(value / 250.0)
+    if isinstance(f, NumberOfLargeRings):
+        return 1 / np.log((value - f.max_rings) * 100) if value > f.max_rings else 1.0
+    return 1.0 if value < f.max_chiral_count else 1.0 / np.log(value * 100.0)
+
+
+class TestDescriptorEvaluationFunctions(EvaluationFunctionBaseTestCase, TestCase):
+
+    def setUp(self) -> None:
+        super(TestDescriptorEvaluationFunctions, self).setUp()
+        self.mols += [MolFromSmiles('C1CCCCCCCCC1'), MolFromSmiles('CC(O)C(N)C(F)C(Cl)C(Br)CC')]
+        self.functions = [LogP(max_logp=2), MolecularWeight(min_weight=150, max_weight=300),
+                          NumberOfLargeRings(), StereoisomersCounter(max_chiral_count=3, worst_fitness=-1.0)]
+
+    def test_evaluation_function(self):
+        for f in self.functions:
+            values = f.descriptors(self.mols)
+            expected = [_reference_score(f, value) for value in values]
+            np.testing.assert_allclose(f.score(values), expected)
+            np.testing.assert_allclose(f.get_fitness(self.mols), expected)
+            self.assertAlmostEqual(f.get_fitness_single(self.mols[0]), expected[0])
+
+    def test_evaluation_function_with_invalid_mols(self):
+        for f in self.functions:
+            values = f.descriptors(self.mols_w_invalid)
+            self.assertEqual(np.isnan(values).sum(), 3)
+            scores = f.get_fitness(self.mols_w_invalid)
+            self.assertEqual(scores[3], f.worst_fitness)
+            self.assertEqual(scores[-1], f.worst_fitness)
+
+    def test_plan(self):
+        expected = np.array([f.get_fitness(self.mols_w_invalid) for f in self.functions]).T
+        plan = EvaluationPlan(self.functions)
+        self.assertEqual(plan.descriptor_leaves, [0, 1, 2, 3])
+        np.testing.assert_allclose(plan.evaluate(self.mols_w_invalid), expected)
+        executor = EvaluationExecutor(self.functions, n_jobs=2, backend='thread')
+        try:
+            np.testing.assert_allclose(plan.evaluate(self.mols_w_invalid, executor), expected)
+            # descriptors are returned unscored when requested
+            np.testing.assert_allclose(executor.map_many(self.functions, self.mols, descriptors=True),
+                                       np.array([f.descriptors(self.mols) for f in self.functions]).T)
+        finally:
+            executor.close()
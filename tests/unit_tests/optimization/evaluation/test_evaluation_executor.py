@@ -0,0 +1,76 @@
+import threading
+import time
+from unittest import TestCase
+
+from reactea.optimization.evaluation import QED, LogP, AggregatedSum, Caloric, SAS
+from reactea.optimization.evaluation_executor import EvaluationExecutor
+from .test_evaluation_functions import EvaluationFunctionBaseTestCase
+
+
+class BatchedQED(QED):
+
+    parallel = False
+
+
+class TestEvaluationExecutor(EvaluationFunctionBaseTestCase, TestCase):
+
+    def _functions(self):
+        return [QED(), AggregatedSum([LogP(), Caloric()], [0.3, 0.7]), SAS(), BatchedQED()]
+
+    def test_evaluation_function(self):
+        expected = [[f.get_fitness_single(mol) for mol in self.mols] for f in self._functions()]
+        for backend in EvaluationExecutor.BACKENDS:
+            functions = self._functions()
+            executor = EvaluationExecutor.from_configs({'evaluation_jobs': 2,
+                                                        'evaluation_chunk_size': 2,
+                                                        'evaluation_backend': backend}, functions)
+            try:
+                # aggregated functions are registered, functions evaluated in batches are not
+                self.assertEqual(len(executor.functions), 5)
+                self.assertIsNone(functions[-1].executor)
+                for f, f_expected in zip(functions, expected):
+                    # workers are reused between calls
+                    for _ in range(2):
+                        scores = f.get_fitness(self.mols)
+                        self.assertEqual(len(scores), len(self.mols))
+                        for score, expected_score in zip(scores, f_expected):
+                            self.assertAlmostEqual(score, expected_score)
+            finally:
+                executor.close()
+
+    def test_evaluation_function_with_invalid_mols(self):
+        functions = [QED(), Caloric()]
+        executor = EvaluationExecutor.from_configs({'evaluation_jobs': 2, 'evaluation_backend': 'process'},
+                                                   functions)
+        try:
+            for f in functions:
+                scores = f.get_fitness(self.mols_w_invalid)
+                self.assertEqual(len(scores), len(self.mols_w_invalid))
+                self.assertEqual(scores[-1], f.worst_fitness)
+        finally:
+            executor.close()
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            EvaluationExecutor([QED()], backend='dask')
+        self.assertEqual(EvaluationExecutor([QED()], n_jobs=1).backend, 'sequential')
+
+    def test_close_cancels_pending_tasks(self):
+        executor = EvaluationExecutor([QED()], n_jobs=2, backend='thread')
+        event = threading.Event()
+        running = [executor._submit(event.wait) for _ in range(2)]
+        pending = executor._submit(event.wait)
+        self.assertEqual(len(executor._pending), 3)
+        closer = threading.Thread(target=executor.close)
+        closer.start()
+        # the pending task is cancelled before waiting for the running ones
+        for _ in range(100):
+            if pending.cancelled():
+                break
+            time.sleep(0.01)
+        self.assertTrue(pending.cancelled())
+        event.set()
+        closer.join()
+        self.assertTrue(all(future.done() for future in running))
+        self.assertIsNone(executor._executor)
+        self.assertEqual(executor._pending, set())
@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+import numpy as np
+
+from reactea.chem.compounds import Compound
+from reactea.optimization.evaluation import QED, LogP, AggregatedSum, Caloric, MolecularWeight
+from reactea.optimization.evaluation_executor import EvaluationExecutor
+from reactea.optimization.evaluation_plan import EvaluationPlan
+from reactea.optimization.problem import ChemicalProblem
+from .test_evaluation_functions import EvaluationFunctionBaseTestCase
+
+
+class BatchedLogP(LogP):
+
+    parallel = False
+
+    def get_fitness(self, candidates):
+        return [self.get_fitness_single(candidate) for candidate in candidates]
+
+
+class TestEvaluationPlan(EvaluationFunctionBaseTestCase, TestCase):
+
+    def setUp(self) -> None:
+        super(TestEvaluationPlan, self).setUp()
+        self.qed = QED()
+        self.mw = MolecularWeight()
+        inner = AggregatedSum([self.mw, BatchedLogP()], [0.4, 0.6])
+        self.functions = [self.qed, AggregatedSum([self.qed, inner, Caloric()], [0.5, 0.25, 0.25]), self.mw]
+
+    def _expected(self, mols):
+        return np.array([[f.get_fitness_single(mol) for f in self.functions] for mol in mols])
+
+    def test_evaluation_function(self):
+        plan = EvaluationPlan(self.functions)
+        # shared leaves are evaluated once
+        self.assertEqual(len(plan.leaves), 4)
+        self.assertEqual(plan.weights.shape, (4, 3))
+        self.assertAlmostEqual(plan.weights[0, 0], 1.0)
+        self.assertAlmostEqual(plan.weights[0, 1], 0.5)
+        self.assertAlmostEqual(plan.weights[1, 1], 0.25 * 0.4)
+        self.assertEqual(len(plan.batch_leaves), 1)
+        np.testing.assert_allclose(plan.evaluate(self.mols), self._expected(self.mols))
+
+        executor = EvaluationExecutor(self.functions, n_jobs=2, chunk_size=2)
+        try:
+            np.testing.assert_allclose(plan.evaluate(self.mols, executor), self._expected(self.mols))
+        finally:
+            executor.close()
+        self.assertEqual(plan.evaluate([]).shape, (0, 3))
+
+    def test_evaluation_function_with_invalid_mols(self):
+        plan = EvaluationPlan([self.qed, Caloric()])
+        scores = plan.evaluate(self.mols_w_invalid)
+        self.assertEqual(scores.shape, (len(self.mols_w_invalid), 2))
+        self.assertEqual(scores[-1, 0], self.qed.worst_fitness)
+
+    def test_problem(self):
+        problem = ChemicalProblem(self.functions)
+        compounds = [Compound(smi, i) for i, smi in enumerate(self.smiles)]
+        scores = problem.evaluate_solutions(compounds)
+        np.testing.assert_allclose(np.array(scores), self._expected(self.mols))
+        np.testing.assert_allclose(problem.evaluate_solutions(compounds[0]), self._expected(self.mols[:1])[0])
@@ -0,0 +1,96 @@
+import math
+import os
+import tempfile
+from unittest import TestCase
+
+from reactea.chem.compounds import Compound
+from reactea.optimization.evaluation import QED, LogP, AggregatedSum, SimilarityToInitial, MolecularWeight
+from reactea.optimization.fitness_cache import FitnessCache
+from reactea.optimization.problem import ChemicalProblem
+from reactea.wrappers import evaluation_functions_wrapper
+
+
+class CountingQED(QED):
+
+    def __init__(self):
+        super(CountingQED, self).__init__()
+        self._n_evaluated = 0
+
+    def get_fitness_single(self, candidate):
+        self._n_evaluated += 1
+        return super(CountingQED, self).get_fitness_single(candidate)
+
+
+class TestFitnessCache(TestCase):
+
+    def setUp(self) -> None:
+        self.smiles = ['CCO', 'OCCO', 'c1ccccc1O', 'CCO']
+        self.compounds = [Compound(smi, i) for i, smi in enumerate(self.smiles)]
+
+    def test_signature(self):
+        self.assertEqual(QED().signature(), QED().signature())
+        self.assertNotEqual(QED().signature(), QED(worst_fitness=1.0).signature())
+        self.assertNotEqual(LogP(max_logp=10).signature(), LogP(max_logp=20).signature())
+        ag1 = AggregatedSum([QED(), LogP()], [0.5, 0.5])
+        ag2 = AggregatedSum([QED(), LogP()], [0.25, 0.75])
+        ag3 = AggregatedSum([QED(), MolecularWeight()], [0.5, 0.5])
+        self.assertNotEqual(ag1.signature(), ag2.signature())
+        self.assertNotEqual(ag1.signature(), ag3.signature())
+        self.assertNotEqual(SimilarityToInitial(['CCO']).signature(), SimilarityToInitial(['CCCO']).signature())
+
+    def test_wrapped_function_signature(self):
+        def score(mol):
+            return mol.GetNumAtoms()
+
+        def other_score(mol):
+            return mol.GetNumBonds()
+
+        f1 = evaluation_functions_wrapper(score, True, 0.0, 'score')
+        self.assertEqual(f1.signature(), evaluation_functions_wrapper(score, True, 0.0, 'score').signature())
+        self.assertIn('score', f1.signature())
+        # wrapped functions with the same name do not share cached fitness
+        self.assertNotEqual(f1.signature(), evaluation_functions_wrapper(other_score, True, 0.0, 'score').signature())
+        self.assertNotEqual(f1.signature(),
+                            evaluation_functions_wrapper(score, True, 0.0, 'score', features='maccs').signature())
+
+    def test_problem_reuses_cached_fitness(self):
+        f = CountingQED()
+        problem = ChemicalProblem([f, LogP()], fitness_cache=FitnessCache())
+        uncached = ChemicalProblem([QED(), LogP()])
+        scores = problem.evaluate_solutions(self.compounds)
+        # duplicated compounds are only evaluated once
+        self.assertEqual(f._n_evaluated, 3)
+        for score, expected in zip(scores, uncached.evaluate_solutions(self.compounds)):
+            self.assertAlmostEqual(score[0], expected[0])
+            self.assertAlmostEqual(score[1], expected[1])
+
+        self.assertEqual(list(problem.evaluate_solutions(self.compounds)), list(scores))
+        self.assertEqual(list(problem.evaluate_solutions(self.compounds[1])), list(scores[1]))
+        self.assertEqual(f._n_evaluated, 3)
+        self.assertEqual(problem.fitness_cache.stats()['size'], 6)
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'fitness.sqlite')
+            cache = FitnessCache(maxsize=10, db_path=path)
+            cache.put_many('f', {'CCO': 0.5, 'OCCO': math.nan})
+            cache.put_many('g', {'CCO': 0.1})
+            cache.close()
+
+            cache = FitnessCache.from_configs({'fitness_cache_path': path})
+            found = cache.get_many('f', ['CCO', 'OCCO', 'CCCC'])
+            self.assertEqual(found['CCO'], 0.5)
+            self.assertTrue(math.isnan(found['OCCO']))
+            self.assertNotIn('CCCC', found)
+            self.assertEqual(cache.get_many('g', ['CCO']), {'CCO': 0.1})
+            self.assertEqual(cache.stats()['hits'], 3)
+            self.assertEqual(cache.stats()['misses'], 1)
+            cache.close()
+
+    def test_lru(self):
+        cache = FitnessCache(maxsize=2)
+        cache.put_many('f', {'A': 1.0, 'B': 2.0})
+        cache.get_many('f', ['A'])
+        cache.put_many('f', {'C': 3.0})
+        self.assertEqual(cache.get_many('f', ['A', 'B', 'C']), {'A': 1.0, 'C': 3.0})
+        self.assertIsNone(FitnessCache.from_configs({'fitness_cache_size': 0}))
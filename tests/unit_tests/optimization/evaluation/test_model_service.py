@@ -0,0 +1,94 @@
+import threading
+import time
+from unittest import TestCase
+
+from rdkit.Chem import Mol
+from rdkit.Chem.Descriptors import HeavyAtomCount
+
+from reactea.optimization.model_service import ModelService
+from .test_evaluation_functions import EvaluationFunctionBaseTestCase
+
+
+class HeavyAtomsModel:
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, mols):
+        time.sleep(0.01)
+        self.batches.append(len(mols))
+        return [HeavyAtomCount(mol) if isinstance(mol, Mol) else -1 for mol in mols]
+
+
+class TestModelService(EvaluationFunctionBaseTestCase, TestCase):
+
+    def setUp(self) -> None:
+        super(TestModelService, self).setUp()
+        self.n_loads = 0
+
+    def _load(self):
+        self.n_loads += 1
+        return HeavyAtomsModel()
+
+    def _service(self, **kwargs):
+        return ModelService(self._load, lambda model, mols: model.predict(mols), **kwargs)
+
+    def test_evaluation_function(self):
+        service = self._service(max_batch_size=2)
+        expected = [HeavyAtomCount(mol) for mol in self.mols]
+        self.assertEqual(service.predict(self.mols), expected)
+        # micro-batches of at most 2 molecules
+        self.assertEqual(service.model.batches, [2, 2, 1])
+        # cached predictions are reused and the model is only loaded once
+        self.assertEqual(service.predict(self.mols[::-1]), expected[::-1])
+        self.assertEqual(service.model.batches, [2, 2, 1])
+        self.assertEqual(self.n_loads, 1)
+        self.assertEqual(service.stats()['hits'], len(self.mols))
+
+    def test_evaluation_function_with_invalid_mols(self):
+        service = self._service()
+        scores = service.predict(self.mols_w_invalid)
+        self.assertEqual(len(scores), len(self.mols_w_invalid))
+        self.assertEqual(scores[-1], -1)
+        # invalid molecules are not cached
+        self.assertEqual(service.stats()['size'], len(self.mols))
+
+    def test_concurrent_callers(self):
+        service = self._service(max_wait=0.05)
+        results = {}
+
+        def predict(i):
+            results[i] = service.predict([self.mols[i]])
+
+        threads = [threading.Thread(target=predict, args=(i,)) for i in range(len(self.mols))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i, mol in enumerate(self.mols):
+            self.assertEqual(results[i], [HeavyAtomCount(mol)])
+        # molecules of concurrent callers are gathered into fewer batches
+        self.assertLess(len(service.model.batches), len(self.mols))
+        self.assertEqual(sum(service.model.batches), len(self.mols))
+
+    def test_errors(self):
+        def fail(model, mols):
+            raise RuntimeError("model failed")
+        service = ModelService(self._load, fail)
+        with self.assertRaises(RuntimeError):
+            service.predict(self.mols)
+        # the service keeps working after a failed batch
+        service.predict_batch = lambda model, mols: model.predict(mols)
+        self.assertEqual(len(service.predict(self.mols)), len(self.mols))
+
+    def test_shared(self):
+        s1 = ModelService.shared('test_model', self._load, lambda model, mols: model.predict(mols))
+        s2 = ModelService.shared('test_model', self._load, lambda model, mols: model.predict(mols))
+        self.assertIs(s1, s2)
+        ModelService.configure({'model_batch_size': 3, 'model_cache_size': 0})
+        try:
+            self.assertEqual(s1.max_batch_size, 3)
+            s1.predict(self.mols)
+            self.assertEqual(s1.stats()['size'], 0)
+        finally:
+            ModelService.configure({})
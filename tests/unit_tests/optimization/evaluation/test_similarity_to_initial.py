@@ -1,5 +1,10 @@
 from unittest import TestCase
 
+import numpy as np
+from rdkit import DataStructs
+from rdkit.Chem import MolFromSmiles
+from rdkit.Chem.rdMolDescriptors import GetMorganFingerprintAsBitVect
+
 from reactea.optimization.evaluation import SimilarityToInitial
 from .test_evaluation_functions import EvaluationFunctionBaseTestCase
 
@@ -23,3 +28,21 @@ class TestSimilarityToInitial(EvaluationFunctionBaseTestCase, TestCase):
 
         self.assertEqual(len(scores), len(mols))
         self.assertEqual(scores[-1], spds.worst_fitness)
+
+    def test_packed_fingerprints(self):
+        init_pop = ['C=CCC(=O)C(=O)O', 'Cc1ncc(COP(=O)(O)OP(=O)(O)O)c(=N)[nH]1', 'CCO']
+        spds = SimilarityToInitial(initial_population=init_pop, method='mean', fingerprint='packed', worst_fitness=-1.0)
+        self.assertFalse(spds.parallel)
+        seeds = [GetMorganFingerprintAsBitVect(MolFromSmiles(smi), 2, nBits=2048) for smi in init_pop]
+        expected = [1 - np.mean(DataStructs.BulkTanimotoSimilarity(GetMorganFingerprintAsBitVect(mol, 2, nBits=2048),
+                                                                   seeds)) for mol in self.mols]
+        np.testing.assert_allclose(spds.get_fitness(self.mols), expected)
+        self.assertAlmostEqual(spds.get_fitness_single(self.mols[0]), expected[0])
+
+        scores = spds.get_fitness(self.mols_w_invalid)
+        self.assertEqual(len(scores), len(self.mols_w_invalid))
+        self.assertEqual(scores[3], spds.worst_fitness)
+        self.assertEqual(scores[-1], spds.worst_fitness)
+        self.assertNotEqual(spds.signature(), SimilarityToInitial(init_pop, method='mean').signature())
+        with self.assertRaises(ValueError):
+            SimilarityToInitial(init_pop, fingerprint='unknown')
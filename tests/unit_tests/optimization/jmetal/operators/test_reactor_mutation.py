@@ -43,3 +43,92 @@ class TestReactorMutation(OperatorsBaseTestCase, TestCase):
         sol2 = rm2.execute(ChemicalSolution(Compound('Nc1ncnc2c1ncn2C1OC(COP(=O)(O)OC(=O)c2cccc(O)c2O)C(O)C1O', 'C1')))
         self.assertEqual(rm2.get_name(), 'Reactor Mutation')
         self.assertIsInstance(sol2, ChemicalSolution)
+
+    def test_reaction_outcome_memo(self):
+        rrs = [ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R1'),
+               ReactionRule('[#7:1]-[#6:2]>>[#7:1].[#6:2]', 'R2')]
+        configs = dict(self.configs, mutation_probability=1.0, max_rules_by_iter=2)
+        rm = ReactorMutation(reaction_rules=rrs, standardizer=None, configs=configs, logger=None)
+        sol = rm.execute(ChemicalSolution(Compound('CCCCO', 'C1')))
+        self.assertEqual(sol.variables.smiles, 'CCCC=O')
+        sol = rm.execute(ChemicalSolution(Compound('CCCCO', 'C2')))
+        self.assertEqual(sol.variables.smiles, 'CCCC=O')
+        self.assertEqual(rm.memo.stats()['hits'], 1)
+
+        # no rule produces products for the compound
+        sol = rm.execute(ChemicalSolution(Compound('CCCCC', 'C3')))
+        self.assertEqual(sol.variables.smiles, 'CCCCC')
+        self.assertTrue(rm.memo.is_dead_end('CCCCC'))
+
+    def test_parallel_rule_trials(self):
+        rrs = [ReactionRule('[#7:1]-[#6:2]>>[#7:1].[#6:2]', 'R1'),
+               ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R2'),
+               ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]-[#8:2]-[#6]', 'R3'),
+               ReactionRule('[#6&H3:1]>>[#6:1]-[#7]', 'R4'),
+               ReactionRule('[#6:1]-[#6&H3:2]>>[#6:1]-[#6:2]-[#6]', 'R5')]
+        configs = dict(self.configs, mutation_probability=1.0, max_rules_by_iter=5, use_rule_index=False,
+                       reaction_memo_size=0)
+        sequential = ReactorMutation(reaction_rules=rrs, standardizer=None, configs=configs, logger=None)
+        configs = dict(configs, rule_trial_workers=2, rule_trial_chunk_size=1)
+        parallel = ReactorMutation(reaction_rules=rrs, standardizer=None, configs=configs, logger=None)
+        try:
+            for seed in range(10):
+                sequential.rng.seed(seed)
+                sol1 = sequential.execute(ChemicalSolution(Compound('OCCCCO', 'C1')))
+                parallel.rng.seed(seed)
+                sol2 = parallel.execute(ChemicalSolution(Compound('OCCCCO', 'C1')))
+                # the parallel trials pick the same rule as the sequential ones
+                self.assertEqual(sol1.attributes['rule_id'], sol2.attributes['rule_id'])
+                self.assertEqual(sol1.variables.smiles, sol2.variables.smiles)
+        finally:
+            parallel.close()
+        self.assertIsNone(parallel.rule_trials._executor)
+
+    def test_batch_mutation(self):
+        rrs = [ReactionRule('[#7:1]-[#6:2]>>[#7:1].[#6:2]', 'R1'),
+               ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R2'),
+               ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]-[#8:2]-[#6]', 'R3'),
+               ReactionRule('[#6&H3:1]>>[#6:1]-[#7]', 'R4'),
+               ReactionRule('[#6:1]-[#6&H3:2]>>[#6:1]-[#6:2]-[#6]', 'R5')]
+        configs = dict(self.configs, mutation_probability=1.0, max_rules_by_iter=3, batch_mutation=True)
+        in_process = ReactorMutation(reaction_rules=rrs, standardizer=None, configs=configs, logger=None)
+        self.assertTrue(in_process.batch)
+        self.assertIsNone(in_process.batch_pool)
+        configs = dict(configs, mutation_workers=1)
+        parallel = ReactorMutation(reaction_rules=rrs, standardizer=None, configs=configs, logger=None)
+        smiles = ['OCCCCO', 'CCCCO', 'CCCCC', 'CC(O)CN']
+        try:
+            in_process.rng.seed(42)
+            sols1 = in_process.execute_batch([ChemicalSolution(Compound(smi, f'C{i}')) for i, smi in enumerate(smiles)])
+            parallel.rng.seed(42)
+            sols2 = parallel.execute_batch([ChemicalSolution(Compound(smi, f'C{i}')) for i, smi in enumerate(smiles)])
+            in_process.rng.seed(42)
+            sols3 = [in_process.execute(ChemicalSolution(Compound(smi, f'C{i}'))) for i, smi in enumerate(smiles)]
+            # the mutations do not depend on where they run nor on whether they run in batches
+            self.assertEqual(len(sols1), len(smiles))
+            for sols in (sols2, sols3):
+                self.assertEqual([s.variables.smiles for s in sols1], [s.variables.smiles for s in sols])
+                self.assertEqual([s.attributes.get('rule_id') for s in sols1],
+                                 [s.attributes.get('rule_id') for s in sols])
+            self.assertIn('rule_id', sols2[0].attributes)
+        finally:
+            parallel.close()
+        self.assertIsNone(parallel.batch_pool._executor)
+        # closing a mutation without worker pools does nothing
+        in_process.close()
+
+    def test_rule_statistics(self):
+        rrs = [ReactionRule('[#7:1]-[#6:2]>>[#7:1].[#6:2]', 'R1'),
+               ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R2')]
+        configs = dict(self.configs, mutation_probability=1.0, max_rules_by_iter=2, rule_selection='ucb')
+        rm = ReactorMutation(reaction_rules=rrs, standardizer=None, configs=configs, logger=None)
+        sol = rm.execute(ChemicalSolution(Compound('CCCCO', 'C1'), [-0.5]))
+        self.assertEqual(sol.variables.smiles, 'CCCC=O')
+        self.assertEqual(rm.rule_stats.successes.tolist(), [0, 1])
+        self.assertEqual(rm.rule_stats.trials[1], 1)
+        # the mutant is evaluated (objectives are minimized)
+        sol.objectives = [-0.8]
+        rm.update_rule_statistics([sol])
+        self.assertAlmostEqual(rm.rule_stats.fitness_gain[1], 0.3)
+        self.assertEqual(rm.rule_stats.improvements.tolist(), [0, 1])
+        self.assertNotIn('pending_rule', sol.attributes)
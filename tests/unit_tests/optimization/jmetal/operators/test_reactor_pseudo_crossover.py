@@ -4,7 +4,7 @@ from reactea.chem.compounds import Compound
 from reactea.chem.reaction_rules import ReactionRule
 from reactea.io_streams import Writers
 from reactea.chem.standardization import ChEMBLStandardizer
-from reactea.optimization.jmetal.operators import ReactorPseudoCrossover
+from reactea.optimization.jmetal.operators import ReactorPseudoCrossover, ReactorMutation
 from reactea.optimization.solution import ChemicalSolution
 
 from .test_operators import OperatorsBaseTestCase
@@ -53,3 +53,30 @@ class TestReactorMutation(OperatorsBaseTestCase, TestCase):
         self.assertEqual(rm2.get_name(), 'Reactor One Point PseudoCrossover')
         self.assertIsInstance(sol2, list)
         self.assertIsInstance(sol2[0], ChemicalSolution)
+
+    def test_batch_crossover(self):
+        rrs = [ReactionRule('[#7:1]-[#6:2]>>[#7:1].[#6:2]', 'R1'),
+               ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]=[#8:2]', 'R2'),
+               ReactionRule('[#6:1]-[#8&H1:2]>>[#6:1]-[#8:2]-[#6]', 'R3'),
+               ReactionRule('[#6&H3:1]>>[#6:1]-[#7]', 'R4'),
+               ReactionRule('[#6:1]-[#6&H3:2]>>[#6:1]-[#6:2]-[#6]', 'R5')]
+        configs = dict(self.configs, mutation_probability=1.0, crossover_probability=0.5, max_rules_by_iter=3)
+        mutation = ReactorMutation(reaction_rules=rrs, standardizer=None, configs=configs, logger=None)
+        crossover = ReactorPseudoCrossover(reaction_rules=rrs, standardizer=None, configs=configs, logger=None,
+                                           mutation=mutation)
+        smiles = ['OCCCCO', 'CCCCO', 'CCCCC', 'CC(O)CN', 'CCN', 'OCC(C)CO']
+
+        def reproduce(batch):
+            parents = [[ChemicalSolution(Compound(smi, f'C{i}'))] for i, smi in enumerate(smiles)]
+            crossover.rng.seed(42)
+            mutation.rng.seed(7)
+            if batch:
+                offspring = [o[0] for o in crossover.execute_batch(parents)]
+                return mutation.execute_batch(offspring)
+            # jMetal mutates the offspring of each crossover before the next one
+            return [mutation.execute(crossover.execute(parent)[0]) for parent in parents]
+
+        serial = reproduce(False)
+        batch = reproduce(True)
+        self.assertEqual([s.variables.smiles for s in serial], [s.variables.smiles for s in batch])
+        self.assertEqual([s.attributes.get('rule_id') for s in serial], [s.attributes.get('rule_id') for s in batch])
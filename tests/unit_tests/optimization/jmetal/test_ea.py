@@ -0,0 +1,50 @@
+import os
+import shutil
+from unittest import TestCase
+from unittest.mock import patch
+
+from rdkit import RDLogger
+
+from tests import TEST_DIR
+from reactea.case_studies.compound_quality import CompoundQuality
+from reactea.io_streams import Loaders, Writers
+from reactea.optimization.jmetal.algorithms import ReactorGeneticAlgorithm
+from reactea.optimization.jmetal.ea import ChemicalEA
+
+
+class TestChemicalEA(TestCase):
+
+    def setUp(self):
+        # Mute RDKit logs
+        RDLogger.DisableLog("rdApp.*")
+
+        config_path = os.path.join(TEST_DIR, 'configs/base_config.yaml')
+        self.configs = Loaders.get_config_from_yaml(config_path)
+        self.configs['algorithm'] = 'GA'
+        self.configs['multi_objective'] = False
+        self.output_folder = f"{TEST_DIR}/outputs/{self.configs['exp_name']}/GA"
+        self.configs['output_dir'] = self.output_folder
+        Writers.set_up_folders(self.output_folder)
+
+        init_pop, init_pop_smiles = Loaders.initialize_population(self.configs)
+        reaction_rules = Loaders.initialize_rules(
+            n_jobs=1, rules_path=os.path.join(TEST_DIR, 'data/reactionrules/reaction_rules_sample.tsv.bz2'))
+        self.ea = ChemicalEA('GA', CompoundQuality(init_pop_smiles, self.configs).objective(),
+                             initial_population=init_pop, reaction_rules=reaction_rules,
+                             max_generations=self.configs['generations'], configs=self.configs)
+
+    def tearDown(self):
+        if os.path.exists(f"{TEST_DIR}/outputs/"):
+            shutil.rmtree(f"{TEST_DIR}/outputs/")
+
+    def test_rule_statistics_listener(self):
+        # the rule statistics listener of each run is detached once the run ends
+        for _ in range(2):
+            self.assertIsInstance(self.ea.run(), list)
+            self.assertEqual(self.ea.population_evaluator.listeners, [])
+
+        # and if the run fails
+        with patch.object(ReactorGeneticAlgorithm, 'run', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.ea.run()
+        self.assertEqual(self.ea.population_evaluator.listeners, [])